@@ -1,19 +1,33 @@
-from fastapi import APIRouter, UploadFile, File, Depends, BackgroundTasks, HTTPException, status
-from app.pii_scanner.extract import extract_text
-from app.pii_scanner.scan import scan_text
+from fastapi import APIRouter, UploadFile, File, Depends, BackgroundTasks, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from app.pii_scanner.extract import extract_text, iter_pages
+from app.pii_scanner.ocr_pool import INTERACTIVE, OcrCancelled, OcrQueueFull, OcrRequest, OcrUnavailable, bind_pages, ocr_scope
+from app.pii_scanner.preprocess import PROFILES
+from app.pii_scanner.scan import scan_pages, scan_text
 from app.db.database import SessionLocal
 from app.db import crud
 import logging
 
 logger = logging.getLogger("pii_scanner.api.document")
 from app import config as conf
-from app.tasks import create_job_record, process_upload_background, get_job
+from app.tasks import cancel_job, create_job_record, process_upload_background, get_job
+import asyncio
+import json
 import os
+import shutil
+from typing import Optional
 
 router = APIRouter()
 
 # allowed upload extensions
-ALLOWED_EXT = {'.pdf', '.docx', '.png', '.jpg', '.jpeg', '.txt', '.csv'}
+ALLOWED_EXT = {'.pdf', '.docx', '.png', '.jpg', '.jpeg', '.txt', '.csv', '.log'}
+# text uploads, capped by MAX_TEXT_UPLOAD_SIZE on /upload_async/
+TEXT_EXT = {'.txt', '.csv', '.log'}
+# bytes per read when an upload is copied to disk
+COPY_CHUNK_BYTES = 1024 * 1024
+# how often /upload/ checks whether its client is still there while extraction runs
+DISCONNECT_POLL_SECONDS = 0.5
 
 def get_db():
     db = SessionLocal()
@@ -22,25 +36,68 @@ def get_db():
     finally:
         db.close()
 
+def _check_ocr_profile(ocr_profile):
+    if ocr_profile is not None and ocr_profile not in PROFILES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown OCR profile {ocr_profile!r}; expected one of {', '.join(PROFILES)}",
+        )
+
+def _extract_interactive(ocr, content, filename, info, ocr_profile):
+    with ocr_scope(ocr):
+        return extract_text(content, filename, info=info, ocr_profile=ocr_profile)
+
+async def _cancel_on_disconnect(request, ocr):
+    """Cancel ``ocr`` once the client of ``request`` has disconnected."""
+    while not await request.is_disconnected():
+        await asyncio.sleep(DISCONNECT_POLL_SECONDS)
+    ocr.cancel()
+
+def _ocr_busy():
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="OCR is at capacity, retry later",
+        headers={"Retry-After": str(max(1, int(conf.OCR_QUEUE_TIMEOUT)))},
+    )
+
 @router.post("/upload/")
-async def upload_document(file: UploadFile = File(...), db=Depends(get_db)):
+async def upload_document(request: Request, file: UploadFile = File(...), trace: bool = False, ocr_profile: Optional[str] = None, db=Depends(get_db)):
     # validate file extension and size
     filename = file.filename or "unnamed"
     ext = os.path.splitext(filename)[1].lower()
     if ext not in ALLOWED_EXT:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported file type: {ext}")
+    _check_ocr_profile(ocr_profile)
 
     content = await file.read()
     if len(content) > conf.MAX_UPLOAD_SIZE:
         raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Uploaded file is too large")
 
+    # extraction runs off the event loop; its OCR goes ahead of background jobs and
+    # whatever is still queued for it is dropped if the client disconnects
+    ocr = OcrRequest(INTERACTIVE)
+    watcher = asyncio.create_task(_cancel_on_disconnect(request, ocr))
     try:
-        text = extract_text(content, filename)
-        detections, _ = scan_text(text)
+        extract_info = {}
+        try:
+            text = await run_in_threadpool(_extract_interactive, ocr, content, filename, extract_info, ocr_profile)
+        finally:
+            watcher.cancel()
+        scan_stats = {}
+        # trace=true forces a scan trace; otherwise traces are only sampled
+        detections, _ = scan_text(text, stats=scan_stats, trace=trace or None)
         document_id = crud.create_document_and_detections(db, filename, detections)
+    except OcrQueueFull:
+        raise _ocr_busy()
+    except OcrCancelled:
+        logger.info("Upload cancelled: client disconnected", extra={"uploaded_filename": filename})
+        # nobody is left to read it; 499 is the conventional "client closed request"
+        raise HTTPException(status_code=499, detail="Client disconnected")
     except Exception as e:
         logger.exception("Failed processing upload")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+    finally:
+        ocr.cancel()
     # structured summary log for this upload
     try:
         types_count = {}
@@ -58,42 +115,120 @@ async def upload_document(file: UploadFile = File(...), db=Depends(get_db)):
                 "num_detections": len(detections),
                 "types": types_count,
                 "max_score": max_score,
+                "detectors_skipped": scan_stats.get("detectors_skipped"),
             },
         )
     except Exception:
         logger.exception("Failed to emit structured upload summary")
 
-    return {"document_id": document_id, "detections": detections}
-
-
-@router.post("/upload_async/")
-async def upload_document_async(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
+    response = {
+        "document_id": document_id,
+        "detections": detections,
+        "detectors_skipped": scan_stats.get("detectors_skipped"),
+        "budget_exceeded": scan_stats.get("budget_exceeded"),
+        "extractor": extract_info["extractor"],
+        "ocr_pages": extract_info["ocr_pages"],
+    }
+    if trace:
+        response["trace"] = scan_stats.get("trace")
+    return response
+
+
+@router.post("/upload/stream/")
+async def upload_document_stream(file: UploadFile = File(...), ocr_profile: Optional[str] = None):
+    """Scan an upload page by page, streaming findings back as NDJSON as each page is done.
+
+    Every line but the last is a finding (the /upload/ shape plus ``page``,
+    with a page-relative span); the last is ``{"summary": {...}}`` with the
+    stored document id, written once the whole document has been scanned,
+    or ``{"error": ...}`` if a page could not be OCRed (nothing is stored).
+    """
     filename = file.filename or "unnamed"
     ext = os.path.splitext(filename)[1].lower()
     if ext not in ALLOWED_EXT:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported file type: {ext}")
+    _check_ocr_profile(ocr_profile)
 
     content = await file.read()
     if len(content) > conf.MAX_UPLOAD_SIZE:
         raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Uploaded file is too large")
 
-    # save file to uploads dir and create a job
+    def findings():
+        scan_stats = {}
+        detections = []
+        ocr = OcrRequest(INTERACTIVE)
+        try:
+            for finding in scan_pages(bind_pages(ocr, iter_pages(content, filename, ocr_profile)), stats=scan_stats):
+                detections.append(finding)
+                yield json.dumps(finding, ensure_ascii=False) + "\n"
+        except OcrUnavailable as e:
+            logger.warning("Streaming upload stopped: %s", e, extra={"uploaded_filename": filename})
+            yield json.dumps({"error": str(e)}) + "\n"
+            return
+        finally:
+            # also runs when the client disconnects and the generator is closed
+            ocr.cancel()
+        db = SessionLocal()
+        try:
+            document_id = crud.create_document_and_detections(db, filename, detections)
+        finally:
+            db.close()
+        summary = {
+            "document_id": document_id,
+            "num_detections": len(detections),
+            "pages": scan_stats["pages"],
+            "budget_exceeded": scan_stats["budget_exceeded"],
+        }
+        logger.info("upload_summary", extra={"uploaded_filename": filename, **summary})
+        yield json.dumps({"summary": summary}) + "\n"
+
+    return StreamingResponse(findings(), media_type="application/x-ndjson")
+
+
+@router.post("/upload_async/")
+async def upload_document_async(background_tasks: BackgroundTasks, file: UploadFile = File(...), ocr_profile: Optional[str] = None):
+    filename = file.filename or "unnamed"
+    ext = os.path.splitext(filename)[1].lower()
+    if ext not in ALLOWED_EXT:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported file type: {ext}")
+    _check_ocr_profile(ocr_profile)
+
+    # the upload is already spooled to a temporary file; size it without reading it
+    file.file.seek(0, os.SEEK_END)
+    size = file.file.tell()
+    file.file.seek(0)
+    if ext in TEXT_EXT:
+        too_large = conf.MAX_TEXT_UPLOAD_SIZE and size > conf.MAX_TEXT_UPLOAD_SIZE
+    else:
+        too_large = size > conf.MAX_UPLOAD_SIZE
+    if too_large:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Uploaded file is too large")
+
+    # copy it to the uploads dir a chunk at a time and create a job
     uploads_dir = conf.DATA_DIR / "uploads"
     uploads_dir.mkdir(parents=True, exist_ok=True)
     job_id = create_job_record(filename)
     saved_path = uploads_dir / f"{job_id}_{filename}"
     try:
         with open(saved_path, "wb") as f:
-            f.write(content)
+            await run_in_threadpool(shutil.copyfileobj, file.file, f, COPY_CHUNK_BYTES)
     except Exception as e:
         logger.exception("Failed to save uploaded file")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to save file")
 
     # schedule background processing
-    background_tasks.add_task(process_upload_background, job_id, str(saved_path), filename)
+    background_tasks.add_task(process_upload_background, job_id, str(saved_path), filename, ocr_profile)
     return {"job_id": job_id}
 
 
+@router.post("/upload_cancel/{job_id}")
+async def upload_cancel(job_id: str):
+    """Cancel a background upload; OCR of its pages still waiting in the queue is dropped."""
+    if get_job(job_id) is None:
+        return {"error": "job not found"}
+    return {"job_id": job_id, "cancelled": cancel_job(job_id)}
+
+
 @router.get("/upload_status/{job_id}")
 async def upload_status(job_id: str):
     job = get_job(job_id)
@@ -1,19 +1,53 @@
-from fastapi import APIRouter, Body
-from app.pii.mask import mask_value
+import codecs
+import tempfile
+
+from fastapi import APIRouter, Body, Request
+from fastapi.responses import StreamingResponse
 from app.pii.detectors import detect_pii
-import yaml
+from app.pii.redact import StreamRedactor, redact_spans
+from app.pii.registry import get_registry
 
 router = APIRouter()
 
-with open("app/pii/registry.yaml") as f:
-    REGISTRY = yaml.safe_load(f)
+# redacted output of /redact/stream/ is kept in memory up to this size, then spooled to disk
+STREAM_SPOOL_SIZE = 1024 * 1024
+STREAM_READ_SIZE = 64 * 1024
 
 @router.post("/redact/")
 def redact_text(text: str = Body(...)):
-    detections = detect_pii(text)
-    redacted = text
-    for d in detections:
-        mask_rule = REGISTRY[d["type"]]["mask"]
-        masked = mask_value(d["value"], mask_rule)
-        redacted = redacted.replace(d["value"], masked)
+    entries = get_registry().entries()
+    detections = detect_pii(text, entries)
+    redacted = redact_spans(text, detections, entries)
     return {"redacted": redacted, "detections": detections}
+
+
+@router.post("/redact/stream/")
+async def redact_stream(request: Request):
+    """Redact a raw UTF-8 request body of any size and return the redacted text.
+
+    The body is redacted as it is received, so only a small window of it is
+    held in memory; the output is spooled and streamed back once the body
+    has been read. The request stream is consumed here rather than inside the
+    response, where it would compete with the server's disconnect listener.
+    """
+    redactor = StreamRedactor(get_registry().entries())
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    spool = tempfile.SpooledTemporaryFile(max_size=STREAM_SPOOL_SIZE)
+    async for chunk in request.stream():
+        spool.write(redactor.feed(decoder.decode(chunk)).encode("utf-8"))
+    spool.write(redactor.feed(decoder.decode(b"", final=True), final=True).encode("utf-8"))
+    spool.seek(0)
+
+    def redacted():
+        with spool:
+            while True:
+                block = spool.read(STREAM_READ_SIZE)
+                if not block:
+                    break
+                yield block
+
+    return StreamingResponse(
+        redacted(),
+        media_type="text/plain; charset=utf-8",
+        headers={"X-Detections-Count": str(redactor.count)},
+    )
@@ -12,13 +12,59 @@ SQLITE_PATH = os.environ.get("PII_SQLITE_PATH", str(DATA_DIR / "pii.db"))
 POPPLER_PATH = os.environ.get("POPPLER_PATH", r"C:\\Program Files\\poppler-25.07.0\\Library\\bin")
 TESSERACT_CMD = os.environ.get("TESSERACT_CMD", r"C:\\Program Files\\Tesseract-OCR\\tesseract.exe")
 
+# PDF text extraction: processes per PDF (0 = one per CPU), used from this many pages up
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", 0))
+PDF_PARALLEL_MIN_PAGES = int(os.environ.get("PDF_PARALLEL_MIN_PAGES", 64))
+
+# OCR results cached by content hash in OCR_CACHE_DIR (e.g. data/ocr_cache), if set. Off by
+# default: entries are the plaintext OCR of uploaded documents, i.e. the PII itself
+OCR_CACHE_DIR = os.environ.get("OCR_CACHE_DIR", "")
+OCR_CACHE_MAX_BYTES = int(os.environ.get("OCR_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+# Tesseract runs on a pool of OCR_WORKERS threads (0 = one per CPU) fed by a queue of
+# at most OCR_QUEUE_SIZE pages; /upload/ gives up after OCR_QUEUE_TIMEOUT seconds without a slot
+OCR_WORKERS = int(os.environ.get("OCR_WORKERS", 0))
+OCR_QUEUE_SIZE = int(os.environ.get("OCR_QUEUE_SIZE", 64))
+OCR_QUEUE_TIMEOUT = float(os.environ.get("OCR_QUEUE_TIMEOUT", 10))
+
+# PDF pages are rendered at OCR_DPI for OCR. With OCR_ADAPTIVE_DPI they are read at
+# OCR_LOW_DPI first and only doubtful lines are re-rendered at OCR_DPI
+OCR_DPI = int(os.environ.get("OCR_DPI", 300))
+OCR_ADAPTIVE_DPI = os.environ.get("OCR_ADAPTIVE_DPI", "false").lower() in ("1","true","yes")
+OCR_LOW_DPI = int(os.environ.get("OCR_LOW_DPI", 150))
+# Scanned PDFs are rendered for OCR at most this many pages ahead of it
+OCR_RENDER_AHEAD = int(os.environ.get("OCR_RENDER_AHEAD", 2))
+
+# Background text uploads (.txt/.csv/.log) of this size and up are scanned from a memory
+# map window by window instead of being read whole
+TEXT_STREAM_MIN_BYTES = int(os.environ.get("TEXT_STREAM_MIN_BYTES", 16 * 1024 * 1024))
+
+# Image preprocessing before OCR: fast, balanced or quality (see app/pii_scanner/preprocess.py);
+# requests may pick another with ?ocr_profile=
+OCR_PROFILE = os.environ.get("OCR_PROFILE", "quality").lower()
+if OCR_PROFILE not in ("fast", "balanced", "quality"):
+    raise ValueError(f"OCR_PROFILE must be one of fast, balanced, quality; got {OCR_PROFILE!r}")
+
 # Detection
 CONTEXT_WINDOW = int(os.environ.get("CONTEXT_WINDOW", 48))
 SCORE_THRESHOLD = int(os.environ.get("SCORE_THRESHOLD", 2))
+# Give the full context-keyword bonus only to keywords within half the window
+CONTEXT_DISTANCE_WEIGHTING = os.environ.get("CONTEXT_DISTANCE_WEIGHTING", "false").lower() in ("1","true","yes")
+# Seconds of pattern matching allowed per document; 0 disables the budget
+SCAN_TIME_BUDGET = float(os.environ.get("SCAN_TIME_BUDGET", 0))
+# Rules for the YAML-driven detectors in app.pii; reloaded when the file changes
+PII_REGISTRY_PATH = os.environ.get("PII_REGISTRY_PATH", str(Path(__file__).resolve().parent / "pii" / "registry.yaml"))
+# Which detection survives when several overlap: score, risk, longest or keep (all)
+OVERLAP_POLICY = os.environ.get("OVERLAP_POLICY", "score").lower()
+if OVERLAP_POLICY not in ("score", "risk", "longest", "keep"):
+    raise ValueError(f"OVERLAP_POLICY must be one of score, risk, longest, keep; got {OVERLAP_POLICY!r}")
 
 # Logging
 LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
 LOG_JSON = os.environ.get("LOG_JSON", "true").lower() in ("1","true","yes")
+# Per-scan detector counts/timings; DEBUG turns on sampled traces, requests can force one
+SCAN_TRACE_LOG_LEVEL = os.environ.get("SCAN_TRACE_LOG_LEVEL", "WARNING")
+SCAN_TRACE_SAMPLE_RATE = float(os.environ.get("SCAN_TRACE_SAMPLE_RATE", 0.01))
 
 # Export
 EXPORT_DIR = DATA_DIR / "exports"
@@ -26,3 +72,6 @@ EXPORT_DIR.mkdir(parents=True, exist_ok=True)
 
 # Limits
 MAX_UPLOAD_SIZE = int(os.environ.get("MAX_UPLOAD_SIZE", 20 * 1024 * 1024))  # 20 MB
+# text uploads (.txt/.csv/.log) to /upload_async/ are spooled to disk and scanned from there,
+# so they get their own cap; 0 = no cap
+MAX_TEXT_UPLOAD_SIZE = int(os.environ.get("MAX_TEXT_UPLOAD_SIZE", 20 * 1024 * 1024 * 1024))  # 20 GB
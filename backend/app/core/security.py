@@ -1,7 +1,10 @@
 # Encryption/decryption utilities for secure PII storage
 import hashlib
+import time
 from cryptography.fernet import Fernet
 
+from app import metrics
+
 # In production, store/load this key securely (e.g., from KMS)
 FERNET_KEY = Fernet.generate_key()
 fernet = Fernet(FERNET_KEY)
@@ -10,7 +13,10 @@ def hash_value(value: str) -> str:
 	return hashlib.sha256(value.encode()).hexdigest()
 
 def encrypt_value(value: str) -> bytes:
-	return fernet.encrypt(value.encode())
+	started = time.perf_counter()
+	token = fernet.encrypt(value.encode())
+	metrics.ENCRYPT_SECONDS.observe(time.perf_counter() - started)
+	return token
 
 def decrypt_value(token: bytes) -> str:
 	return fernet.decrypt(token).decode()
@@ -1,5 +1,6 @@
 
 from app.db.models import Document, Detection
+from app import metrics
 from app.core.security import hash_value, encrypt_value
 
 def create_document_and_detections(db, filename, detections):
@@ -18,7 +19,8 @@ def create_document_and_detections(db, filename, detections):
 			end=d.get("end")
 		)
 		db.add(det)
-	db.commit()
+	with metrics.DB_COMMIT_SECONDS.time():
+		db.commit()
 	db.refresh(doc)
 	return doc.id
 
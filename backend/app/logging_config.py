@@ -49,6 +49,9 @@ def configure_logging():
 
     root.addHandler(handler)
     root.setLevel(level)
+    logging.getLogger("pii_scanner.scan.trace").setLevel(
+        getattr(logging, conf.SCAN_TRACE_LOG_LEVEL.upper(), logging.WARNING)
+    )
 
 
 __all__ = ["configure_logging"]
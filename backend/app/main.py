@@ -1,10 +1,11 @@
 from fastapi import FastAPI
+from fastapi.responses import Response
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 from app.api.v1.endpoints import document, redact, feedback, report, anomaly
 
 # initialize structured logging
-from app import logging_config
+from app import logging_config, metrics
 logging_config.configure_logging()
 
 app = FastAPI()
@@ -14,6 +15,11 @@ app.include_router(feedback.router, prefix="/api/v1")
 app.include_router(report.router, prefix="/api/v1")
 app.include_router(anomaly.router, prefix="/api/v1")
 
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+	return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
 # If a built frontend is present, serve it at the root so the UI and API are on the same origin.
 frontend_build = Path(__file__).resolve().parents[2] / "frontend" / "build"
 if frontend_build.exists():
@@ -1,14 +1,13 @@
-import re
-import yaml
+from app.pii.registry import get_registry
 
-with open("app/pii/registry.yaml") as f:
-    REGISTRY = yaml.safe_load(f)
 
-def detect_pii(text):
+def detect_pii(text, entries=None):
+    # ``entries`` lets callers scan and mask against one snapshot of the rules
+    if entries is None:
+        entries = get_registry().entries()
     results = []
-    for id_type, props in REGISTRY.items():
-        pattern = re.compile(props["regex"])
-        for match in pattern.finditer(text):
+    for id_type, entry in entries.items():
+        for match in entry.pattern.finditer(text):
             results.append({
                 "type": id_type,
                 "value": match.group(),
@@ -2,6 +2,11 @@ import pytesseract
 from PIL import Image
 import io
 
+from app.pii_scanner.ocr import cached_ocr
+from app.pii_scanner.ocr_cache import cache_key
+from app.pii_scanner import ocr_pool
+
 def extract_ocr_text(file_bytes, lang='eng+hin'):
     image = Image.open(io.BytesIO(file_bytes))
-    return pytesseract.image_to_string(image, lang=lang)
+    key = cache_key(image.tobytes(), "image_to_string", lang, f"{image.mode}{image.size}")
+    return cached_ocr(key, lambda: ocr_pool.run(pytesseract.image_to_string, image, lang=lang))
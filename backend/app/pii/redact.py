@@ -0,0 +1,86 @@
+from typing import Dict, List, Tuple
+
+from app.pii.registry import RegistryEntry
+
+# Characters held back between feeds in StreamRedactor; must exceed the longest
+# match any registry rule can produce, plus one for a trailing \b.
+STREAM_OVERLAP = 256
+
+
+def redact_spans(text: str, detections: List[Dict], entries: Dict[str, RegistryEntry]) -> str:
+    """Mask every detection in place, building the output in one pass over ``text``.
+
+    Detections are the dicts returned by detect_pii. Where two overlap, the
+    one starting first wins and the rest of the other is left masked by it.
+    """
+    parts = []
+    cursor = 0
+    for d in sorted(detections, key=lambda d: (d["start"], -d["end"])):
+        if d["start"] < cursor:
+            continue
+        parts.append(text[cursor:d["start"]])
+        parts.append(entries[d["type"]].mask(d["value"]))
+        cursor = d["end"]
+    parts.append(text[cursor:])
+    return "".join(parts)
+
+
+class StreamRedactor:
+    """Incremental redact_spans for text that arrives in pieces.
+
+    feed() returns the redacted text that is final so far; only about
+    ``2 * overlap`` characters are buffered, whatever the total size.
+    """
+
+    def __init__(self, entries: Dict[str, RegistryEntry], overlap: int = STREAM_OVERLAP) -> None:
+        self.entries = entries
+        self.overlap = overlap
+        self.count = 0  # detections redacted so far
+        self._buffer = ""
+        self._base = 0  # absolute offset of _buffer[0]
+        self._written = 0  # absolute offset up to which output was returned
+        # per type: absolute offset before which it has nothing left to report
+        self._cursors = dict.fromkeys(entries, 0)
+        self._pending: List[Tuple[int, int, str]] = []
+
+    def feed(self, text: str, final: bool = False) -> str:
+        self._buffer += text
+        buffer, base = self._buffer, self._base
+        if not final and len(buffer) - (min(self._cursors.values(), default=base) - base) < 2 * self.overlap:
+            return ""
+
+        # matches starting before ``limit`` cannot change with text still to come
+        limit = len(buffer) if final else len(buffer) - self.overlap
+        for id_type, entry in self.entries.items():
+            for match in entry.pattern.finditer(buffer, self._cursors[id_type] - base):
+                if match.start() >= limit:
+                    break
+                self._cursors[id_type] = base + match.end()
+                if match.end() > match.start():
+                    self._pending.append((base + match.start(), base + match.end(), id_type))
+            self._cursors[id_type] = max(self._cursors[id_type], base + limit)
+
+        safe = base + len(buffer) if final else min(self._cursors.values(), default=base + limit)
+        parts = []
+        self._pending.sort(key=lambda p: (p[0], -p[1]))
+        done = 0
+        for start, end, id_type in self._pending:
+            if start >= safe:
+                break
+            done += 1
+            if start < self._written:
+                continue
+            parts.append(buffer[self._written - base:start - base])
+            parts.append(self.entries[id_type].mask(buffer[start - base:end - base]))
+            self._written = end
+            self.count += 1
+        del self._pending[:done]
+        if safe > self._written:
+            parts.append(buffer[self._written - base:safe - base])
+            self._written = safe
+
+        # keep the overlap before the cursors so \b and lookbehinds still see it
+        trim = max(base, min(self._written, safe) - self.overlap)
+        self._buffer = buffer[trim - base:]
+        self._base = trim
+        return "".join(parts)
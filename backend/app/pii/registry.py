@@ -0,0 +1,87 @@
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Pattern, Tuple
+
+import yaml
+
+from app import config as conf
+from app.pii.mask import mask_value
+from app.pii.validators import VALIDATORS
+
+logger = logging.getLogger("pii_scanner.registry")
+
+
+@dataclass(frozen=True)
+class RegistryEntry:
+    """One PII type from registry.yaml with its regex compiled and names resolved."""
+
+    type: str
+    pattern: Pattern[str]
+    validator: Optional[Callable[[str], bool]]
+    mask_rule: str
+    context_keywords: Tuple[str, ...]
+
+    def mask(self, value: str) -> str:
+        return mask_value(value, self.mask_rule)
+
+
+def _compile(raw) -> Dict[str, RegistryEntry]:
+    entries = {}
+    for id_type, props in (raw or {}).items():
+        validator_name = props.get("validator")
+        if validator_name and validator_name not in VALIDATORS:
+            raise ValueError(f"{id_type}: unknown validator {validator_name!r}")
+        entries[id_type] = RegistryEntry(
+            type=id_type,
+            pattern=re.compile(props["regex"]),
+            validator=VALIDATORS.get(validator_name) if validator_name else None,
+            mask_rule=props.get("mask", ""),
+            context_keywords=tuple(props.get("context_keywords", ())),
+        )
+    return entries
+
+
+class Registry:
+    """Compiled view of the detector registry file.
+
+    The file is only re-read and recompiled when its mtime changes, so rule
+    edits go live without a restart. A file that fails to load keeps the
+    previous rules in place until it is fixed.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime: Optional[int] = None
+        self._entries: Dict[str, RegistryEntry] = {}
+
+    def entries(self) -> Dict[str, RegistryEntry]:
+        """Current rules by type; treat the mapping as read-only, it is replaced on reload."""
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    self._reload(mtime)
+        return self._entries
+
+    def _reload(self, mtime: int) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries = _compile(yaml.safe_load(f))
+        except Exception:
+            if self._mtime is None:
+                raise
+            logger.exception("Failed to reload PII registry; keeping previous rules", extra={"path": self.path})
+        else:
+            self._entries = entries
+            logger.info("Loaded PII registry", extra={"path": self.path, "types": len(entries)})
+        self._mtime = mtime
+
+
+@lru_cache(maxsize=1)
+def get_registry() -> Registry:
+    return Registry(conf.PII_REGISTRY_PATH)
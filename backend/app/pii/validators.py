@@ -41,3 +41,11 @@ def passport_format(value: str) -> bool:
 
 def dl_format(value: str) -> bool:
     return bool(re.match(r"^[A-Z]{2}[0-9]{2}\s?[0-9]{11,12}$", value))
+
+# names used by the ``validator`` field of registry.yaml
+VALIDATORS = {
+    "verhoeff": verhoeff_validate,
+    "pan_format": pan_format,
+    "passport_format": passport_format,
+    "dl_format": dl_format,
+}
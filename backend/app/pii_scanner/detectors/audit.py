@@ -0,0 +1,76 @@
+"""Worst-case timing of detector patterns on adversarial input.
+
+Used by the linearity tests and ``scripts/bench_patterns.py``. Each input is
+a long run of one building block (word characters, digits, separators, near
+misses of the PII shapes) optionally followed by a character that makes the
+final match attempt fail late, which is what exposes backtracking.
+"""
+import time
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Pattern, Sequence, Tuple
+
+from .patterns import Detector
+
+ADVERSARIAL_UNITS = (
+	"a", "A", "0", "2", " ", ".", "-", "_",
+	"aA0.", "a.", "A0", "2345 ", "2345-", "ABCDE", "ABCD0", "a@", "a.b@c", "a@b.", "27ABCDE",
+)
+ADVERSARIAL_TAILS = ("", "@", "@@", "!", " 1", "Z")
+
+
+@dataclass(frozen=True)
+class PatternGrowth:
+	"""Slowest input found for one detector at two input lengths."""
+
+	detector: str
+	label: str
+	small_seconds: float
+	large_seconds: float
+	size_ratio: float
+
+	@property
+	def ratio(self) -> float:
+		return self.large_seconds / max(self.small_seconds, 1e-9)
+
+	def is_superlinear(self, tolerance: float = 3.0, noise_floor: float = 0.005) -> bool:
+		"""True when time grows clearly faster than input (and is big enough to measure)."""
+		return self.large_seconds > noise_floor and self.ratio > self.size_ratio * tolerance
+
+
+def adversarial_inputs(length: int, units: Iterable[str] = ADVERSARIAL_UNITS) -> Iterator[Tuple[str, str]]:
+	"""Yield ``(label, text)`` pairs of about ``length`` characters."""
+	for unit in units:
+		run = unit * max(1, length // len(unit))
+		for tail in ADVERSARIAL_TAILS:
+			yield repr(unit) + "*n" + (" + " + repr(tail) if tail else ""), run + tail
+
+
+def scan_seconds(pattern: Pattern[str], text: str, repeat: int = 3) -> float:
+	"""Best of ``repeat`` timings of a full finditer walk over ``text``."""
+	best = float("inf")
+	for _ in range(repeat):
+		start = time.perf_counter()
+		for _ in pattern.finditer(text):
+			pass
+		best = min(best, time.perf_counter() - start)
+	return best
+
+
+def measure_growth(detectors: Sequence[Detector], sizes: Tuple[int, int] = (2000, 16000)) -> List[PatternGrowth]:
+	"""For each detector, the adversarial input that is slowest at the larger size."""
+	small, large = sizes
+	small_inputs = dict(adversarial_inputs(small))
+	large_inputs = dict(adversarial_inputs(large))
+	report = []
+	for detector in detectors:
+		worst = None
+		for label, text in large_inputs.items():
+			seconds = scan_seconds(detector.pattern, text)
+			if worst is None or seconds > worst[1]:
+				worst = (label, seconds)
+		# re-time the worst input at both sizes so a one-off stall is not mistaken for growth
+		label = worst[0]
+		small_seconds = scan_seconds(detector.pattern, small_inputs[label], repeat=5)
+		large_seconds = min(worst[1], scan_seconds(detector.pattern, large_inputs[label], repeat=5))
+		report.append(PatternGrowth(detector.name, label, small_seconds, large_seconds, large / small))
+	return report
@@ -0,0 +1,79 @@
+import re
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .patterns import get_detector_set
+
+
+def _lower_same_length(text: str) -> str:
+	lowered = text.lower()
+	if len(lowered) == len(text):
+		return lowered
+	# a few characters (e.g. U+0130) grow when lowercased; keep offsets aligned
+	return "".join(ch if len(ch.lower()) != 1 else ch.lower() for ch in text)
+
+
+class KeywordMatcher:
+	"""Compiled matcher for every detector's context keywords."""
+
+	def __init__(self, keywords: Mapping[str, Sequence[str]]) -> None:
+		self.names = tuple(keywords)
+		# keyword -> detector names using it, checked per hit position by first letter
+		by_first: Dict[str, List[Tuple[str, str]]] = {}
+		for name, words in keywords.items():
+			for word in words:
+				word = word.lower()
+				by_first.setdefault(word[0], []).append((word, name))
+		self._by_first = {ch: sorted(entries, key=lambda e: len(e[0])) for ch, entries in by_first.items()}
+		alternatives = sorted({w for entries in by_first.values() for w, _ in entries}, key=len)
+		# zero-width so keywords overlapping each other are all seen
+		self._pattern = re.compile("(?=(?:%s))" % "|".join(re.escape(w) for w in alternatives))
+
+	def index(self, text: str) -> "KeywordIndex":
+		lowered = _lower_same_length(text)
+		starts: Dict[str, List[int]] = {name: [] for name in self.names}
+		ends: Dict[str, List[int]] = {name: [] for name in self.names}
+		for hit in self._pattern.finditer(lowered):
+			pos = hit.start()
+			seen = set()
+			# shortest keyword first: it fits any window the longer ones at ``pos`` fit
+			for word, name in self._by_first[lowered[pos]]:
+				if name not in seen and lowered.startswith(word, pos):
+					seen.add(name)
+					starts[name].append(pos)
+					ends[name].append(pos + len(word))
+		return KeywordIndex(starts, ends)
+
+
+class KeywordIndex:
+	"""Offsets of every context keyword in one text, grouped by detector name."""
+
+	__slots__ = ("_starts", "_ends")
+
+	def __init__(self, starts: Dict[str, List[int]], ends: Dict[str, List[int]]) -> None:
+		self._starts = starts
+		self._ends = ends
+
+	def distance(self, name: str, start: int, end: int, window: int) -> Optional[int]:
+		"""Gap in characters between ``[start, end)`` and the nearest keyword of
+		detector ``name`` lying wholly within ``window`` characters of it, or None."""
+		starts = self._starts.get(name)
+		if not starts:
+			return None
+		ends = self._ends[name]
+		lo, hi = start - window, end + window
+		best = None
+		i = bisect_left(starts, lo)
+		while i < len(starts) and starts[i] < hi:
+			if ends[i] <= hi:
+				gap = max(0, start - ends[i], starts[i] - end)
+				if best is None or gap < best:
+					best = gap
+			i += 1
+		return best
+
+
+@lru_cache(maxsize=1)
+def get_keyword_matcher() -> KeywordMatcher:
+	return KeywordMatcher({detector.name: detector.keywords for detector in get_detector_set()})
@@ -1,7 +1,11 @@
 # moved from src/pii_scanner/detectors/patterns.py
 import re
-from dataclasses import dataclass
-from typing import Callable, Optional, Pattern, Dict, List
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from operator import itemgetter
+from typing import Callable, Optional, Pattern, Match, Dict, List, Tuple, Iterator, Sequence
+from .prefilter import Prefilter, TextIndex
 from .validators import (
 	is_valid_aadhaar,
 	is_valid_pan,
@@ -16,14 +20,74 @@ from .validators import (
 	is_valid_upi,
 	normalize_digits,
 )
-@dataclass
+@dataclass(frozen=True)
 class Detector:
 	name: str
 	pattern: Pattern[str]
 	validator: Optional[Callable[[str], bool]]
 	mask: Callable[[str], str]
-	keywords: List[str]
+	keywords: Tuple[str, ...]
 	risk: int  # 1-5
+	prefilter: Prefilter = Prefilter()
+	# Optional bulk form of ``validator`` used by scan_texts; same verdicts, one call per batch.
+	batch_validator: Optional[Callable[[Sequence[str]], List[bool]]] = None
+
+@dataclass(frozen=True)
+class DetectorSet:
+	"""Compiled, immutable set of detectors shared by every scan."""
+	detectors: Tuple[Detector, ...]
+	_codes: Dict[str, int] = field(init=False, repr=False, compare=False)
+
+	def __post_init__(self) -> None:
+		object.__setattr__(self, "_codes", {detector.name: i for i, detector in enumerate(self.detectors)})
+
+	def __iter__(self) -> Iterator[Detector]:
+		return iter(self.detectors)
+
+	def __len__(self) -> int:
+		return len(self.detectors)
+
+	def get(self, name: str) -> Optional[Detector]:
+		code = self._codes.get(name)
+		return None if code is None else self.detectors[code]
+
+	def code(self, name: str) -> int:
+		"""Small integer identifying a detector within this set (its position)."""
+		return self._codes[name]
+
+	def select(self, index: TextIndex) -> Tuple[Detector, ...]:
+		"""Return the detectors whose prefilter admits ``index``; the rest cannot match."""
+		return tuple(detector for detector in self.detectors if detector.prefilter.allows(index))
+
+	def find_matches(
+		self,
+		text: str,
+		detectors: Optional[Sequence[Detector]] = None,
+		deadline: Optional[float] = None,
+		timings: Optional[Dict[str, float]] = None,
+	) -> List[Tuple[Detector, Match[str]]]:
+		"""Return ``(detector, match)`` for all detectors, ordered by position (ties in detector order).
+
+		With a ``deadline`` (a time.monotonic() value) the detectors not yet run
+		when it passes are skipped; every pattern is linear-time, so one scan
+		cannot overrun it by much. If ``timings`` is given, each detector's scan
+		time in seconds is stored in it by name.
+		"""
+		if detectors is None:
+			detectors = self.detectors
+		# Plain per-detector scans keep each pattern's own prefix/charset fast path in
+		# CPython's re; the candidates are then ordered with a single sort.
+		candidates = []
+		for index, detector in enumerate(detectors):
+			if deadline is not None and time.monotonic() > deadline:
+				break
+			started = time.perf_counter() if timings is not None else 0.0
+			for match in detector.pattern.finditer(text):
+				candidates.append((match.start(1), index, detector, match))
+			if timings is not None:
+				timings[detector.name] = time.perf_counter() - started
+		candidates.sort(key=itemgetter(0, 1))
+		return [(detector, match) for _, _, detector, match in candidates]
 
 def _mask_keep_last4(value: str) -> str:
 	clean = re.sub(r"\s", "", value)
@@ -63,82 +127,97 @@ def build_detectors() -> List[Detector]:
 	return [
 		   Detector(
 			   name="AADHAAR",
-			   pattern=re.compile(r"([2-9][0-9]{3}[\s\-\n\r]*[0-9]{4}[\s\-\n\r]*[0-9]{4})"),
+			   pattern=re.compile(r"([2-9][0-9]{3}[\s\-]{0,3}[0-9]{4}[\s\-]{0,3}[0-9]{4})"),
 			   validator=None,
 			   mask=_mask_keep_last4,
-			   keywords=CONTEXT_KEYWORDS["AADHAAR"],
+			   keywords=tuple(CONTEXT_KEYWORDS["AADHAAR"]),
 			   risk=5,
+			   prefilter=Prefilter(min_digit_run=4, min_digits=12),
 		   ),
 		   Detector(
 			   name="PAN",
 			pattern=re.compile(r"\b([A-Z]{5}[0-9]{4}[A-Z])\b"),
 			   validator=is_valid_pan,
 			   mask=_mask_keep_first3_last1,
-			   keywords=CONTEXT_KEYWORDS["PAN"],
+			   keywords=tuple(CONTEXT_KEYWORDS["PAN"]),
 			   risk=4,
+			   prefilter=Prefilter(min_digit_run=4, min_upper_token=10),
 		   ),
 		   Detector(
 			   name="PASSPORT",
 			pattern=re.compile(r"\b([A-PR-WY][0-9]{7})\b"),
 			   validator=is_valid_passport,
 			   mask=_mask_keep_first3_last1,
-			   keywords=CONTEXT_KEYWORDS["PASSPORT"],
+			   keywords=tuple(CONTEXT_KEYWORDS["PASSPORT"]),
 			   risk=4,
+			   prefilter=Prefilter(min_digit_run=7, min_upper_token=8),
 		   ),
 		   Detector(
 			   name="EPIC",
 			   pattern=re.compile(r"([A-Z]{3}[0-9]{7})"),
 			   validator=is_valid_epic,
 			   mask=_mask_keep_first3_last1,
-			   keywords=CONTEXT_KEYWORDS["EPIC"],
+			   keywords=tuple(CONTEXT_KEYWORDS["EPIC"]),
 			   risk=3,
+			   prefilter=Prefilter(min_digit_run=7, min_upper_token=10),
 		   ),
 		Detector(
 			name="DL",
 			pattern=re.compile(r"\b([A-Z]{2}-?[0-9]{2}-?[0-9]{11,12})\b"),
 			validator=None,
 			mask=_mask_keep_first3_last1,
-			keywords=CONTEXT_KEYWORDS["DL"],
+			keywords=tuple(CONTEXT_KEYWORDS["DL"]),
 			risk=3,
+			prefilter=Prefilter(min_digit_run=11),
 		),
 		   Detector(
 			   name="IFSC",
-			   pattern=re.compile(r"([A-Z]{4}[0-9A-Z]{7,})"),
+			   pattern=re.compile(r"([A-Z]{4}[0-9A-Z]{7,24})"),
 			   validator=is_valid_ifsc,
 			   mask=_mask_keep_first3_last1,
-			   keywords=CONTEXT_KEYWORDS["IFSC"],
+			   keywords=tuple(CONTEXT_KEYWORDS["IFSC"]),
 			   risk=2,
+			   prefilter=Prefilter(min_upper_token=11),
 		   ),
 		   Detector(
 			   name="GSTIN",
 			   pattern=re.compile(r"([0-9]{2}[A-Z]{5}[0-9]{4}[A-Z][A-Z0-9]Z[A-Z0-9])"),
 			   validator=is_valid_gstin,
 			   mask=_mask_keep_first3_last1,
-			   keywords=CONTEXT_KEYWORDS["GSTIN"],
+			   keywords=tuple(CONTEXT_KEYWORDS["GSTIN"]),
 			   risk=3,
+			   prefilter=Prefilter(min_digit_run=4, min_upper_token=15),
 		   ),
 		   Detector(
 			   name="TAN",
 			   pattern=re.compile(r"([A-Z]{4}[0-9]{5}[A-Z])"),
 			   validator=is_valid_tan,
 			   mask=_mask_keep_first3_last1,
-			   keywords=CONTEXT_KEYWORDS["TAN"],
+			   keywords=tuple(CONTEXT_KEYWORDS["TAN"]),
 			   risk=2,
+			   prefilter=Prefilter(min_digit_run=5, min_upper_token=10),
 		   ),
 		   Detector(
 			   name="UPI",
-			   pattern=re.compile(r"([a-zA-Z0-9.\-_]{2,256}@[a-zA-Z]{2,64})"),
+			   pattern=re.compile(r"(?<![a-zA-Z0-9.\-_])([a-zA-Z0-9.\-_]{2,256}@[a-zA-Z]{2,64})"),
 			   validator=is_valid_upi,
 			   mask=_mask_keep_first3_last1,
-			   keywords=CONTEXT_KEYWORDS["UPI"],
+			   keywords=tuple(CONTEXT_KEYWORDS["UPI"]),
 			   risk=2,
+			   prefilter=Prefilter(needs_at=True),
 		   ),
 		   Detector(
 			   name="EMAIL",
-			   pattern=re.compile(r"([a-zA-Z0-9_.+\-]+@[a-zA-Z0-9\-]+\.[a-zA-Z0-9\-.]+)"),
+			   pattern=re.compile(r"(?<![a-zA-Z0-9_.+\-])([a-zA-Z0-9_.+\-]{1,64}@[a-zA-Z0-9\-]{1,63}\.[a-zA-Z0-9\-.]{1,190})"),
 			   validator=is_valid_email,
 			   mask=_mask_email,
-			   keywords=CONTEXT_KEYWORDS["EMAIL"],
+			   keywords=tuple(CONTEXT_KEYWORDS["EMAIL"]),
 			   risk=2,
+			   prefilter=Prefilter(needs_at=True),
 		   ),
 	]
+
+@lru_cache(maxsize=1)
+def get_detector_set() -> DetectorSet:
+	"""Return the process-wide detector set, compiling the patterns on first use."""
+	return DetectorSet(tuple(build_detectors()))
@@ -1,6 +1,9 @@
 # moved from src/pii_scanner/detectors/validators.py
 import re
 from typing import Optional
+
+from ..normalize import DIGIT_TABLE
+
 _d_table = [
 	[0, 1, 2, 3, 4, 5, 6, 7, 8, 9],
 	[1, 2, 3, 4, 0, 6, 7, 8, 9, 5],
@@ -68,5 +71,5 @@ def is_valid_upi(upi: str) -> bool:
 	return True
 
 def normalize_digits(text: str) -> str:
-	# DEMO: Do not normalize, just return the text as-is
-	return text
+	"""Fold every Unicode decimal digit script to ASCII; lengths are unchanged."""
+	return text.translate(DIGIT_TABLE)
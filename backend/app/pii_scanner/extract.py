@@ -1,122 +1,484 @@
-
-
-import tika
-from tika import parser
-from .ocr import extract_ocr_text
+from .docx_xml import iter_docx_blocks
+from .ocr import cached_ocr, extract_ocr_text, get_ocr_cache
+from .ocr_cache import cache_key, page_fingerprint
+from .ocr_pool import OcrUnavailable
+from . import ocr_pool
+from .pages import profile_page
+from .preprocess import get_profile, prepare, preprocess
+from .render import iter_pdf_images, render_ahead
 from PIL import Image
+import codecs
+import dataclasses
 import io
+import mmap
+import os
 import logging
+import re
+import tempfile
+import time
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from multiprocessing import get_context
 from .. import config as conf
+from .. import metrics
 
 logger = logging.getLogger("pii_scanner.extract")
+
+# A PDF read by Tika with fewer characters than this is OCRed instead
+MIN_TEXT_CHARS = 50
+# page ranges queued per PDF worker; more than one keeps the pool busy when page costs differ
+RANGES_PER_WORKER = 4
 logging.basicConfig(level=logging.INFO)
 
-def extract_text(file_bytes, filename):
+# One full-page pass, then digits-only re-reads of the numbers it was unsure of
+OCR_CONFIG = r'--oem 3 --psm 3'
+DIGITS_CONFIG = r'--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789'
+# words read with less confidence than this are re-read digits-only if they look numeric
+NUMERIC_REOCR_CONFIDENCE = 80
+# characters Tesseract commonly reads in place of digits
+_DIGIT_LOOKALIKES = frozenset("0123456789OoDQIl|iSsBZzGg")
+# pixels kept around each re-read word, and between words in the re-read strip
+_REOCR_PADDING = 4
+
+def _tesseract():
+    import pytesseract
+    # ensure tesseract command is known
+    try:
+        pytesseract.pytesseract.tesseract_cmd = conf.TESSERACT_CMD
+    except Exception:
+        pass
+    return pytesseract
+
+def _looks_numeric(word):
+    chars = [c for c in word if c.isalnum() or c == "|"]
+    return (len(chars) >= 4 and any(c.isdigit() for c in chars)
+            and all(c in _DIGIT_LOOKALIKES for c in chars))
+
+def _reocr_digits(pytesseract, img, boxes):
+    """Digits-only text of each ``(left, top, width, height)`` box of ``img`` ('' where none was read).
+
+    The boxes are stacked into one strip so Tesseract runs once however many
+    there are; words are mapped back to boxes by their vertical position.
+    """
+    pad = _REOCR_PADDING
+    crops = [img.crop((max(0, left - pad), max(0, top - pad), left + width + pad, top + height + pad))
+             for left, top, width, height in boxes]
+    strip = Image.new("L", (max(c.width for c in crops) + 2 * pad, sum(c.height + pad for c in crops) + pad), 255)
+    tops = []
+    y = pad
+    for crop in crops:
+        strip.paste(crop.convert("L"), (pad, y))
+        tops.append(y)
+        y += crop.height + pad
+    data = pytesseract.image_to_data(strip, config=DIGITS_CONFIG, output_type=pytesseract.Output.DICT)
+    found = [[] for _ in crops]
+    for text, left, top, height in zip(data["text"], data["left"], data["top"], data["height"]):
+        text = str(text).strip()
+        index = bisect_right(tops, top + height / 2) - 1
+        if text and index >= 0:
+            found[index].append((left, text))
+    return ["".join(text for _, text in sorted(parts)) for parts in found]
+
+def _read_word_boxes(img, config=OCR_CONFIG, stage="general"):
+    """OCR a preprocessed image in one pass, re-reading doubtful numbers digits-only.
+
+    Returns ``[line key, text, confidence, (left, top, width, height)]`` per
+    word in reading order. Words come from a single image_to_data pass.
+    Those that look numeric but were read with confidence below
+    NUMERIC_REOCR_CONFIDENCE are re-read with the digits whitelist in one
+    further call (see _reocr_digits), and each re-read replaces its word in
+    place, so the text stays aligned and no number is reported twice.
+    Raises if the main pass fails.
+    """
+    pytesseract = _tesseract()
+    with metrics.OCR_PASS_SECONDS.time(stage=stage):
+        data = pytesseract.image_to_data(img, config=config, output_type=pytesseract.Output.DICT)
+    # [line key, text, confidence, box] in reading order
+    words = [
+        [(data["block_num"][i], data["par_num"][i], data["line_num"][i]), str(text).strip(), float(data["conf"][i]),
+         (data["left"][i], data["top"][i], data["width"][i], data["height"][i])]
+        for i, text in enumerate(data["text"]) if str(text).strip()
+    ]
+    doubtful = [w for w in words if w[2] < NUMERIC_REOCR_CONFIDENCE and _looks_numeric(w[1])]
+    if doubtful:
+        try:
+            with metrics.OCR_PASS_SECONDS.time(stage="digits"):
+                reread = _reocr_digits(pytesseract, img, [w[3] for w in doubtful])
+        except Exception:
+            reread = []
+        for word, digits in zip(doubtful, reread):
+            if digits:
+                word[1] = digits
+    return words
+
+def _join_lines(words):
+    lines = []
+    key = None
+    for word in words:
+        if word[0] != key:
+            lines.append([])
+            key = word[0]
+        lines[-1].append(word[1])
+    return "\n".join(" ".join(line) for line in lines)
+
+def _read_words(img):
+    return _join_lines(_read_word_boxes(img))
+
+def _ocr_words(img):
+    """_read_words on an OCR pool worker (see ocr_pool.run)."""
+    return ocr_pool.run(_read_words, img)
+
+# OCR settings that change the text read from the same pixels, part of every cache key
+_OCR_KEY = (OCR_CONFIG, DIGITS_CONFIG, str(NUMERIC_REOCR_CONFIDENCE))
+
+# Adaptive DPI: words of the low-DPI pass read with less confidence than
+# ADAPTIVE_CONFIDENCE, or less than PII_SHAPED_CONFIDENCE if they look like
+# part of an identifier, are re-read from a high-DPI render of their line
+ADAPTIVE_CONFIDENCE = 60
+PII_SHAPED_CONFIDENCE = 90
+_PII_SHAPED = re.compile(r"\d{3}|@|[A-Za-z]{3}\d")
+# more doubtful lines than this and the whole page is OCRed at high DPI
+ADAPTIVE_MAX_REGIONS = 12
+REGION_CONFIG = r'--oem 3 --psm 6'
+# points added around a re-read region
+_REGION_PADDING = 3
+_ADAPTIVE_KEY = (str(ADAPTIVE_CONFIDENCE), str(PII_SHAPED_CONFIDENCE), _PII_SHAPED.pattern,
+                 str(ADAPTIVE_MAX_REGIONS), REGION_CONFIG)
+
+def _ocr_image(img):
+    """_ocr_words through the OCR cache, keyed by the preprocessed pixels; "" if Tesseract fails.
+
+    OcrUnavailable (queue full, request cancelled) propagates, as it does
+    from every OCR path here, so it is never mistaken for an empty page.
+    """
+    key = cache_key(img.tobytes(), *_OCR_KEY, f"{img.mode}{img.size}")
+    try:
+        return cached_ocr(key, lambda: _ocr_words(img))
+    except OcrUnavailable:
+        raise
+    except Exception:
+        return ""
+
+def _ocr_page_image(img, cached=True, profile=None):
+    """Preprocess a rendered page (PIL image) with an OcrProfile and return its OCR text.
+
+    ``profile`` defaults to OCR_PROFILE. With ``cached=False`` the pixel
+    cache is skipped and OCR failures raise, for callers that cache the page
+    under their own key.
+    """
+    import cv2
+    import numpy as np
+    img_np = np.array(img)
+    gray = cv2.cvtColor(img_np, cv2.COLOR_RGB2GRAY) if img_np.ndim == 3 else img_np
+    processed = preprocess(gray, profile or get_profile())
+    return _ocr_image(processed) if cached else _ocr_words(processed)
+
+def _render_gray(page, dpi, clip=None):
+    """A PyMuPDF page (or its ``clip`` rect) rendered at ``dpi`` as a grayscale numpy array."""
+    import fitz
+    import numpy as np
+    pix = page.get_pixmap(dpi=dpi, clip=clip, colorspace=fitz.csGRAY, alpha=False)
+    return np.frombuffer(pix.samples, np.uint8).reshape(pix.height, pix.stride)[:, :pix.width]
+
+def _needs_high_dpi(word):
+    text, confidence = word[1], word[2]
+    return confidence < ADAPTIVE_CONFIDENCE or (
+        confidence < PII_SHAPED_CONFIDENCE and _PII_SHAPED.search(text) is not None)
+
+def _doubtful_spans(words):
+    """``(first, last)`` word indexes spanning each line's words that need a high-DPI re-read."""
+    spans = []
+    for i, word in enumerate(words):
+        if _needs_high_dpi(word):
+            if spans and words[spans[-1][0]][0] == word[0]:
+                spans[-1][1] = i
+            else:
+                spans.append([i, i])
+    return spans
+
+def _ocr_pdf_page_adaptive(page, profile, low_dpi, high_dpi):
+    """OCR a page at ``low_dpi``, then re-read only its doubtful lines at ``high_dpi``.
+
+    Each line's run of words that were read with low confidence, or that
+    look like part of an identifier (see _needs_high_dpi), is re-rendered
+    from the PDF at ``high_dpi`` with a clip rect and OCRed again, and the
+    re-read replaces the run in place. Pages with more than
+    ADAPTIVE_MAX_REGIONS such runs are OCRed whole at ``high_dpi`` instead.
+    Raises if OCR fails.
+    """
+    prepared = prepare(_render_gray(page, low_dpi), profile)
+    words = ocr_pool.run(_read_word_boxes, prepared.image)
+    spans = _doubtful_spans(words)
+    if len(spans) > ADAPTIVE_MAX_REGIONS:
+        return ocr_pool.run(_read_words, preprocess(_render_gray(page, high_dpi), profile))
+    # regions are small and already at the resolution we want; keep them whole and unscaled
+    region_profile = dataclasses.replace(profile, crop_margins=False, glyph_height=0)
+    to_points = 72 / low_dpi
+    for first, last in reversed(spans):
+        boxes = [word[3] for word in words[first:last + 1]]
+        x0, y0, x1, y1 = prepared.source_box(
+            min(b[0] for b in boxes), min(b[1] for b in boxes),
+            max(b[0] + b[2] for b in boxes), max(b[1] + b[3] for b in boxes),
+        )
+        clip = page.rect & (
+            x0 * to_points - _REGION_PADDING, y0 * to_points - _REGION_PADDING,
+            x1 * to_points + _REGION_PADDING, y1 * to_points + _REGION_PADDING,
+        )
+        if clip.is_empty:
+            continue
+        region = preprocess(_render_gray(page, high_dpi, clip), region_profile)
+        reread = ocr_pool.run(_read_word_boxes, region, REGION_CONFIG, "region")
+        if reread:
+            words[first:last + 1] = [[words[first][0], " ".join(word[1] for word in reread), 100.0, words[first][3]]]
+    return _join_lines(words)
+
+def _ocr_pdf_page(page, dpi=None, profile=None):
+    """Render a PyMuPDF page at ``dpi`` (OCR_DPI) and OCR it.
+
+    With OCR_ADAPTIVE_DPI the page is read at OCR_LOW_DPI first and only
+    its doubtful lines at ``dpi`` (see _ocr_pdf_page_adaptive). Pages built
+    from embedded images are looked up in the OCR cache by their image
+    streams (see ocr_cache.page_fingerprint) before rendering, so a scan
+    that repeats across pages or uploads is rendered and OCRed once.
+    """
+    def render_and_ocr(cached):
+        if adaptive:
+            return _ocr_pdf_page_adaptive(page, profile, conf.OCR_LOW_DPI, dpi)
+        pix = page.get_pixmap(dpi=dpi)
+        img = Image.frombytes("RGB" if pix.n >= 3 else "L", (pix.width, pix.height), pix.samples)
+        return _ocr_page_image(img, cached=cached, profile=profile)
+
+    dpi = dpi or conf.OCR_DPI
+    profile = profile or get_profile()
+    adaptive = conf.OCR_ADAPTIVE_DPI and conf.OCR_LOW_DPI < dpi
+    fingerprint = page_fingerprint(page, dpi) if get_ocr_cache() is not None else None
+    if fingerprint is None and not adaptive:
+        return render_and_ocr(True)
+    try:
+        if fingerprint is None:
+            return render_and_ocr(False)
+        mode = ("adaptive", str(conf.OCR_LOW_DPI), *_ADAPTIVE_KEY) if adaptive else ()
+        key = cache_key(fingerprint, "pdf_page", profile.key, *_OCR_KEY, *mode)
+        return cached_ocr(key, lambda: render_and_ocr(False))
+    except OcrUnavailable:
+        raise
+    except Exception:
+        return ""
+
+def _layer_text(page):
+    """The page's text layer, or None if profile_page says it must be OCRed."""
+    text = page.get_text()
+    return None if profile_page(page, text).needs_ocr else text
+
+def _page_range_texts(path, start, stop):
+    """_layer_text of pages ``start`` to ``stop - 1``; runs in a pool worker, which opens the file itself."""
+    import fitz
+    with fitz.open(path) as pdf:
+        return [_layer_text(pdf[number]) for number in range(start, stop)]
+
+def _layer_texts(pdf, file_bytes):
+    """Yield _layer_text of every page, in page order.
+
+    PDFs of at least PDF_PARALLEL_MIN_PAGES pages are split into page ranges
+    read on a pool of PDF_WORKERS processes (0 = one per CPU); ranges are
+    yielded as soon as they and every range before them are done.
+    """
+    workers = conf.PDF_WORKERS or os.cpu_count() or 1
+    page_count = pdf.page_count
+    if workers == 1 or page_count < conf.PDF_PARALLEL_MIN_PAGES:
+        for page in pdf:
+            yield _layer_text(page)
+        return
+    size = max(1, -(-page_count // (workers * RANGES_PER_WORKER)))
+    starts = range(0, page_count, size)
+    stops = [min(start + size, page_count) for start in starts]
+    # workers open a temporary copy by path, sharing it through the page cache
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as f:
+        f.write(file_bytes)
+        f.flush()
+        # spawn, not fork: the server process runs threads
+        with ProcessPoolExecutor(max_workers=min(workers, len(starts)), mp_context=get_context("spawn")) as pool:
+            for chunk in pool.map(_page_range_texts, repeat(f.name), starts, stops):
+                yield from chunk
+
+def _pdf_pages(pdf, file_bytes, profile=None):
+    """Yield ``(page_no, text, ocr_seconds)``, OCRing only the pages profile_page flags.
+
+    ``ocr_seconds`` is None for pages whose text layer was used. Text layers
+    of large PDFs are read in parallel (see _layer_texts); flagged pages are
+    OCRed here, in page order, on the OCR pool.
+    """
+    for number, text in enumerate(_layer_texts(pdf, file_bytes), 1):
+        if text is None:
+            started = time.perf_counter()
+            text = _ocr_pdf_page(pdf[number - 1], profile=profile)
+            yield number, text, time.perf_counter() - started
+        else:
+            yield number, text, None
+
+def _pdf_text(file_bytes, info=None, profile=None):
+    import fitz
+    started = time.perf_counter()
+    texts = []
+    ocr_seconds = []
+    with fitz.open(stream=file_bytes, filetype='pdf') as pdf:
+        for _, text, seconds in _pdf_pages(pdf, file_bytes, profile):
+            texts.append(text)
+            if seconds is not None:
+                ocr_seconds.append(seconds)
+                metrics.EXTRACT_SECONDS.observe(seconds, method="ocr")
+    metrics.EXTRACT_SECONDS.observe(time.perf_counter() - started - sum(ocr_seconds), method="pymupdf")
+    if info is not None:
+        info["ocr_pages"] = len(ocr_seconds)
+    return "\n".join(texts)
+
+def _docx_text(file_bytes):
+    with metrics.EXTRACT_SECONDS.time(method="docx"):
+        return "\n".join(iter_docx_blocks(io.BytesIO(file_bytes)))
+
+def _tika_text(file_bytes):
+    # imported here so the native paths never load Tika (or start its JVM)
+    from tika import parser
+    with metrics.EXTRACT_SECONDS.time(method="tika"):
+        parsed = parser.from_buffer(file_bytes)
+    return parsed.get("content", "") or ""
+
+def _native_text(file_bytes, filename, info=None, profile=None):
+    """``(text, method)`` from PyMuPDF or docx_xml, or ``(None, None)`` if they cannot read the file."""
+    is_pdf = filename.lower().endswith('.pdf')
+    try:
+        if is_pdf:
+            return _pdf_text(file_bytes, info, profile), "pymupdf"
+        return _docx_text(file_bytes), "docx"
+    except OcrUnavailable:
+        raise
+    except Exception as e:
+        logger.warning("Native extraction failed for %s, falling back to Tika: %s", filename, e)
+        return None, None
+
+def extract_text(file_bytes, filename, info=None, ocr_profile=None):
+    """Text of an uploaded file; ``info``, if given, gets the ``extractor`` that produced it.
+
+    PDFs and DOCX files are read in-process with PyMuPDF and docx_xml;
+    Tika is only used for files those cannot open. PDF pages that look
+    scanned or garbled (see pages.profile_page) are OCRed one by one and
+    counted in ``info["ocr_pages"]``; a PDF only Tika could read is OCRed
+    whole if it has too little text. Images and pages are preprocessed with
+    the ``ocr_profile`` named (see preprocess.PROFILES), OCR_PROFILE if None.
+    """
+    profile = get_profile(ocr_profile)
+    if info is not None:
+        info["extractor"] = None
+        info["ocr_pages"] = 0
     try:
         if filename.lower().endswith(('.txt', '.csv', '.log')):
             text = file_bytes.decode(errors='ignore')
             logger.info(f"Extracted text from TXT: {len(text)} chars")
+            if info is not None:
+                info["extractor"] = "text"
             return text
         elif filename.lower().endswith(('.pdf', '.docx')):
-            parsed = parser.from_buffer(file_bytes)
-            content = parsed.get("content", "")
-            logger.info(f"Tika extracted from {filename}: {len(content or '')} chars")
-            # If Tika fails to extract, or text is too short, try OCR on each page image
-            if (not content or len(content.strip()) < 50) and filename.lower().endswith('.pdf'):
+            content, method = _native_text(file_bytes, filename, info, profile)
+            if content is None:
+                content, method = _tika_text(file_bytes), "tika"
+            logger.info(f"Extracted {len(content)} chars from {filename} with {method}")
+            if info is not None:
+                info["extractor"] = method
+            # If Tika's text is missing or too short, try OCR on each page image
+            if method == "tika" and len(content.strip()) < MIN_TEXT_CHARS and filename.lower().endswith('.pdf'):
+                ocr_started = time.perf_counter()
                 try:
-                    from pdf2image import convert_from_bytes
-                    poppler_path = conf.POPPLER_PATH
-                    import pytesseract
-                    import cv2
-                    import numpy as np
-                    from PIL import Image
-                    # render at higher DPI for better OCR
-                    images = convert_from_bytes(file_bytes, poppler_path=poppler_path, dpi=300)
-                    logger.info(f"PDF2Image produced {len(images)} images for OCR")
+                    # pages are rendered a few ahead of OCR, never all at once
+                    images = render_ahead(iter_pdf_images(file_bytes, conf.OCR_DPI, conf.POPPLER_PATH), conf.OCR_RENDER_AHEAD)
                     ocr_texts = []
                     for i, img in enumerate(images):
-                        # Preprocess image for OCR
-                        img_np = np.array(img)
-                        if img_np.ndim == 3:
-                            gray = cv2.cvtColor(img_np, cv2.COLOR_RGB2GRAY)
-                        else:
-                            gray = img_np
-                        # denoise and enhance
-                        gray = cv2.bilateralFilter(gray, 9, 75, 75)
-                        gray = cv2.GaussianBlur(gray, (3, 3), 0)
-                        # Adaptive thresholding
-                        thresh = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                                                      cv2.THRESH_BINARY, 11, 2)
-                        # morphological opening to remove small noise
-                        kernel = np.ones((1, 1), np.uint8)
-                        processed = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, kernel)
-                        pil_img = Image.fromarray(processed)
-                        # ensure tesseract command is known
-                        try:
-                            pytesseract.pytesseract.tesseract_cmd = conf.TESSERACT_CMD
-                        except Exception:
-                            pass
-                        # general OCR (captures emails, text)
-                        try:
-                            ocr_general = pytesseract.image_to_string(pil_img, config=r'--oem 3 --psm 3')
-                        except Exception:
-                            ocr_general = ""
-                        # digits-only OCR (helps numeric PII like Aadhaar)
-                        try:
-                            ocr_digits = pytesseract.image_to_string(pil_img, config=r'--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789')
-                        except Exception:
-                            ocr_digits = ""
-                        ocr_result = (ocr_general or "") + "\n" + (ocr_digits or "")
-                        logger.info(f"Raw OCR output (page {i+1}): {repr(ocr_result)}")
+                        ocr_result = _ocr_page_image(img, profile=profile)
+                        logger.debug("OCR page %d: %d chars", i + 1, len(ocr_result))
                         ocr_texts.append(ocr_result)
+                    logger.info(f"OCRed {len(ocr_texts)} rendered pages")
                     ocr_text = "\n".join(ocr_texts)
+                    metrics.EXTRACT_SECONDS.observe(time.perf_counter() - ocr_started, method="ocr")
                     logger.info(f"Total OCR text: {len(ocr_text or '')} chars")
+                    if info is not None:
+                        info["extractor"] = "ocr"
                     return ocr_text or ""
+                except OcrUnavailable:
+                    raise
                 except Exception as e:
                     logger.error(f"OCR extraction failed: {e}")
                     return ""
-            return content or ""
+            return content
         elif filename.lower().endswith(('.png', '.jpg', '.jpeg')):
             # Image preprocessing for better OCR
+            ocr_started = time.perf_counter()
             import cv2
             import numpy as np
-            from PIL import Image
-            import io
-            import pytesseract
             # Convert bytes to numpy array
             img_array = np.frombuffer(file_bytes, np.uint8)
             img = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
             gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            # denoise and enhance
-            gray = cv2.bilateralFilter(gray, 9, 75, 75)
-            gray = cv2.GaussianBlur(gray, (3, 3), 0)
-            # Adaptive thresholding
-            thresh = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                                          cv2.THRESH_BINARY, 11, 2)
-            kernel = np.ones((1, 1), np.uint8)
-            processed = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, kernel)
-            pil_img = Image.fromarray(processed)
-            # Ensure tesseract command is known
-            try:
-                pytesseract.pytesseract.tesseract_cmd = conf.TESSERACT_CMD
-            except Exception:
-                pass
-            # general OCR
-            try:
-                ocr_general = pytesseract.image_to_string(pil_img, config=r'--oem 3 --psm 3')
-            except Exception:
-                ocr_general = ""
-            # digits-only OCR
-            try:
-                ocr_digits = pytesseract.image_to_string(pil_img, config=r'--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789')
-            except Exception:
-                ocr_digits = ""
-            ocr_result = (ocr_general or "") + "\n" + (ocr_digits or "")
-            logger.info(f"Raw OCR output: {repr(ocr_result)}")
+            if info is not None:
+                info["extractor"] = "ocr"
+            ocr_result = _ocr_image(preprocess(gray, profile))
+            metrics.EXTRACT_SECONDS.observe(time.perf_counter() - ocr_started, method="ocr")
+            logger.debug("OCR output: %d chars", len(ocr_result))
             return ocr_result
         else:
             logger.info(f"Unsupported file type: {filename}")
             return ""
+    except OcrUnavailable:
+        raise
     except Exception as e:
         logger.error(f"extract_text failed: {e}")
         return ""
+
+# bytes of a text file decoded per step by iter_text_file
+TEXT_WINDOW_BYTES = 1024 * 1024
+
+def iter_text_file(path, window=TEXT_WINDOW_BYTES):
+    """Yield a UTF-8 file's text ``window`` bytes at a time, from a memory map.
+
+    A character split across windows is decoded whole with the next one and
+    undecodable bytes are dropped, as extract_text does for text uploads, so
+    offsets into the joined chunks match offsets into extract_text's text.
+    Memory use is one window whatever the file size.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            advise = hasattr(mm, "madvise")
+            if advise:
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            released = 0
+            for start in range(0, len(mm), window):
+                text = decoder.decode(mm[start:start + window])
+                # decoded pages stay resident (and in RSS) until unmapped; drop them
+                done = min(start + window, len(mm)) // mmap.PAGESIZE * mmap.PAGESIZE
+                if advise and hasattr(mmap, "MADV_DONTNEED") and done > released:
+                    mm.madvise(mmap.MADV_DONTNEED, released, done - released)
+                    released = done
+                if text:
+                    yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+def iter_pages(file_bytes, filename, ocr_profile=None):
+    """Yield ``(page_no, text)`` (1-based) as each page is extracted.
+
+    PDFs are read page by page with PyMuPDF, and pages that need it are
+    rendered and OCRed on their own, so a caller can scan page 1 while
+    later pages are still unread. Other formats are one page of extract_text.
+    """
+    if not filename.lower().endswith('.pdf'):
+        yield 1, extract_text(file_bytes, filename, ocr_profile=ocr_profile)
+        return
+    import fitz
+    with fitz.open(stream=file_bytes, filetype='pdf') as pdf:
+        for number, text, ocr_seconds in _pdf_pages(pdf, file_bytes, get_profile(ocr_profile)):
+            if ocr_seconds is not None:
+                metrics.EXTRACT_SECONDS.observe(ocr_seconds, method="ocr")
+            yield number, text
@@ -0,0 +1,140 @@
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .. import config as conf
+from .detectors.patterns import Detector, DetectorSet
+from .normalize import OffsetMap
+
+CONTEXT_WINDOW = conf.CONTEXT_WINDOW
+
+
+class Finding:
+	"""One detection over a normalized text; value, mask and context are sliced on access.
+
+	``start``/``end`` index the normalized text; ``offsets`` maps them back to
+	the original text for reporting.
+	"""
+
+	__slots__ = ("detector", "start", "end", "score", "text", "offsets")
+
+	def __init__(
+		self,
+		detector: Detector,
+		start: int,
+		end: int,
+		score: int,
+		text: str,
+		offsets: Optional[OffsetMap] = None,
+	) -> None:
+		self.detector = detector
+		self.start = start
+		self.end = end
+		self.score = score
+		self.text = text
+		self.offsets = offsets
+
+	@property
+	def type(self) -> str:
+		return self.detector.name
+
+	@property
+	def value(self) -> str:
+		return self.text[self.start:self.end]
+
+	@property
+	def masked_value(self) -> str:
+		return self.detector.mask(self.value)
+
+	@property
+	def context(self) -> str:
+		return self.text[max(0, self.start - CONTEXT_WINDOW):min(len(self.text), self.end + CONTEXT_WINDOW)]
+
+	def original_span(self, offset: int = 0) -> Tuple[int, int]:
+		"""Span in the original text; ``offset`` is added to the normalized span first."""
+		start, end = offset + self.start, offset + self.end
+		if self.offsets:
+			return self.offsets.span_to_original(start, end)
+		return start, end
+
+	def to_dict(self, offset: int = 0) -> Dict[str, Any]:
+		"""Return the JSON shape used in scan reports, with the span in original offsets."""
+		start, end = self.original_span(offset)
+		return {
+			"type": self.detector.name,
+			"value": self.value,
+			"masked_value": self.masked_value,
+			"span": [start, end],
+			"context": self.context,
+			"risk": self.detector.risk,
+			"score": self.score,
+		}
+
+
+class FindingSet:
+	"""Columnar findings for one text.
+
+	Type codes, starts, ends and scores live in compact arrays; Finding objects, masked
+	values, contexts and dicts are only built when asked for, so callers that
+	need counts or spans never allocate per-finding strings.
+	"""
+
+	__slots__ = ("text", "original", "offsets", "detector_set", "mask", "types", "starts", "ends", "scores")
+
+	def __init__(
+		self,
+		text: str,
+		detector_set: DetectorSet,
+		mask: bool = True,
+		original: Optional[str] = None,
+		offsets: Optional[OffsetMap] = None,
+	) -> None:
+		self.text = text
+		self.original = text if original is None else original
+		self.offsets = offsets
+		self.detector_set = detector_set
+		self.mask = mask
+		self.types = array("B")
+		self.starts = array("q")
+		self.ends = array("q")
+		self.scores = array("b")
+
+	def append(self, detector: Detector, start: int, end: int, score: int) -> None:
+		self.types.append(self.detector_set.code(detector.name))
+		self.starts.append(start)
+		self.ends.append(end)
+		self.scores.append(score)
+
+	def __len__(self) -> int:
+		return len(self.starts)
+
+	def __getitem__(self, i: int) -> Finding:
+		detector = self.detector_set.detectors[self.types[i]]
+		return Finding(detector, self.starts[i], self.ends[i], self.scores[i], self.text, self.offsets)
+
+	def __iter__(self) -> Iterator[Finding]:
+		for i in range(len(self)):
+			yield self[i]
+
+	def spans(self) -> List[Tuple[int, int]]:
+		"""Spans in the original text."""
+		if self.offsets:
+			return [self.offsets.span_to_original(s, e) for s, e in zip(self.starts, self.ends)]
+		return list(zip(self.starts, self.ends))
+
+	def max_score(self) -> int:
+		return max(self.scores, default=0)
+
+	def counts(self) -> Dict[str, int]:
+		detectors = self.detector_set.detectors
+		result: Dict[str, int] = {}
+		for code in self.types:
+			name = detectors[code].name
+			result[name] = result.get(name, 0) + 1
+		return result
+
+	def replacements(self) -> List[Tuple[int, int, str]]:
+		"""``(start, end, masked_value)`` in original offsets, ready for redacting ``original``."""
+		return [(*f.original_span(), f.masked_value) for f in self]
+
+	def to_dicts(self) -> List[Dict[str, Any]]:
+		return [f.to_dict() for f in self]
@@ -2,7 +2,62 @@
 import pytesseract
 from PIL import Image
 import io
+import logging
+from functools import lru_cache
+
+from .. import config as conf
+from .. import metrics
+from .ocr_cache import OcrCache, cache_key
+from . import ocr_pool
+
+logger = logging.getLogger("pii_scanner.ocr")
+
+OCR_CACHE_REQUESTS = metrics.REGISTRY.register(metrics.Counter(
+    "pii_ocr_cache_requests_total", "OCR cache lookups by result (hit, miss).", ("result",),
+))
+
+
+@lru_cache(maxsize=1)
+def get_ocr_cache():
+    """The shared OcrCache, or None when OCR_CACHE_DIR is empty."""
+    if not conf.OCR_CACHE_DIR:
+        return None
+    return OcrCache(conf.OCR_CACHE_DIR, conf.OCR_CACHE_MAX_BYTES)
+
+
+def _cache_bytes():
+    cache = get_ocr_cache()
+    return cache.stats()["bytes"] if cache is not None else 0
+
+
+metrics.gauge("pii_ocr_cache_bytes", "Bytes held by the on-disk OCR cache.", _cache_bytes)
+
+
+def cached_ocr(key, compute):
+    """``compute()`` through the OCR cache; exceptions propagate and are not cached.
+
+    A cache that cannot be read or written (read-only or full disk) only
+    costs the OCR it would have saved.
+    """
+    cache = get_ocr_cache()
+    if cache is None:
+        return compute()
+    try:
+        text = cache.get(key)
+    except OSError as e:
+        logger.debug("OCR cache read failed: %s", e)
+        text = None
+    OCR_CACHE_REQUESTS.inc(result="miss" if text is None else "hit")
+    if text is None:
+        text = compute()
+        try:
+            cache.put(key, text)
+        except OSError as e:
+            logger.debug("OCR cache write failed: %s", e)
+    return text
+
 
 def extract_ocr_text(file_bytes, lang='eng+hin'):
     image = Image.open(io.BytesIO(file_bytes))
-    return pytesseract.image_to_string(image, lang=lang)
+    key = cache_key(image.tobytes(), "image_to_string", lang, f"{image.mode}{image.size}")
+    return cached_ocr(key, lambda: ocr_pool.run(pytesseract.image_to_string, image, lang=lang))
@@ -0,0 +1,131 @@
+"""Content-addressed on-disk cache of OCR results with a byte budget and LRU eviction."""
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+
+def cache_key(data: bytes, *params: str) -> str:
+	"""Key for OCR of ``data`` (image bytes or a page fingerprint) under ``params`` (config, language...)."""
+	digest = hashlib.blake2b(digest_size=20)
+	for param in params:
+		digest.update(param.encode("utf-8") + b"\0")
+	digest.update(data)
+	return digest.hexdigest()
+
+
+def page_fingerprint(page, dpi: int) -> Optional[bytes]:
+	"""Bytes that identify how a PyMuPDF page renders, or None if it has no images.
+
+	Built from the raw streams of the page's images, its content stream and
+	size, so a page repeating an earlier page's scan (or template) gets the
+	same cache key without being rendered.
+	"""
+	doc = page.parent
+	images = page.get_images(full=True)
+	if not images:
+		return None
+	digest = hashlib.blake2b(digest_size=20)
+	digest.update(f"{page.rect}|{page.rotation}|{dpi}".encode())
+	for image in images:
+		digest.update(hashlib.blake2b(doc.xref_stream_raw(image[0]) or b"", digest_size=20).digest())
+	digest.update(page.read_contents())
+	return digest.digest()
+
+
+class OcrCache:
+	"""OCR text by cache_key, stored one file per entry under ``directory``.
+
+	Entries are evicted least recently used first once they take more than
+	``max_bytes``. Several processes may share a directory: writes are
+	atomic, and each process enforces the budget over the entries it knows
+	of (those present when it started plus those it wrote). Entries are
+	OCR text of identity documents, so directories are created 0700 and
+	files 0600.
+	"""
+
+	def __init__(self, directory: str, max_bytes: int) -> None:
+		self.directory = directory
+		self.max_bytes = max_bytes
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self._lock = threading.Lock()
+		self._sizes: Optional["OrderedDict[str, int]"] = None  # key -> bytes, least recent first
+		self._bytes = 0
+
+	def _path(self, key: str) -> str:
+		return os.path.join(self.directory, key[:2], key + ".txt")
+
+	def _index(self) -> "OrderedDict[str, int]":
+		if self._sizes is None:
+			entries = []
+			for root, _, files in os.walk(self.directory):
+				for name in files:
+					if name.endswith(".txt"):
+						st = os.stat(os.path.join(root, name))
+						entries.append((st.st_mtime, name[:-4], st.st_size))
+			entries.sort()
+			self._sizes = OrderedDict((key, size) for _, key, size in entries)
+			self._bytes = sum(self._sizes.values())
+		return self._sizes
+
+	def get(self, key: str) -> Optional[str]:
+		path = self._path(key)
+		try:
+			with open(path, encoding="utf-8") as f:
+				text = f.read()
+			os.utime(path)
+		except FileNotFoundError:
+			with self._lock:
+				self.misses += 1
+			return None
+		with self._lock:
+			self.hits += 1
+			sizes = self._index()
+			if key in sizes:
+				sizes.move_to_end(key)
+		return text
+
+	def put(self, key: str, text: str) -> None:
+		path = self._path(key)
+		os.makedirs(self.directory, mode=0o700, exist_ok=True)
+		os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+		# mkstemp creates the file 0600
+		fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+		with os.fdopen(fd, "w", encoding="utf-8") as f:
+			f.write(text)
+		os.replace(tmp, path)
+		size = os.path.getsize(path)
+		with self._lock:
+			sizes = self._index()
+			self._bytes += size - sizes.pop(key, 0)
+			sizes[key] = size
+			while self._bytes > self.max_bytes and sizes:
+				old, old_size = sizes.popitem(last=False)
+				self._bytes -= old_size
+				self.evictions += 1
+				try:
+					os.remove(self._path(old))
+				except FileNotFoundError:
+					pass
+
+	def get_or_compute(self, key: str, compute: Callable[[], str]) -> str:
+		text = self.get(key)
+		if text is None:
+			text = compute()
+			self.put(key, text)
+		return text
+
+	def stats(self) -> Dict[str, int]:
+		with self._lock:
+			self._index()
+			return {
+				"hits": self.hits,
+				"misses": self.misses,
+				"evictions": self.evictions,
+				"entries": len(self._sizes),
+				"bytes": self._bytes,
+			}
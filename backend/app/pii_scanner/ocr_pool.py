@@ -0,0 +1,221 @@
+"""The one place Tesseract runs: a fixed set of worker threads behind a bounded priority queue.
+
+Each pytesseract call starts a ``tesseract`` process, so concurrent uploads
+OCRing freely would start as many as there are pages in flight. Every OCR
+call site submits through run() instead; at most OCR_WORKERS processes run
+at once and the rest wait in the queue, interactive requests ahead of batch
+jobs. Work is tagged with the OcrRequest bound by ocr_scope(), which also
+lets a request's queued work be cancelled when its client goes away.
+"""
+import heapq
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import CancelledError, Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Set, Tuple, TypeVar
+
+from .. import config as conf
+from .. import metrics
+
+T = TypeVar("T")
+
+# lower runs first
+INTERACTIVE = 0
+BATCH = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+OCR_QUEUE_WAIT_SECONDS = metrics.REGISTRY.register(metrics.Histogram(
+	"pii_ocr_queue_wait_seconds", "Time OCR work waited in the queue for a worker, by priority.",
+	("priority",), metrics.SLOW_BUCKETS,
+))
+OCR_REJECTED_TOTAL = metrics.REGISTRY.register(metrics.Counter(
+	"pii_ocr_rejected_total", "OCR work not run, by reason (queue_full, cancelled).", ("reason",),
+))
+
+
+class OcrUnavailable(RuntimeError):
+	"""OCR was not run; callers must not treat this as a page without text."""
+
+
+class OcrQueueFull(OcrUnavailable):
+	pass
+
+
+class OcrCancelled(OcrUnavailable):
+	pass
+
+
+class OcrRequest:
+	"""The OCR work of one upload or job: its priority and a handle to cancel it."""
+
+	def __init__(self, priority: int = BATCH) -> None:
+		self.priority = priority
+		self._cancelled = threading.Event()
+		self._lock = threading.Lock()
+		self._pending: Set[Future] = set()
+		self._pools: Set["OcrPool"] = set()
+
+	@property
+	def cancelled(self) -> bool:
+		return self._cancelled.is_set()
+
+	def cancel(self) -> None:
+		"""Drop this request's queued work; OCR already running finishes but its caller gets OcrCancelled."""
+		self._cancelled.set()
+		with self._lock:
+			pending, self._pending = self._pending, set()
+			pools = list(self._pools)
+		for future in pending:
+			future.cancel()
+		for pool in pools:
+			pool.discard(self)
+
+	def _track(self, pool: "OcrPool", future: Future) -> None:
+		with self._lock:
+			self._pending.add(future)
+			self._pools.add(pool)
+		future.add_done_callback(self._untrack)
+
+	def _untrack(self, future: Future) -> None:
+		with self._lock:
+			self._pending.discard(future)
+
+
+_current: ContextVar[Optional[OcrRequest]] = ContextVar("ocr_request", default=None)
+
+
+@contextmanager
+def ocr_scope(request: OcrRequest) -> Iterator[OcrRequest]:
+	"""Tag OCR submitted from this thread (or task) inside the block with ``request``."""
+	token = _current.set(request)
+	try:
+		yield request
+	finally:
+		_current.reset(token)
+
+
+def bind_pages(request: OcrRequest, pages: Iterable[T]) -> Iterator[T]:
+	"""Iterate ``pages`` with ``request`` in scope while each item is produced.
+
+	For generators consumed across threads (such as a StreamingResponse body),
+	where an ocr_scope() block cannot stay open between items.
+	"""
+	it = iter(pages)
+	while True:
+		with ocr_scope(request):
+			try:
+				item = next(it)
+			except StopIteration:
+				return
+		yield item
+
+
+class OcrPool:
+	"""``workers`` daemon threads taking work from a priority queue of at most ``max_queued`` items.
+
+	Batch work may only fill half of the queue, so an interactive upload
+	always finds room. A submission that finds no room blocks for up to
+	``timeout`` seconds (None waits as long as it takes), then raises
+	OcrQueueFull.
+	"""
+
+	def __init__(self, workers: int, max_queued: int) -> None:
+		self.workers = workers
+		self.max_queued = max_queued
+		self._heap: List[Tuple[int, int, float, OcrRequest, Future, Callable[[], Any]]] = []
+		self._order = itertools.count()
+		self._cond = threading.Condition()
+		for i in range(workers):
+			threading.Thread(target=self._work, name=f"ocr-worker-{i}", daemon=True).start()
+
+	def depth(self) -> int:
+		with self._cond:
+			return len(self._heap)
+
+	def _limit(self, priority: int) -> int:
+		return self.max_queued if priority == INTERACTIVE else max(1, self.max_queued // 2)
+
+	def submit(self, request: OcrRequest, fn: Callable[[], T], timeout: Optional[float] = None) -> "Future[T]":
+		future: Future = Future()
+		deadline = None if timeout is None else time.monotonic() + timeout
+		with self._cond:
+			while len(self._heap) >= self._limit(request.priority):
+				if request.cancelled:
+					break
+				remaining = None if deadline is None else deadline - time.monotonic()
+				if remaining is not None and remaining <= 0:
+					OCR_REJECTED_TOTAL.inc(reason="queue_full")
+					raise OcrQueueFull(f"OCR queue is full ({len(self._heap)} pages waiting)")
+				self._cond.wait(remaining)
+			if request.cancelled:
+				OCR_REJECTED_TOTAL.inc(reason="cancelled")
+				raise OcrCancelled("OCR request was cancelled")
+			heapq.heappush(self._heap, (request.priority, next(self._order), time.perf_counter(), request, future, fn))
+			self._cond.notify_all()
+		request._track(self, future)
+		return future
+
+	def discard(self, request: OcrRequest) -> None:
+		"""Remove ``request``'s queued work, freeing its slots, and wake its blocked submissions."""
+		with self._cond:
+			kept = [item for item in self._heap if item[3] is not request]
+			if len(kept) != len(self._heap):
+				OCR_REJECTED_TOTAL.inc(len(self._heap) - len(kept), reason="cancelled")
+				self._heap = kept
+				heapq.heapify(self._heap)
+			self._cond.notify_all()
+
+	def _work(self) -> None:
+		while True:
+			with self._cond:
+				while not self._heap:
+					self._cond.wait()
+				priority, _, queued, _, future, fn = heapq.heappop(self._heap)
+				# a slot is free for blocked submitters
+				self._cond.notify_all()
+			if not future.set_running_or_notify_cancel():
+				continue
+			OCR_QUEUE_WAIT_SECONDS.observe(time.perf_counter() - queued, priority=PRIORITY_NAMES[priority])
+			try:
+				result = fn()
+			except BaseException as e:
+				future.set_exception(e)
+			else:
+				future.set_result(result)
+
+
+@lru_cache(maxsize=1)
+def get_ocr_pool() -> OcrPool:
+	# Tesseract's own OpenMP threads would multiply with the workers and oversubscribe the CPUs
+	os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+	return OcrPool(conf.OCR_WORKERS or os.cpu_count() or 1, conf.OCR_QUEUE_SIZE)
+
+
+def _depth() -> int:
+	return get_ocr_pool().depth() if get_ocr_pool.cache_info().currsize else 0
+
+
+metrics.gauge("pii_ocr_queue_depth", "OCR work (pages or images) waiting for a worker.", _depth)
+
+
+def run(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+	"""``fn(*args, **kwargs)`` on an OCR worker, for the OcrRequest in scope (batch if none).
+
+	Interactive work waits at most OCR_QUEUE_TIMEOUT seconds for a queue slot
+	and raises OcrQueueFull after; batch work waits for one. Raises
+	OcrCancelled if the request is cancelled first.
+	"""
+	request = _current.get() or OcrRequest(BATCH)
+	timeout = conf.OCR_QUEUE_TIMEOUT if request.priority == INTERACTIVE else None
+	future = get_ocr_pool().submit(request, lambda: fn(*args, **kwargs), timeout=timeout)
+	try:
+		result = future.result()
+	except CancelledError:
+		raise OcrCancelled("OCR request was cancelled") from None
+	if request.cancelled:
+		raise OcrCancelled("OCR request was cancelled")
+	return result
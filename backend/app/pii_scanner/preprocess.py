@@ -0,0 +1,121 @@
+"""Named preprocessing profiles that turn a grayscale page or photo into the image Tesseract reads.
+
+``quality`` is the original pipeline: bilateral filter, Gaussian blur and
+adaptive threshold at full resolution. ``balanced`` and ``fast`` first crop
+blank margins and shrink the image until its text is about
+``glyph_height`` pixels tall (Tesseract reads that as well as larger text,
+in a fraction of the time), then use a median filter or no filter in place
+of the bilateral filter, which alone takes seconds on a 300 DPI page.
+"""
+from dataclasses import astuple, dataclass
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from .. import config as conf
+
+# pixels of background kept around the text when margins are cropped
+MARGIN_PADDING = 16
+# fewer glyph-sized components than this and the text height is not estimated
+MIN_GLYPHS = 20
+
+
+@dataclass(frozen=True)
+class OcrProfile:
+	name: str
+	# downscale until the median glyph is this many pixels tall; 0 keeps the resolution
+	glyph_height: int = 0
+	crop_margins: bool = False
+	denoise: str = "bilateral"  # bilateral, median or none
+	blur: bool = True
+	threshold: str = "adaptive"  # adaptive or otsu
+
+	@property
+	def key(self) -> str:
+		"""Identifies the profile's settings in OCR cache keys."""
+		return "profile=" + ",".join(str(v) for v in astuple(self))
+
+
+PROFILES: Dict[str, OcrProfile] = {p.name: p for p in (
+	OcrProfile("fast", glyph_height=18, crop_margins=True, denoise="none", blur=False, threshold="otsu"),
+	OcrProfile("balanced", glyph_height=24, crop_margins=True, denoise="median", blur=False),
+	OcrProfile("quality"),
+)}
+
+
+def get_profile(name: Optional[str] = None) -> OcrProfile:
+	"""The profile called ``name``, or the OCR_PROFILE default; raises ValueError for unknown names."""
+	name = name or conf.OCR_PROFILE
+	try:
+		return PROFILES[name]
+	except KeyError:
+		raise ValueError(f"unknown OCR profile {name!r}; expected one of {', '.join(PROFILES)}") from None
+
+
+def _ink_mask(gray):
+	"""Dark pixels of ``gray`` (Otsu), with speckles smaller than 3x3 removed."""
+	import cv2
+	import numpy as np
+	_, mask = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+	return cv2.morphologyEx(mask, cv2.MORPH_OPEN, np.ones((3, 3), np.uint8))
+
+
+def glyph_height(mask) -> Optional[float]:
+	"""Median height in pixels of the letter-sized blobs in an ink mask, or None if there are too few."""
+	import cv2
+	import numpy as np
+	_, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+	widths, heights = stats[1:, cv2.CC_STAT_WIDTH], stats[1:, cv2.CC_STAT_HEIGHT]
+	# rules, table borders and pictures are not letters
+	letters = heights[(heights >= 6) & (heights <= mask.shape[0] // 8) & (widths <= 3 * heights)]
+	if len(letters) < MIN_GLYPHS:
+		return None
+	return float(np.median(letters))
+
+
+class Prepared(NamedTuple):
+	"""A preprocessed image and where it came from: pixel (x, y) of ``image`` is
+	(left + x / scale, top + y / scale) of the input."""
+
+	image: Any
+	scale: float
+	left: int
+	top: int
+
+	def source_box(self, x0: float, y0: float, x1: float, y1: float) -> Tuple[float, float, float, float]:
+		"""An ``image`` box in input pixels."""
+		return (self.left + x0 / self.scale, self.top + y0 / self.scale,
+				self.left + x1 / self.scale, self.top + y1 / self.scale)
+
+
+def preprocess(gray, profile: OcrProfile):
+	"""Apply ``profile`` to a grayscale image (numpy array); returns a binarized PIL image."""
+	return prepare(gray, profile).image
+
+
+def prepare(gray, profile: OcrProfile) -> Prepared:
+	"""preprocess(), also reporting the crop and scale it applied."""
+	import cv2
+	from PIL import Image
+	scale, left, top = 1.0, 0, 0
+	if profile.crop_margins or profile.glyph_height:
+		mask = _ink_mask(gray)
+		if profile.crop_margins:
+			x, y, w, h = cv2.boundingRect(mask)
+			if w and h:
+				top, left = max(0, y - MARGIN_PADDING), max(0, x - MARGIN_PADDING)
+				bottom, right = y + h + MARGIN_PADDING, x + w + MARGIN_PADDING
+				gray, mask = gray[top:bottom, left:right], mask[top:bottom, left:right]
+		height = glyph_height(mask) if profile.glyph_height else None
+		if height and height > profile.glyph_height:
+			scale = profile.glyph_height / height
+			gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+	if profile.denoise == "bilateral":
+		gray = cv2.bilateralFilter(gray, 9, 75, 75)
+	elif profile.denoise == "median":
+		gray = cv2.medianBlur(gray, 3)
+	if profile.blur:
+		gray = cv2.GaussianBlur(gray, (3, 3), 0)
+	if profile.threshold == "otsu":
+		_, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+	else:
+		binary = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
+	return Prepared(Image.fromarray(binary), scale, left, top)
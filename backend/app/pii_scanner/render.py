@@ -0,0 +1,101 @@
+"""Page images of a PDF, rendered lazily and only a few at a time.
+
+pdf2image.convert_from_bytes renders every page before it returns, so a
+300-page scan at 300 DPI holds gigabytes of images before OCR starts.
+iter_pdf_images renders one page per step instead, and render_ahead runs an
+iterator like it on a thread that feeds a bounded queue: rendering overlaps
+OCR, and at most ``ahead`` + 2 page images exist at once (queued, being
+rendered, being OCRed).
+"""
+import queue
+import threading
+from typing import Any, Iterable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+# how often a renderer blocked on a full queue checks whether its consumer has gone
+_PUT_POLL_SECONDS = 0.1
+
+
+def iter_pdf_images(file_bytes: bytes, dpi: int, poppler_path: Optional[str] = None) -> Iterator[Any]:
+	"""Yield each page of a PDF as an RGB PIL image rendered at ``dpi``.
+
+	Pages are rendered with PyMuPDF; PDFs it cannot open are rendered with
+	pdf2image one page per poppler call (first_page/last_page), never whole.
+	"""
+	from PIL import Image
+	try:
+		import fitz
+		pdf = fitz.open(stream=file_bytes, filetype="pdf")
+	except Exception:
+		pdf = None
+	if pdf is not None:
+		with pdf:
+			for page in pdf:
+				pix = page.get_pixmap(dpi=dpi, alpha=False)
+				yield Image.frombytes("RGB" if pix.n >= 3 else "L", (pix.width, pix.height), pix.samples)
+		return
+	from pdf2image import convert_from_bytes, pdfinfo_from_bytes
+	pages = pdfinfo_from_bytes(file_bytes, poppler_path=poppler_path)["Pages"]
+	for number in range(1, pages + 1):
+		yield from convert_from_bytes(file_bytes, dpi=dpi, first_page=number, last_page=number, poppler_path=poppler_path)
+
+
+class _Failed:
+	def __init__(self, error: BaseException) -> None:
+		self.error = error
+
+
+_DONE = object()
+
+
+def render_ahead(items: Iterable[T], ahead: int) -> Iterator[T]:
+	"""Iterate ``items`` on a background thread, keeping at most ``ahead`` of them queued.
+
+	Exceptions raised by ``items`` are re-raised here. Closing this iterator
+	early (or an error in the consumer) stops the thread and closes ``items``.
+	``ahead`` <= 0 iterates ``items`` inline.
+	"""
+	if ahead <= 0:
+		yield from items
+		return
+	results: "queue.Queue" = queue.Queue(maxsize=ahead)
+	stop = threading.Event()
+
+	def put(item) -> bool:
+		while not stop.is_set():
+			try:
+				results.put(item, timeout=_PUT_POLL_SECONDS)
+				return True
+			except queue.Full:
+				pass
+		return False
+
+	def produce() -> None:
+		source = iter(items)
+		try:
+			for item in source:
+				if not put(item):
+					return
+			put(_DONE)
+		except BaseException as e:
+			put(_Failed(e))
+		finally:
+			close = getattr(source, "close", None)
+			if close is not None:
+				close()
+
+	thread = threading.Thread(target=produce, name="page-render", daemon=True)
+	thread.start()
+	try:
+		while True:
+			item = results.get()
+			if item is _DONE:
+				return
+			if isinstance(item, _Failed):
+				raise item.error
+			yield item
+			del item
+	finally:
+		stop.set()
+		thread.join()
@@ -0,0 +1,63 @@
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from .. import config as conf
+from .detectors.patterns import Detector
+
+# (start, end, detector, score) in normalized offsets; resolvers are fed in start order
+Candidate = Tuple[int, int, Detector, int]
+
+_RANKS: Dict[str, Callable[[Candidate], Tuple[int, ...]]] = {
+	"score": lambda c: (c[3], c[2].risk, c[1] - c[0]),
+	"risk": lambda c: (c[2].risk, c[3], c[1] - c[0]),
+	"longest": lambda c: (c[1] - c[0], c[3], c[2].risk),
+}
+
+DEFAULT_OVERLAP_POLICY = conf.OVERLAP_POLICY
+# "keep" reports every detection, overlapping or not
+OVERLAP_POLICIES = ("keep", *_RANKS)
+
+
+class OverlapResolver:
+	"""Single sweep keeping one detection per run of overlapping candidates.
+
+	Candidates must arrive in start order (ties in detector order). The best
+	candidate seen so far is held until one starts at or after its end; a
+	later candidate replaces it only if the policy ranks it strictly higher,
+	so ties go to the earlier match.
+	"""
+
+	__slots__ = ("_rank", "held")
+
+	def __init__(self, policy: str = DEFAULT_OVERLAP_POLICY) -> None:
+		if policy != "keep" and policy not in _RANKS:
+			raise ValueError(f"Unknown overlap policy {policy!r}; expected one of {', '.join(OVERLAP_POLICIES)}")
+		self._rank = _RANKS.get(policy)
+		self.held: Optional[Candidate] = None
+
+	def push(self, candidate: Candidate) -> Optional[Candidate]:
+		"""Add the next candidate; returns the held one once nothing later can displace it."""
+		if self._rank is None:
+			return candidate
+		held = self.held
+		if held is not None and candidate[0] < held[1]:
+			if self._rank(candidate) > self._rank(held):
+				self.held = candidate
+			return None
+		self.held = candidate
+		return held
+
+	def flush(self) -> Optional[Candidate]:
+		held, self.held = self.held, None
+		return held
+
+
+def resolve_overlaps(candidates: Iterable[Candidate], policy: str = DEFAULT_OVERLAP_POLICY) -> Iterator[Candidate]:
+	"""Yield the surviving candidates of a start-ordered stream, in order."""
+	resolver = OverlapResolver(policy)
+	for candidate in candidates:
+		kept = resolver.push(candidate)
+		if kept is not None:
+			yield kept
+	kept = resolver.flush()
+	if kept is not None:
+		yield kept
@@ -1,12 +1,24 @@
 # moved from src/pii_scanner/scan.py
 import json
 import os
+import time
 from dataclasses import dataclass
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Optional, Iterable, Iterator, Callable, Sequence
 
-from .detectors.patterns import build_detectors
-from .detectors.validators import normalize_digits
-from .extract import extract_text
+from .. import config as conf
+from .. import metrics
+from .detectors.keywords import KeywordIndex, get_keyword_matcher
+from .detectors.patterns import Detector, get_detector_set
+from .detectors.prefilter import build_index
+from .findings import CONTEXT_WINDOW, Finding, FindingSet
+from .normalize import OffsetMap, normalize_text
+from .resolve import DEFAULT_OVERLAP_POLICY, OverlapResolver, resolve_overlaps
+from .trace import start_trace
+from .extract import extract_text, iter_text_file
+
+# Characters held back between chunks in scan_text_stream; must exceed the longest
+# bounded match (UPI, 321 chars) plus the context window on either side.
+STREAM_OVERLAP = max(512, 330 + 2 * CONTEXT_WINDOW)
 
 SUPPORTED_EXTENSIONS = {
 	".txt", ".csv", ".log", ".json", ".pdf", ".docx", ".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp"
@@ -29,61 +41,314 @@ def _apply_redactions(text: str, replacements: List[Tuple[int, int, str]]) -> st
 	for start, end, masked in replacements:
 		result_parts.append(text[cursor:start])
 		result_parts.append(masked)
-		cursor = end
+		cursor = max(cursor, end)
 	result_parts.append(text[cursor:])
 	return "".join(result_parts)
 
-def scan_text(text: str, mask: bool = True) -> Tuple[List[Dict[str, Any]], str]:
-	import logging
-	logger = logging.getLogger("pii_scanner.scan")
-	logging.basicConfig(level=logging.INFO)
-	from .detectors.patterns import CONTEXT_KEYWORDS
-	detectors = build_detectors()
-	normalized = normalize_digits(text or "")
-	if normalized is None:
-		normalized = ""
-	logger.info(f"Normalized text: {repr(normalized)}")
-	findings: List[Dict[str, Any]] = []
-	replacements: List[Tuple[int, int, str]] = []
-
-	for detector in detectors:
-		if not isinstance(normalized, str):
-			normalized = str(normalized) if normalized is not None else ""
-		matches = list(detector.pattern.finditer(normalized))
-		logger.info(f"Detector {detector.name}: {len(matches)} matches")
-		for match in matches:
-			value = match.group(1)
-			is_valid = detector.validator(value) if detector.validator else True
-			logger.info(f"  Match: {value}, valid={is_valid}")
+def _score(detector: Detector, keywords: KeywordIndex, start: int, end: int, is_valid: bool) -> int:
+	score = 1  # base score for regex match
+	# Check for context keyword
+	gap = keywords.distance(detector.name, start, end, CONTEXT_WINDOW)
+	if gap is not None:
+		score += 2 if not conf.CONTEXT_DISTANCE_WEIGHTING or gap <= CONTEXT_WINDOW // 2 else 1
+	if is_valid:
+		score += 2
+	return score
+
+def _is_valid(detector: Detector, value: str) -> bool:
+	return detector.validator(value) if detector.validator else True
+
+def scan_findings(
+	text: str,
+	mask: bool = True,
+	stats: Optional[Dict[str, Any]] = None,
+	policy: str = DEFAULT_OVERLAP_POLICY,
+	time_budget: Optional[float] = None,
+	trace: Optional[bool] = None,
+) -> FindingSet:
+	"""Scan ``text`` and return its findings in columnar form.
+
+	Use this instead of scan_text when only counts, spans or scores are
+	needed. The text is normalized once up front (see normalize_text);
+	``findings.text`` is the normalized text the stored offsets index, while
+	spans(), replacements() and the dicts report offsets into
+	``findings.original``. Overlapping detections are resolved to one per
+	span according to ``policy`` (see OVERLAP_POLICIES). Matching stops
+	after ``time_budget`` seconds (default conf.SCAN_TIME_BUDGET, 0 for no
+	limit); detectors still pending are skipped and ``stats["budget_exceeded"]``
+	is set. ``trace`` forces (True) or suppresses (False) a scan trace, which
+	is otherwise sampled (see start_trace); when one is taken it is logged
+	and stored in ``stats["trace"]``.
+	"""
+	started = time.perf_counter()
+	if time_budget is None:
+		time_budget = conf.SCAN_TIME_BUDGET
+	deadline = time.monotonic() + time_budget if time_budget else None
+	scan_trace = start_trace(trace)
+	detector_set = get_detector_set()
+	text = text or ""
+	mark = time.perf_counter() if scan_trace else 0.0
+	normalized, offsets = normalize_text(text)
+	findings = FindingSet(normalized, detector_set, mask, original=text, offsets=offsets)
+
+	active = detector_set.select(build_index(normalized))
+	if scan_trace:
+		mark = scan_trace.phase("normalize", mark)
+	if stats is not None:
+		stats["detectors_run"] = len(active)
+		stats["detectors_skipped"] = len(detector_set) - len(active)
+
+	timings = scan_trace.timings if scan_trace else None
+	matches = detector_set.find_matches(normalized, active, deadline=deadline, timings=timings)
+	if stats is not None:
+		stats["budget_exceeded"] = deadline is not None and time.monotonic() > deadline
+	if scan_trace:
+		mark = scan_trace.phase("match", mark)
+		for detector, _ in matches:
+			scan_trace.counts[detector.name] = scan_trace.counts.get(detector.name, 0) + 1
+
+	def candidates():
+		keywords = None
+		for detector, match in matches:
+			if keywords is None:
+				keywords = get_keyword_matcher().index(normalized)
+			start, end = match.span(1)
+			yield start, end, detector, _score(detector, keywords, start, end, _is_valid(detector, match.group(1)))
+
+	for start, end, detector, score in resolve_overlaps(candidates(), policy):
+		findings.append(detector, start, end, score)
+	if scan_trace:
+		scan_trace.phase("score", mark)
+		record = scan_trace.emit(len(text), len(findings))
+		if stats is not None:
+			stats["trace"] = record
+	for name, count in findings.counts().items():
+		metrics.DETECTIONS_TOTAL.inc(count, type=name)
+	metrics.SCAN_SECONDS.observe(time.perf_counter() - started)
+	return findings
+
+def _redact(findings: FindingSet) -> str:
+	return _apply_redactions(findings.original, findings.replacements()) if findings.mask else findings.original
+
+def scan_text(
+	text: str,
+	mask: bool = True,
+	stats: Optional[Dict[str, Any]] = None,
+	policy: str = DEFAULT_OVERLAP_POLICY,
+	trace: Optional[bool] = None,
+) -> Tuple[List[Dict[str, Any]], str]:
+	findings = scan_findings(text, mask=mask, stats=stats, policy=policy, trace=trace)
+	return findings.to_dicts(), _redact(findings)
+
+def _validate_batch(detector: Detector, values: Iterable[str]) -> Dict[str, bool]:
+	unique = list(dict.fromkeys(values))
+	if detector.batch_validator is not None:
+		return dict(zip(unique, detector.batch_validator(unique)))
+	if detector.validator is None:
+		return dict.fromkeys(unique, True)
+	return {value: detector.validator(value) for value in unique}
+
+def scan_texts(
+	texts: Sequence[str],
+	mask: bool = True,
+	policy: str = DEFAULT_OVERLAP_POLICY,
+) -> List[Tuple[List[Dict[str, Any]], str]]:
+	"""Scan many texts at once; returns what scan_text returns for each, in order.
+
+	Candidates from every text are collected first and then validated per
+	detector in one call, so repeated values are checked once.
+	"""
+	detector_set = get_detector_set()
+	texts = [text or "" for text in texts]
+	normalized_texts = [normalize_text(text) for text in texts]
+	matches_per_text = []
+	values_by_detector: Dict[str, List[str]] = {}
+	for normalized, _ in normalized_texts:
+		active = detector_set.select(build_index(normalized))
+		matches = detector_set.find_matches(normalized, active)
+		for detector, match in matches:
+			values_by_detector.setdefault(detector.name, []).append(match.group(1))
+		matches_per_text.append(matches)
+
+	verdicts = {
+		name: _validate_batch(detector_set.get(name), values)
+		for name, values in values_by_detector.items()
+	}
+
+	results: List[Tuple[List[Dict[str, Any]], str]] = []
+	for text, (normalized, offsets), matches in zip(texts, normalized_texts, matches_per_text):
+		findings = FindingSet(normalized, detector_set, mask, original=text, offsets=offsets)
+		keywords = get_keyword_matcher().index(normalized) if matches else None
+		scored = []
+		for detector, match in matches:
 			start, end = match.span(1)
-			context_start = max(0, start - 48)
-			context_end = min(len(normalized), end + 48)
-			context = normalized[context_start:context_end]
-			masked_value = detector.mask(value)
-
-			# Scoring system
-			score = 1  # base score for regex match
-			# Check for context keyword
-			context_text = context.lower()
-			if any(kw.lower() in context_text for kw in detector.keywords):
-				score += 2
-			if is_valid:
-				score += 2
-
-			finding: Dict[str, Any] = {
-				"type": detector.name,
-				"value": value,
-				"masked_value": masked_value,
-				"span": [start, end],
-				"context": context,
-				"risk": detector.risk,
-				"score": score,
-			}
-			findings.append(finding)
-			replacements.append((start, end, masked_value))
-
-	redacted_text = _apply_redactions(normalized, replacements) if mask else normalized
-	return findings, redacted_text
+			is_valid = verdicts[detector.name][match.group(1)]
+			scored.append((start, end, detector, _score(detector, keywords, start, end, is_valid)))
+		for start, end, detector, score in resolve_overlaps(scored, policy):
+			findings.append(detector, start, end, score)
+		results.append((findings.to_dicts(), _redact(findings)))
+	return results
+
+def scan_text_stream(
+	chunks: Iterable[str],
+	mask: bool = True,
+	write: Optional[Callable[[str], Any]] = None,
+	overlap: int = STREAM_OVERLAP,
+	policy: str = DEFAULT_OVERLAP_POLICY,
+	stats: Optional[Dict[str, Any]] = None,
+) -> Iterator[Dict[str, Any]]:
+	"""Scan text arriving in chunks, yielding findings as soon as they are final.
+
+	Spans are absolute offsets into the concatenated original text and every
+	match is reported exactly once, in the same order as scan_text. Only a
+	window of roughly ``2 * overlap`` characters is buffered. If ``write`` is
+	given it receives the redacted (or, with ``mask=False``, original) text in
+	order, as soon as no later match can cover it. Overlaps are resolved as
+	in scan_findings; a finding is held back until no later match can
+	displace it. ``stats``, once the stream is exhausted, gets
+	``detectors_skipped`` (detectors the prefilter ruled out in every
+	window) and ``budget_exceeded`` (always False: there is no time budget).
+	"""
+	detector_set = get_detector_set()
+	detectors = detector_set.detectors
+	ran = set()
+	# cursors[i]: normalized offset before which detector i has nothing left to report
+	cursors = [0] * len(detectors)
+	# replacements not yet written, in original offsets
+	pending: List[Tuple[int, int, str]] = []
+	offsets = OffsetMap()
+	buffer = ""  # normalized text from ``base``
+	base = 0
+	raw = ""  # original text from ``written``, kept only for ``write``
+	written = 0
+	total = 0  # normalized characters seen so far
+	resolver = OverlapResolver(policy)
+	chunk_iter = iter(chunks)
+	final = False
+
+	while not final:
+		chunk = next(chunk_iter, None)
+		if chunk is None:
+			final = True
+		else:
+			normalized, _ = normalize_text(chunk, offsets, base=total)
+			total += len(normalized)
+			buffer += normalized
+			if write is not None:
+				raw += chunk
+			if len(buffer) - (min(cursors) - base) < 2 * overlap:
+				continue
+
+		# Matches starting before ``limit`` cannot be changed by text still to come.
+		limit = len(buffer) if final else len(buffer) - overlap
+		active = {detector.name for detector in detector_set.select(build_index(buffer))}
+		ran |= active
+		batch = []
+		for index, detector in enumerate(detectors):
+			if detector.name in active:
+				for match in detector.pattern.finditer(buffer, cursors[index] - base):
+					if match.start() >= limit:
+						break
+					cursors[index] = base + match.end()
+					batch.append((match.start(1), index, detector, match))
+			cursors[index] = max(cursors[index], base + limit)
+
+		batch.sort(key=lambda item: (item[0], item[1]))
+		keywords = get_keyword_matcher().index(buffer) if batch else None
+		released = []
+		for _, _, detector, match in batch:
+			start, end = match.span(1)
+			score = _score(detector, keywords, start, end, _is_valid(detector, match.group(1)))
+			kept = resolver.push((base + start, base + end, detector, score))
+			if kept is not None:
+				released.append(kept)
+		if resolver.held is not None and min(cursors) >= resolver.held[1]:
+			released.append(resolver.flush())
+		for start, end, detector, score in released:
+			finding = Finding(detector, start - base, end - base, score, buffer, offsets)
+			if write is not None and mask:
+				pending.append((*finding.original_span(base), finding.masked_value))
+			yield finding.to_dict(offset=base)
+
+		# normalized offset before which nothing is left to report
+		frontier = min(cursors) if resolver.held is None else min(min(cursors), resolver.held[0])
+		if write is not None:
+			# original offset before which no later match can start
+			safe = written + len(raw) if final else offsets.to_original(frontier)
+			parts = []
+			pending.sort(key=lambda x: x[0])
+			while pending and pending[0][0] < safe:
+				start, end, masked = pending.pop(0)
+				if start > written:
+					parts.append(raw[:start - written])
+				parts.append(masked)
+				raw = raw[max(0, end - written):]
+				written = max(written, end)
+			if safe > written:
+				parts.append(raw[:safe - written])
+				raw = raw[safe - written:]
+				written = safe
+			if parts:
+				write("".join(parts))
+
+		trim = max(base, frontier - overlap)
+		buffer = buffer[trim - base:]
+		base = trim
+		offsets.discard_before(trim)
+
+	if stats is not None:
+		stats.update(detectors_skipped=len(detectors) - len(ran), budget_exceeded=False)
+
+
+def scan_text_file(
+	path: str,
+	mask: bool = True,
+	write: Optional[Callable[[str], Any]] = None,
+	stats: Optional[Dict[str, Any]] = None,
+	policy: str = DEFAULT_OVERLAP_POLICY,
+) -> List[Dict[str, Any]]:
+	"""scan_text findings of a UTF-8 text file, read window by window from a memory map.
+
+	Only the findings are held in memory, whatever the file size; ``write``
+	and ``stats`` are as in scan_text_stream. Spans are character offsets
+	into the file's text (see extract.iter_text_file).
+	"""
+	started = time.perf_counter()
+	findings = list(scan_text_stream(iter_text_file(path), mask=mask, write=write, policy=policy, stats=stats))
+	counts: Dict[str, int] = {}
+	for finding in findings:
+		counts[finding["type"]] = counts.get(finding["type"], 0) + 1
+	for name, count in counts.items():
+		metrics.DETECTIONS_TOTAL.inc(count, type=name)
+	metrics.SCAN_SECONDS.observe(time.perf_counter() - started)
+	return findings
+
+
+def scan_pages(
+	pages: Iterable[Tuple[int, str]],
+	mask: bool = True,
+	stats: Optional[Dict[str, Any]] = None,
+	policy: str = DEFAULT_OVERLAP_POLICY,
+) -> Iterator[Dict[str, Any]]:
+	"""Scan ``(page_no, text)`` pairs as they arrive, yielding each page's findings once it is scanned.
+
+	Pairs typically come from extract.iter_pages, so extraction and scanning
+	overlap and only one page is held at a time. Findings are the scan_text
+	dicts plus ``page``; spans are relative to that page's text, and a match
+	cannot cross a page boundary. ``stats`` gets ``pages`` and
+	``budget_exceeded`` if any page ran out of its SCAN_TIME_BUDGET.
+	"""
+	if stats is not None:
+		stats.update(pages=0, budget_exceeded=False)
+	for page_no, text in pages:
+		page_stats: Dict[str, Any] = {}
+		findings = scan_findings(text, mask=mask, stats=page_stats, policy=policy)
+		if stats is not None:
+			stats["pages"] += 1
+			stats["budget_exceeded"] = stats["budget_exceeded"] or page_stats["budget_exceeded"]
+		for finding in findings.to_dicts():
+			finding["page"] = page_no
+			yield finding
 
 def _iter_files(input_path: str, recursive: bool) -> List[str]:
 	paths: List[str] = []
@@ -0,0 +1,63 @@
+import logging
+import random
+import time
+from typing import Any, Dict, Optional
+
+from .. import config as conf
+
+logger = logging.getLogger("pii_scanner.scan.trace")
+
+
+class ScanTrace:
+	"""Counts and timings for one scan; never holds document text or values.
+
+	Forced traces (``trace=True`` on a request) are logged at INFO, sampled
+	ones at DEBUG.
+	"""
+
+	__slots__ = ("forced", "started", "timings", "counts", "phases")
+
+	def __init__(self, forced: bool = False) -> None:
+		self.forced = forced
+		self.started = time.perf_counter()
+		self.timings: Dict[str, float] = {}  # seconds of finditer per detector
+		self.counts: Dict[str, int] = {}  # raw matches per detector, before overlap resolution
+		self.phases: Dict[str, float] = {}
+
+	def phase(self, name: str, since: float) -> float:
+		"""Record the time from ``since`` to now under ``name``; returns now."""
+		now = time.perf_counter()
+		self.phases[name] = self.phases.get(name, 0.0) + now - since
+		return now
+
+	def to_dict(self, chars: int, findings: int) -> Dict[str, Any]:
+		return {
+			"chars": chars,
+			"findings": findings,
+			"seconds": round(time.perf_counter() - self.started, 6),
+			"phases": {name: round(s, 6) for name, s in self.phases.items()},
+			"detectors": {
+				name: {"matches": self.counts.get(name, 0), "seconds": round(s, 6)}
+				for name, s in self.timings.items()
+			},
+		}
+
+	def emit(self, chars: int, findings: int) -> Dict[str, Any]:
+		record = self.to_dict(chars, findings)
+		logger.log(logging.INFO if self.forced else logging.DEBUG, "scan_trace", extra={"trace": record})
+		return record
+
+
+def start_trace(trace: Optional[bool] = None) -> Optional[ScanTrace]:
+	"""A ScanTrace if this scan should be traced, else None.
+
+	``trace=True`` forces one and ``False`` suppresses it; by default a scan is
+	traced only when the trace logger is enabled for DEBUG (SCAN_TRACE_LOG_LEVEL)
+	and it falls in the SCAN_TRACE_SAMPLE_RATE sample.
+	"""
+	if trace is not None:
+		return ScanTrace(forced=True) if trace else None
+	if conf.SCAN_TRACE_SAMPLE_RATE > 0 and logger.isEnabledFor(logging.DEBUG) \
+			and random.random() < conf.SCAN_TRACE_SAMPLE_RATE:
+		return ScanTrace()
+	return None
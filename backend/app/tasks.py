@@ -2,10 +2,12 @@ import uuid
 import threading
 import os
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from . import config as conf
+from . import metrics
 from app.pii_scanner.extract import extract_text
-from app.pii_scanner.scan import scan_text
+from app.pii_scanner.ocr_pool import BATCH, OcrCancelled, OcrRequest, ocr_scope
+from app.pii_scanner.scan import scan_findings, scan_text_file
 from app.db.database import SessionLocal
 from app.db import crud
 
@@ -14,6 +16,8 @@ logger = logging.getLogger("pii_scanner.tasks")
 # simple in-memory job store
 _jobs_lock = threading.Lock()
 _jobs: Dict[str, Dict[str, Any]] = {}
+# OCR handle per job, so a job can be cancelled while its pages wait for OCR
+_job_ocr: Dict[str, OcrRequest] = {}
 
 
 def create_job_record(filename: str) -> str:
@@ -25,6 +29,8 @@ def create_job_record(filename: str) -> str:
             "result": None,
             "error": None,
         }
+        _job_ocr[job_id] = OcrRequest(BATCH)
+    metrics.JOBS_TOTAL.inc(status="pending")
     return job_id
 
 
@@ -33,21 +39,83 @@ def get_job(job_id: str):
         return _jobs.get(job_id)
 
 
+def cancel_job(job_id: str) -> bool:
+    """Cancel a pending or running job and drop its queued OCR; False if it had already finished."""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is None or job["status"] not in ("pending", "running"):
+            return False
+        job["status"] = "cancelled"
+        ocr = _job_ocr.pop(job_id, None)
+    metrics.JOBS_TOTAL.inc(status="cancelled")
+    if ocr is not None:
+        ocr.cancel()
+    return True
+
+
 def _update_job(job_id: str, **vals):
+    # a cancelled job stays cancelled, even if its work finished first
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is None or job["status"] == "cancelled":
+            return
+        job.update(vals)
+    if "status" in vals:
+        metrics.JOBS_TOTAL.inc(status=vals["status"])
+
+
+def _queue_depth() -> int:
     with _jobs_lock:
-        if job_id in _jobs:
-            _jobs[job_id].update(vals)
+        return sum(1 for job in _jobs.values() if job["status"] == "pending")
+
+
+metrics.gauge("pii_job_queue_depth", "Background upload jobs waiting to start.", _queue_depth)
 
 
-def process_upload_background(job_id: str, file_path: str, filename: str):
+def process_upload_background(job_id: str, file_path: str, filename: str, ocr_profile: Optional[str] = None):
+    with _jobs_lock:
+        ocr = _job_ocr.get(job_id)
+        started = ocr is not None and _jobs[job_id]["status"] == "pending"
+        if started:
+            _jobs[job_id]["status"] = "running"
+    if not started:
+        logger.info("Skipping cancelled job", extra={"job_id": job_id, "uploaded_filename": filename})
+        try:
+            os.remove(file_path)
+        except Exception:
+            pass
+        return
+    metrics.JOBS_TOTAL.inc(status="running")
     logger.info("Starting background processing", extra={"job_id": job_id, "uploaded_filename": filename})
-    _update_job(job_id, status="running")
     try:
-        with open(file_path, "rb") as f:
-            content = f.read()
-
-        text = extract_text(content, filename)
-        detections, _ = scan_text(text)
+        scan_stats = {}
+        redacted_path = None
+        if filename.lower().endswith(('.txt', '.csv', '.log')) and os.path.getsize(file_path) >= conf.TEXT_STREAM_MIN_BYTES:
+            # large text: only the findings are held in memory, never the text; the
+            # redacted copy is written out as the scan goes
+            extract_info = {"extractor": "text", "ocr_pages": 0}
+            redacted_dir = conf.DATA_DIR / "redacted"
+            redacted_dir.mkdir(parents=True, exist_ok=True)
+            redacted_path = redacted_dir / f"{job_id}_{filename}"
+            try:
+                # newline="" keeps the input's line endings, so spans hold in the copy too
+                with open(redacted_path, "w", encoding="utf-8", newline="") as out:
+                    detections = scan_text_file(file_path, write=out.write, stats=scan_stats)
+            except BaseException:
+                redacted_path.unlink(missing_ok=True)
+                raise
+        else:
+            with open(file_path, "rb") as f:
+                content = f.read()
+
+            extract_info = {}
+            # batch OCR priority: interactive uploads are OCRed first
+            with ocr_scope(ocr):
+                text = extract_text(content, filename, info=extract_info, ocr_profile=ocr_profile)
+            detections = scan_findings(text, stats=scan_stats).to_dicts()
+        types = {}
+        for d in detections:
+            types[d["type"]] = types.get(d["type"], 0) + 1
 
 
         # store detections in DB and keep original file
@@ -70,24 +138,22 @@ def process_upload_background(job_id: str, file_path: str, filename: str):
         finally:
             db.close()
 
-        _update_job(job_id, status="done", result={"document_id": document_id, "detections_count": len(detections), "file_path": str(dest_path)})
+        _update_job(job_id, status="done", result={"document_id": document_id, "detections_count": len(detections), "detectors_skipped": scan_stats.get("detectors_skipped"), "budget_exceeded": scan_stats.get("budget_exceeded"), "extractor": extract_info["extractor"], "ocr_pages": extract_info["ocr_pages"], "file_path": str(dest_path), "redacted_path": str(redacted_path) if redacted_path else None})
 
         # structured log
         try:
-            types_count = {}
-            max_score = 0
-            for d in detections:
-                types_count[d.get("type")] = types_count.get(d.get("type"), 0) + 1
-                if isinstance(d.get("score"), (int, float)) and d.get("score") > max_score:
-                    max_score = d.get("score")
-            logger.info("upload_summary", extra={"job_id": job_id, "document_id": document_id, "uploaded_filename": filename, "num_detections": len(detections), "types": types_count, "max_score": max_score})
+            logger.info("upload_summary", extra={"job_id": job_id, "document_id": document_id, "uploaded_filename": filename, "num_detections": len(detections), "types": types, "max_score": max((d["score"] for d in detections), default=0), "detectors_skipped": scan_stats.get("detectors_skipped")})
         except Exception:
             logger.exception("Failed to emit structured upload summary in background")
 
+    except OcrCancelled:
+        logger.info("Background processing cancelled", extra={"job_id": job_id, "uploaded_filename": filename})
     except Exception as e:
         logger.exception("Background processing failed")
         _update_job(job_id, status="error", error=str(e))
     finally:
+        with _jobs_lock:
+            _job_ocr.pop(job_id, None)
         # optional: cleanup saved file
         try:
             os.remove(file_path)
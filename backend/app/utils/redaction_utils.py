@@ -3,6 +3,8 @@ import fitz
 import pytesseract
 from PIL import Image
 
+from app.pii_scanner import ocr_pool
+
 
 def _norm(s: str) -> str:
     return ''.join(ch.lower() for ch in s if ch.isalnum())
@@ -32,7 +34,7 @@ def find_rects_for_value(page: fitz.Page, value: str) -> List[fitz.Rect]:
             pix = page.get_pixmap(matrix=fitz.Matrix(2.0, 2.0), alpha=False)
             mode = "RGB" if pix.n < 4 else "RGBA"
             img = Image.frombytes(mode, [pix.width, pix.height], pix.samples)
-            ocr = pytesseract.image_to_data(img, output_type=pytesseract.Output.DICT)
+            ocr = ocr_pool.run(pytesseract.image_to_data, img, output_type=pytesseract.Output.DICT)
             words = []
             n = len(ocr.get('text', []))
             for i in range(n):
@@ -49,6 +51,8 @@ def find_rects_for_value(page: fitz.Page, value: str) -> List[fitz.Rect]:
                 x1 = (left + width) / 2.0
                 y1 = (top + height) / 2.0
                 words.append((x0, y0, x1, y1, text, 0, 0, 0))
+        except ocr_pool.OcrUnavailable:
+            raise
         except Exception:
             return []
 
@@ -0,0 +1,13 @@
+import pytest
+
+from app import config as conf
+from app.pii_scanner.ocr import get_ocr_cache
+
+
+@pytest.fixture
+def ocr_cache_dir(tmp_path, monkeypatch):
+    """Point the OCR cache at an empty directory for one test."""
+    monkeypatch.setattr(conf, "OCR_CACHE_DIR", str(tmp_path / "ocr"))
+    get_ocr_cache.cache_clear()
+    yield tmp_path / "ocr"
+    get_ocr_cache.cache_clear()
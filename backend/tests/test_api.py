@@ -41,3 +41,269 @@ def test_export_json_csv_no_document():
 
     r2 = client.get("/api/v1/export/csv/?document_id=999999")
     assert r2.status_code in (200, 404)
+
+
+def test_pii_registry_reloads_when_file_changes(tmp_path):
+    from app.pii.registry import Registry
+
+    path = tmp_path / "registry.yaml"
+    path.write_text('pan:\n  regex: "[A-Z]{5}[0-9]{4}[A-Z]"\n  validator: "pan_format"\n  mask: "XXXXX{last4}X"\n')
+    registry = Registry(str(path))
+    first = registry.entries()
+    assert set(first) == {"pan"} and first["pan"].validator("ABCDE1234F")
+    assert registry.entries() is first  # unchanged file is not re-read
+
+    path.write_text('passport:\n  regex: "[A-PR-WY][0-9]{7}"\n  mask: "X{last7}"\n')
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 10**9))
+    assert set(registry.entries()) == {"passport"}
+
+    path.write_text("pan:\n  regex: \"[\"\n")  # broken edit keeps the previous rules
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 2 * 10**9))
+    assert set(registry.entries()) == {"passport"}
+
+
+def test_redact_endpoint_masks_registry_types():
+    r = client.post("/api/v1/redact/", json="pan ABCDE1234F")
+    assert r.status_code == 200
+    assert r.json()["redacted"] == "pan XXXXX234FX"
+
+
+def test_redact_only_touches_detected_spans():
+    # "ABCDE1234F" inside a longer token is not a detection and must survive
+    text = "pan ABCDE1234F, ref XABCDE1234F"
+    r = client.post("/api/v1/redact/", json=text)
+    assert r.json()["redacted"] == "pan XXXXX234FX, ref XABCDE1234F"
+
+
+def test_redact_stream_matches_redact():
+    from app.pii.redact import StreamRedactor
+    from app.pii.registry import get_registry
+
+    text = "aadhaar 2345 6789 0123 pan ABCDE1234F passport K1234567 " * 200
+    expected = client.post("/api/v1/redact/", json=text).json()["redacted"]
+
+    redactor = StreamRedactor(get_registry().entries(), overlap=32)
+    pieces = [redactor.feed(text[i:i + 29]) for i in range(0, len(text), 29)]
+    pieces.append(redactor.feed("", final=True))
+    assert "".join(pieces) == expected
+    assert redactor.count == 600
+
+    r = client.post("/api/v1/redact/stream/", content=text.encode("utf-8"))
+    assert r.status_code == 200
+    assert r.text == expected
+    assert r.headers["X-Detections-Count"] == "600"
+
+
+def test_redact_stream_completes_for_small_body():
+    import threading
+
+    result = {}
+    worker = threading.Thread(
+        target=lambda: result.update(r=client.post("/api/v1/redact/stream/", content=b"pan ABCDE1234F")),
+        daemon=True,
+    )
+    worker.start()
+    worker.join(timeout=10)
+    assert not worker.is_alive(), "/redact/stream/ did not return"
+    assert result["r"].text == "pan XXXXX234FX"
+
+
+def test_metrics_endpoint_exposes_stage_histograms_and_counters():
+    from app import metrics
+
+    before = metrics.SCAN_SECONDS.count()
+    r = client.post(
+        "/api/v1/upload/",
+        files={"file": ("m.txt", b"pan ABCDE1234F mail a.b@example.com", "text/plain")},
+    )
+    assert r.status_code == 200
+    assert metrics.SCAN_SECONDS.count() == before + 1
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = r.text
+    assert "# TYPE pii_scan_seconds histogram" in body
+    assert 'pii_scan_seconds_bucket{le="+Inf"}' in body
+    assert 'pii_detections_total{type="PAN"}' in body
+    assert "pii_db_commit_seconds_count" in body
+    assert "pii_encrypt_seconds_count" in body
+    assert "# TYPE pii_job_queue_depth gauge" in body
+
+
+def test_native_pdf_extraction_splits_large_pdfs_across_processes(monkeypatch):
+    import fitz
+    from app.pii_scanner import extract
+
+    doc = fitz.open()
+    for i in range(9):
+        page = doc.new_page()
+        if i == 4:  # a scan: an image and no text layer, so it is OCRed
+            page.insert_image(page.rect, pixmap=fitz.Pixmap(fitz.csGRAY, fitz.IRect(0, 0, 8, 8), False))
+        else:
+            page.insert_text((72, 72), f"page {i} pan ABCDE1234F with enough text to use")
+    data = doc.tobytes()
+    monkeypatch.setattr(extract, "_ocr_pdf_page", lambda page, profile=None: f"ocr {page.number}")
+    monkeypatch.setattr(conf, "PDF_WORKERS", 1)
+    info = {}
+    serial = extract._pdf_text(data, info)
+    monkeypatch.setattr(conf, "PDF_WORKERS", 2)
+    monkeypatch.setattr(conf, "PDF_PARALLEL_MIN_PAGES", 2)
+    assert extract._pdf_text(data) == serial
+    assert info["ocr_pages"] == 1
+    lines = [line.strip() for line in serial.split("\n") if line.strip()]
+    assert lines == [f"page {i} pan ABCDE1234F with enough text to use" if i != 4 else "ocr 4" for i in range(9)]
+
+
+def test_upload_stream_reports_findings_per_page():
+    import json
+    import fitz
+
+    doc = fitz.open()
+    for i in range(3):
+        doc.new_page().insert_text((72, 72), f"page {i} pan ABCDE{i:04d}F")
+    r = client.post("/api/v1/upload/stream/", files={"file": ("s.pdf", doc.tobytes(), "application/pdf")})
+    assert r.status_code == 200
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    *findings, last = lines
+    assert [(f["page"], f["value"]) for f in findings] == [(i + 1, f"ABCDE{i:04d}F") for i in range(3)]
+    assert findings[0]["span"] == findings[2]["span"]  # page-relative
+    assert last["summary"]["pages"] == 3 and last["summary"]["num_detections"] == 3
+
+
+def test_pdf_and_docx_are_extracted_natively_without_tika(monkeypatch):
+    import fitz
+    from docx import Document
+    from app.pii_scanner import extract
+
+    def no_tika(file_bytes):
+        raise AssertionError("Tika should not be used")
+
+    monkeypatch.setattr(extract, "_tika_text", no_tika)
+    pdf = fitz.open()
+    pdf.new_page().insert_text((72, 72), "Customer PAN ABCDE1234F, statement for the month of March")
+    docx = Document()
+    docx.add_paragraph("Customer PAN ABCDE1234F")
+    docx.add_table(rows=1, cols=2).rows[0].cells[1].text = "mail a.b@example.com"
+    buf = io.BytesIO()
+    docx.save(buf)
+
+    for name, data, extractor in (("s.pdf", pdf.tobytes(), "pymupdf"), ("s.docx", buf.getvalue(), "docx")):
+        r = client.post("/api/v1/upload/", files={"file": (name, data, "application/octet-stream")})
+        assert r.status_code == 200
+        body = r.json()
+        assert body["extractor"] == extractor
+        assert {d["type"] for d in body["detections"]} >= {"PAN"}
+
+    info = {}
+    assert "a.b@example.com" in extract.extract_text(buf.getvalue(), "s.docx", info=info)
+    assert info["extractor"] == "docx"
+
+
+def test_only_pages_that_need_it_are_ocred(monkeypatch, ocr_cache_dir):
+    import fitz
+    from app.pii_scanner import extract
+
+    monkeypatch.setattr(extract, "_ocr_page_image", lambda img, **kw: "scanned annexure PAN ABCDE1234F")
+    doc = fitz.open()
+    for i in range(3):
+        doc.new_page().insert_text((72, 72), f"digital page {i} " * 20)
+    annexure = doc.new_page()
+    annexure.insert_image(annexure.rect, pixmap=fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 8, 8), 0))
+    r = client.post("/api/v1/upload/", files={"file": ("mixed.pdf", doc.tobytes(), "application/pdf")})
+    body = r.json()
+    assert (body["extractor"], body["ocr_pages"]) == ("pymupdf", 1)
+    assert [d["type"] for d in body["detections"]] == ["PAN"]
+
+
+def test_repeated_scans_are_ocred_once(monkeypatch, ocr_cache_dir):
+    import fitz
+    from app.pii_scanner import extract
+
+    ocred = []
+    monkeypatch.setattr(extract, "_ocr_words", lambda img: ocred.append(img.size) or "PAN ABCDE1234F")
+    doc = fitz.open()
+    scan = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 8, 8), 0)
+    for _ in range(3):
+        page = doc.new_page()
+        page.insert_image(page.rect, pixmap=scan)
+    data = doc.tobytes()
+    for _ in range(2):
+        r = client.post("/api/v1/upload/", files={"file": ("id.pdf", data, "application/pdf")})
+        assert r.json()["ocr_pages"] == 3
+        assert len(r.json()["detections"]) == 3
+    assert len(ocred) == 1
+    body = client.get("/metrics").text
+    assert 'pii_ocr_cache_requests_total{result="hit"}' in body
+
+
+def test_upload_is_refused_while_ocr_is_at_capacity(monkeypatch, ocr_cache_dir):
+    from PIL import Image
+    from app.pii_scanner import extract
+    from app.pii_scanner.ocr_pool import OcrQueueFull
+
+    def full(img):
+        raise OcrQueueFull("OCR queue is full")
+
+    monkeypatch.setattr(extract, "_ocr_words", full)
+    buf = io.BytesIO()
+    Image.new("RGB", (32, 32), "white").save(buf, format="PNG")
+    r = client.post("/api/v1/upload/", files={"file": ("scan.png", buf.getvalue(), "image/png")})
+    assert r.status_code == 503
+    assert "Retry-After" in r.headers
+    assert "pii_ocr_queue_depth" in client.get("/metrics").text
+
+
+def test_upload_ocr_is_cancelled_when_the_client_disconnects(monkeypatch):
+    import asyncio
+    from app.api.v1.endpoints import document
+    from app.pii_scanner.ocr_pool import INTERACTIVE, OcrRequest
+
+    class Client:
+        polls = 0
+
+        async def is_disconnected(self):
+            self.polls += 1
+            return self.polls > 2
+
+    monkeypatch.setattr(document, "DISCONNECT_POLL_SECONDS", 0)
+    ocr = OcrRequest(INTERACTIVE)
+    request = Client()
+    asyncio.run(document._cancel_on_disconnect(request, ocr))
+    assert ocr.cancelled and request.polls == 3
+
+def test_large_text_uploads_are_streamed_to_a_redacted_file(tmp_path, monkeypatch):
+    from app.pii_scanner import extract
+    from app.pii_scanner.scan import scan_text
+
+    record = "naïve user ABCDE1234F paid some.one@okaxis, aadhaar 2345 6789 0123 ₹\r\n"
+    text = record * 500
+    monkeypatch.setattr(conf, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(conf, "MAX_UPLOAD_SIZE", 1024)  # text uploads have their own cap
+    monkeypatch.setattr(conf, "TEXT_STREAM_MIN_BYTES", 4096)
+    windowed = extract.iter_text_file
+    monkeypatch.setattr("app.pii_scanner.scan.iter_text_file", lambda p: windowed(p, window=4093))
+    r = client.post("/api/v1/upload_async/", files={"file": ("app.log", text.encode("utf-8"), "text/plain")})
+    assert r.status_code == 200
+    job = client.get(f"/api/v1/upload_status/{r.json()['job_id']}").json()
+    assert job["status"] == "done"
+    expected, expected_redacted = scan_text(text)
+    assert job["result"]["detections_count"] == len(expected)
+    with open(job["result"]["redacted_path"], encoding="utf-8", newline="") as f:
+        assert f.read() == expected_redacted
+    r = client.post("/api/v1/upload_async/", files={"file": ("scan.png", b"x" * 2048, "image/png")})
+    assert r.status_code == 413
+
+def test_finished_job_cannot_be_cancelled(tmp_path):
+    r = client.post("/api/v1/upload_async/", files={"file": ("a.txt", b"PAN ABCDE1234F", "text/plain")})
+    job_id = r.json()["job_id"]
+    assert client.get(f"/api/v1/upload_status/{job_id}").json()["status"] == "done"
+    assert client.post(f"/api/v1/upload_cancel/{job_id}").json() == {"job_id": job_id, "cancelled": False}
+    assert client.post("/api/v1/upload_cancel/missing").json() == {"error": "job not found"}
+
+
+def test_upload_rejects_unknown_ocr_profile():
+    r = client.post("/api/v1/upload/?ocr_profile=best", files={"file": ("a.txt", b"PAN ABCDE1234F", "text/plain")})
+    assert r.status_code == 400
+    r = client.post("/api/v1/upload/?ocr_profile=fast", files={"file": ("a.txt", b"PAN ABCDE1234F", "text/plain")})
+    assert r.status_code == 200
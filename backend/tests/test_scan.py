@@ -0,0 +1,347 @@
+import threading
+
+from app.pii_scanner.detectors.patterns import get_detector_set
+from app.pii_scanner import extract
+from app.pii_scanner.scan import scan_findings, scan_text, scan_text_file, scan_texts, scan_text_stream
+
+
+def test_detector_set_is_compiled_once():
+    assert get_detector_set() is get_detector_set()
+
+
+def test_scan_text_findings_are_position_ordered():
+    text = "email test@example.com pan ABCDE1234F aadhaar 2345 6789 0123"
+    findings, redacted = scan_text(text)
+    starts = [f["span"][0] for f in findings]
+    assert starts == sorted(starts)
+    assert {"EMAIL", "PAN", "AADHAAR"} <= {f["type"] for f in findings}
+    assert "ABCDE1234F" not in redacted
+
+
+def test_prefilter_skips_detectors_that_cannot_match():
+    stats = {}
+    findings, _ = scan_text("GET /api/v1/users status=200 latency=12ms", stats=stats)
+    assert findings == []
+    assert stats["detectors_run"] == 0
+    assert stats["detectors_skipped"] == len(get_detector_set())
+
+
+def test_prefilter_keeps_detectors_with_matching_facts():
+    stats = {}
+    findings, _ = scan_text("reach me at someone@example.com", stats=stats, policy="keep")
+    assert {f["type"] for f in findings} == {"EMAIL", "UPI"}
+    assert stats["detectors_run"] == 2
+
+
+def test_scan_text_stream_matches_scan_text_across_chunk_boundaries():
+    record = "user ABCDE1234F paid via some.one@okaxis, aadhaar 2345 6789 0123\n"
+    text = record * 40
+    expected, expected_redacted = scan_text(text)
+    chunks = [text[i:i + 37] for i in range(0, len(text), 37)]
+    out = []
+    findings = list(scan_text_stream(chunks, write=out.append, overlap=100))
+    assert findings == expected
+    assert "".join(out) == expected_redacted
+
+
+def test_scan_text_file_matches_scan_text(tmp_path, monkeypatch):
+    record = "naïve user ABCDE1234F paid some.one@okaxis, aadhaar 2345 6789 0123 ₹\n"
+    text = record * 200
+    path = tmp_path / "big.log"
+    path.write_bytes(text.encode("utf-8") + b"\xff")
+    # small odd windows split multibyte characters and matches across windows
+    windowed = extract.iter_text_file
+    monkeypatch.setattr("app.pii_scanner.scan.iter_text_file", lambda p: windowed(p, window=509))
+    expected, expected_redacted = scan_text(text)
+    out, stats = [], {}
+    assert scan_text_file(str(path), write=out.append, stats=stats) == expected
+    assert "".join(out) == expected_redacted
+    assert stats["budget_exceeded"] is False
+
+def test_scan_texts_matches_scan_text_per_text():
+    texts = [
+        "pan ABCDE1234F",
+        "nothing to see here",
+        "pan ABCDE1234F again, mail a.b@example.com",
+        "",
+    ]
+    assert scan_texts(texts) == [scan_text(t) for t in texts]
+
+
+def test_finding_set_is_columnar_and_keeps_dict_shape():
+    text = "pan ABCDE1234F and ABCDE1234F again"
+    findings = scan_findings(text)
+    assert len(findings) == 2
+    assert findings.spans() == [(4, 14), (19, 29)]
+    assert findings.counts() == {"PAN": 2}
+    assert findings[0].value == "ABCDE1234F"
+    assert findings.to_dicts() == scan_text(text)[0]
+    assert set(findings.to_dicts()[0]) == {"type", "value", "masked_value", "span", "context", "risk", "score"}
+
+
+def test_keyword_index_distance_honours_window():
+    from app.pii_scanner.detectors.keywords import get_keyword_matcher
+
+    text = "PAN: ABCDE1234F" + " " * 60 + "pan"
+    index = get_keyword_matcher().index(text)
+    assert index.distance("PAN", 5, 15, 48) == 2
+    assert index.distance("PAN", 5, 15, 1) is None
+    assert index.distance("AADHAAR", 5, 15, 48) is None
+
+
+def test_normalized_findings_map_back_to_original_text():
+    # full-width/Devanagari digits and zero-width characters inside the values
+    text = "aadhaar ２३४५ 6789 0123 pan AB\u200bCDE1234\u00adF"
+    findings, redacted = scan_text(text)
+    by_type = {f["type"]: f for f in findings}
+    start, end = by_type["PAN"]["span"]
+    assert text[start:end] == "AB\u200bCDE1234\u00adF"
+    assert by_type["PAN"]["value"] == "ABCDE1234F"
+    start, end = by_type["AADHAAR"]["span"]
+    assert text[start:end] == "２३४५ 6789 0123"
+    assert "\u200b" not in redacted and redacted.startswith("aadhaar ")
+
+    out = []
+    assert list(scan_text_stream(list(text), write=out.append, overlap=100)) == findings
+    assert "".join(out) == redacted
+
+
+def test_overlapping_detections_resolve_to_one_per_span():
+    text = "mail a.b@example.com"
+    kept = scan_text(text)[0]
+    assert [f["type"] for f in kept] == ["EMAIL"]
+    assert {f["type"] for f in scan_text(text, policy="keep")[0]} == {"EMAIL", "UPI"}
+
+
+def test_ocr_rereads_only_doubtful_numbers_in_place(monkeypatch, ocr_cache_dir):
+    import pytesseract
+    from PIL import Image
+    from app.pii_scanner import extract
+
+    general = [
+        # text, conf, block/par/line, left, top, width, height
+        ("Aadhaar", 95, 1, 10, 10, 80, 20),
+        ("2345", 60, 1, 100, 10, 50, 20),
+        ("67B9", 41, 1, 160, 10, 50, 20),
+        ("0123", 96, 1, 220, 10, 50, 20),
+        ("PAN", 93, 2, 10, 50, 40, 20),
+        ("ABCDE1234F", 90, 2, 60, 50, 120, 20),
+    ]
+    calls = []
+
+    def image_to_data(img, config, output_type):
+        calls.append(config)
+        if config == extract.OCR_CONFIG:
+            rows = general
+        else:
+            # two 28px crops stacked with 4px gaps: bands start at 4 and 36
+            rows = [("2345", 90, 1, 4, 8, 50, 20), ("6789", 90, 1, 4, 40, 50, 20)]
+        return {
+            "text": [r[0] for r in rows], "conf": [r[1] for r in rows],
+            "block_num": [1] * len(rows), "par_num": [1] * len(rows), "line_num": [r[2] for r in rows],
+            "left": [r[3] for r in rows], "top": [r[4] for r in rows],
+            "width": [r[5] for r in rows], "height": [r[6] for r in rows],
+        }
+
+    monkeypatch.setattr(pytesseract, "image_to_data", image_to_data)
+    text = extract._ocr_image(Image.new("L", (400, 100), 255))
+    assert text == "Aadhaar 2345 6789 0123\nPAN ABCDE1234F"
+    assert calls == [extract.OCR_CONFIG, extract.DIGITS_CONFIG]
+    findings, _ = scan_text(text)
+    assert sorted(f["type"] for f in findings) == ["AADHAAR", "PAN"]
+
+
+def test_detector_patterns_scan_adversarial_input_in_linear_time():
+    from app.pii_scanner.detectors.audit import measure_growth
+
+    report = measure_growth(get_detector_set().detectors, sizes=(1000, 8000))
+    slow = [g for g in report if g.is_superlinear()]
+    assert not slow, slow
+
+
+def test_time_budget_skips_remaining_detectors():
+    stats = {}
+    findings = scan_findings("pan ABCDE1234F mail a.b@example.com", stats=stats, time_budget=1e-9)
+    assert stats["budget_exceeded"] is True
+    assert len(findings) == 0
+    stats = {}
+    assert len(scan_findings("pan ABCDE1234F", stats=stats, time_budget=10)) == 1
+    assert stats["budget_exceeded"] is False
+
+
+def test_scan_trace_reports_counts_and_timings_without_text(caplog, monkeypatch):
+    from app import config as conf
+
+    monkeypatch.setattr(conf, "SCAN_TRACE_SAMPLE_RATE", 0.0)
+    text = "pan ABCDE1234F mail a.b@example.com"
+    with caplog.at_level("DEBUG", logger="pii_scanner.scan.trace"):
+        stats = {}
+        scan_findings(text, stats=stats)
+        assert "trace" not in stats and not caplog.records  # not sampled
+        scan_findings(text, stats=stats, trace=True)
+    trace = stats["trace"]
+    assert trace["detectors"]["PAN"]["matches"] == 1
+    assert set(trace["phases"]) == {"normalize", "match", "score"}
+    [record] = [r for r in caplog.records if r.name == "pii_scanner.scan.trace"]
+    assert "ABCDE1234F" not in str(record.__dict__)
+
+
+def _busy_pool(max_queued):
+    """An OcrPool with its one worker held until the returned event is set."""
+    import time
+    from app.pii_scanner.ocr_pool import BATCH, OcrPool, OcrRequest
+
+    pool = OcrPool(1, max_queued)
+    release = threading.Event()
+    pool.submit(OcrRequest(BATCH), release.wait)
+    while pool.depth():
+        time.sleep(0.001)
+    return pool, release
+
+
+def test_ocr_pool_runs_interactive_work_before_batch():
+    from app.pii_scanner.ocr_pool import BATCH, INTERACTIVE, OcrRequest
+
+    pool, release = _busy_pool(8)
+    order = []
+    futures = [
+        pool.submit(OcrRequest(BATCH), lambda: order.append("batch")),
+        pool.submit(OcrRequest(INTERACTIVE), lambda: order.append("interactive")),
+    ]
+    release.set()
+    for future in futures:
+        future.result(timeout=5)
+    assert order == ["interactive", "batch"]
+
+
+def test_ocr_pool_bounds_batch_work_and_drops_cancelled_requests():
+    import pytest
+    from app.pii_scanner.ocr_pool import BATCH, INTERACTIVE, OcrCancelled, OcrQueueFull, OcrRequest
+
+    pool, release = _busy_pool(2)
+    job = OcrRequest(BATCH)
+    queued = pool.submit(job, lambda: "never")
+    # batch may fill half the queue; interactive work still gets in
+    with pytest.raises(OcrQueueFull):
+        pool.submit(OcrRequest(BATCH), lambda: None, timeout=0.01)
+    upload = pool.submit(OcrRequest(INTERACTIVE), lambda: "text")
+    job.cancel()
+    assert queued.cancelled() and pool.depth() == 1
+    with pytest.raises(OcrCancelled):
+        pool.submit(job, lambda: None)
+    release.set()
+    assert upload.result(timeout=5) == "text"
+
+
+def test_ocr_profiles_trade_resolution_for_speed():
+    import fitz
+    import numpy as np
+    import pytest
+    from app.pii_scanner.preprocess import get_profile, preprocess
+
+    doc = fitz.open()
+    page = doc.new_page()
+    for i in range(30):
+        page.insert_text((72, 72 + 16 * i), f"Applicant {i} PAN ABCDE1234F email a{i}@example.com", fontsize=10)
+    pix = page.get_pixmap(dpi=300, colorspace=fitz.csGRAY)
+    gray = np.frombuffer(pix.samples, np.uint8).reshape(pix.height, pix.width)
+
+    quality, fast = preprocess(gray, get_profile("quality")), preprocess(gray, get_profile("fast"))
+    assert quality.size == (pix.width, pix.height)
+    # margins cropped and text shrunk to the profile's glyph height
+    assert fast.width < pix.width * 0.6 and fast.height < pix.height * 0.7
+    assert set(np.unique(np.asarray(fast))) <= {0, 255}
+    with pytest.raises(ValueError):
+        get_profile("best")
+
+
+def test_adaptive_dpi_rereads_only_doubtful_lines_at_high_dpi(monkeypatch, ocr_cache_dir):
+    import fitz
+    from app import config as conf
+    from app.pii_scanner import extract
+    from app.pii_scanner.preprocess import get_profile
+
+    monkeypatch.setattr(conf, "OCR_ADAPTIVE_DPI", True)
+    doc = fitz.open()
+    page = doc.new_page(width=600, height=800)
+    page.insert_image(page.rect, pixmap=fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 8, 8), 0))
+    reads = []
+
+    def read_word_boxes(img, config=extract.OCR_CONFIG, stage="general"):
+        reads.append((stage, img.size))
+        if stage == "region":
+            return [[(1, 1, 1), "2345", 95.0, (0, 0, 40, 20)], [(1, 1, 1), "6789", 95.0, (45, 0, 40, 20)]]
+        return [
+            [(1, 1, 1), "Name", 96.0, (50, 50, 60, 20)],
+            [(1, 1, 1), "Ravi", 96.0, (120, 50, 60, 20)],
+            [(1, 1, 2), "Aadhaar", 95.0, (50, 80, 90, 20)],
+            [(1, 1, 2), "2345", 70.0, (150, 80, 50, 20)],
+            [(1, 1, 2), "67B9", 40.0, (210, 80, 50, 20)],
+        ]
+
+    monkeypatch.setattr(extract, "_read_word_boxes", read_word_boxes)
+    text = extract._ocr_pdf_page(page, profile=get_profile("quality"))
+    assert text == "Name Ravi\nAadhaar 2345 6789"
+    (low_stage, low_size), (region_stage, region_size) = reads
+    assert low_stage == "general" and low_size == (round(600 * 150 / 72), round(800 * 150 / 72))
+    # the two doubtful words of line 2, re-rendered at 300 DPI
+    assert region_stage == "region" and 230 < region_size[0] < 260 and 55 < region_size[1] < 75
+
+
+def test_render_ahead_bounds_pages_in_flight_and_cleans_up():
+    import time
+    import pytest
+    from app.pii_scanner.render import render_ahead
+
+    produced, consumed = [], []
+
+    def pages(n):
+        try:
+            for i in range(n):
+                produced.append(i)
+                yield i
+        finally:
+            produced.append("closed")
+
+    for page in render_ahead(pages(20), 2):
+        consumed.append(page)
+        time.sleep(0.005)
+        # two queued and one waiting to be queued, beyond the page in hand
+        assert len([p for p in produced if p != "closed"]) - len(consumed) <= 3
+    assert consumed == list(range(20))
+
+    produced.clear()
+    pending = render_ahead(pages(100), 2)
+    assert next(pending) == 0
+    pending.close()
+    assert produced[-1] == "closed" and len(produced) < 10
+
+    def failing():
+        yield 1
+        raise ValueError("unreadable page")
+
+    with pytest.raises(ValueError):
+        list(render_ahead(failing(), 2))
+
+
+def test_iter_pdf_images_renders_each_page():
+    import fitz
+    from app.pii_scanner.render import iter_pdf_images
+
+    doc = fitz.open()
+    for _ in range(3):
+        doc.new_page(width=144, height=72)
+    images = list(iter_pdf_images(doc.tobytes(), dpi=100))
+    assert [image.size for image in images] == [(200, 100)] * 3
+
+
+def test_ocr_cache_failures_are_cache_misses(monkeypatch, ocr_cache_dir):
+    from app.pii_scanner.ocr import cached_ocr
+    from app.pii_scanner.ocr_cache import OcrCache
+
+    def fail(*args):
+        raise OSError(30, "Read-only file system")
+
+    monkeypatch.setattr(OcrCache, "get", fail)
+    monkeypatch.setattr(OcrCache, "put", fail)
+    assert cached_ocr("key", lambda: "PAN ABCDE1234F") == "PAN ABCDE1234F"
@@ -0,0 +1,74 @@
+"""DOCX text extraction time and peak memory: python-docx vs the streaming docx_xml reader.
+
+    python scripts/bench_docx.py                      # 1000, 5000 and 20000 paragraphs
+    python scripts/bench_docx.py --paragraphs 50000
+
+The documents are built with python-docx: paragraphs of form text with a
+table row after every 20 paragraphs. "python-docx" reads paragraphs and
+table cells as the extractors did before docx_xml; peak memory is the
+tracemalloc peak during extraction.
+"""
+import argparse
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def build_docx(paragraphs):
+    import docx
+    doc = docx.Document()
+    for i in range(paragraphs):
+        doc.add_paragraph(f"Applicant {i} PAN ABCDE{i % 10000:04d}F, mail applicant{i}@example.com")
+        if i % 20 == 19:
+            row = doc.add_table(rows=1, cols=3).rows[0].cells
+            row[0].text, row[1].text, row[2].text = f"Row {i}", "Aadhaar", "2345 6789 0123"
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def python_docx_text(data):
+    import docx
+    doc = docx.Document(io.BytesIO(data))
+    parts = [p.text for p in doc.paragraphs]
+    for table in doc.tables:
+        for row in table.rows:
+            parts.append("\t".join(cell.text for cell in row.cells))
+    return parts
+
+
+def streaming_text(data):
+    from pii_scanner.docx_xml import iter_docx_blocks
+    # count blocks without keeping them, as a scanner consuming them would
+    return sum(1 for _ in iter_docx_blocks(io.BytesIO(data)))
+
+
+def measure(extract, data):
+    tracemalloc.start()
+    started = time.perf_counter()
+    extract(data)
+    seconds = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paragraphs", default="1000,5000,20000", help="Comma-separated paragraph counts")
+    args = parser.parse_args()
+    sys.path.insert(0, os.path.join(ROOT, "src"))
+
+    print(f"{'paragraphs':>10} {'python-docx s':>14} {'MiB':>7} {'streaming s':>12} {'MiB':>7}")
+    for count in (int(n) for n in args.paragraphs.split(",")):
+        data = build_docx(count)
+        (docx_s, docx_mib), (stream_s, stream_mib) = measure(python_docx_text, data), measure(streaming_text, data)
+        print(f"{count:10} {docx_s:14.3f} {docx_mib:7.1f} {stream_s:12.3f} {stream_mib:7.1f}")
+
+
+if __name__ == "__main__":
+    main()
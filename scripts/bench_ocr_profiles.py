@@ -0,0 +1,113 @@
+"""OCR speed and detection recall per preprocessing profile on a synthetic scanned corpus.
+
+    python scripts/bench_ocr_profiles.py                      # 10 pages, every profile
+    python scripts/bench_ocr_profiles.py --pages 40 --profiles fast,balanced
+
+Each page is a form of PAN, Aadhaar and email lines rendered at --dpi, then
+rotated, blurred and speckled like a scan. Every profile OCRs the same pages
+through the backend (app/pii_scanner) with the OCR cache off; recall is the
+share of planted values the scanner finds in the OCR text. Without Tesseract
+only the preprocessing time is reported.
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def planted_values(rng):
+    pan = "".join(rng.choices(string.ascii_uppercase, k=3)) + "P" + rng.choice(string.ascii_uppercase) \
+        + "".join(rng.choices(string.digits, k=4)) + rng.choice(string.ascii_uppercase)
+    aadhaar = str(rng.randint(2, 9)) + "".join(rng.choices(string.digits, k=11))
+    email = "".join(rng.choices(string.ascii_lowercase, k=6)) + "@example.com"
+    return [("PAN", pan), ("AADHAAR", f"{aadhaar[:4]} {aadhaar[4:8]} {aadhaar[8:]}"), ("EMAIL", email)]
+
+
+def scanned_page(rng, dpi, lines=12):
+    """``(grayscale numpy image, [(type, value)])`` for one synthetic scanned page."""
+    import cv2
+    import fitz
+    import numpy as np
+    doc = fitz.open()
+    page = doc.new_page()
+    truth = []
+    y = 72
+    for i in range(lines):
+        values = planted_values(rng)
+        truth.extend(values)
+        for label, value in values:
+            page.insert_text((72, y), f"Applicant {i + 1} {label}: {value}", fontsize=rng.choice((9, 10, 11, 12)))
+            y += 18
+    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+    gray = np.frombuffer(pix.samples, np.uint8).reshape(pix.height, pix.width).copy()
+    # scanner artefacts: skew, soft focus, grey paper and speckle
+    h, w = gray.shape
+    skew = cv2.getRotationMatrix2D((w / 2, h / 2), rng.uniform(-0.8, 0.8), 1.0)
+    gray = cv2.warpAffine(gray, skew, (w, h), borderValue=255)
+    gray = cv2.GaussianBlur(gray, (3, 3), 0)
+    noise = np.random.default_rng(rng.randint(0, 2 ** 31)).normal(0, 12, gray.shape)
+    gray = np.clip(gray.astype(np.float32) * 0.9 + 10 + noise, 0, 255).astype(np.uint8)
+    return gray, truth
+
+
+def tesseract_available():
+    try:
+        import pytesseract
+        from app.pii_scanner.extract import _tesseract
+        _tesseract()
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=10, help="Pages in the corpus")
+    parser.add_argument("--dpi", type=int, default=300, help="Render resolution of the corpus")
+    parser.add_argument("--profiles", default="", help="Comma-separated profiles (default: all)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.join(ROOT, "backend"))
+    os.environ["OCR_CACHE_DIR"] = ""
+    from app.pii_scanner.extract import _ocr_words
+    from app.pii_scanner.preprocess import PROFILES, get_profile, preprocess
+    from app.pii_scanner.scan import scan_findings
+
+    names = args.profiles.split(",") if args.profiles else list(PROFILES)
+    profiles = [get_profile(name) for name in names]
+    rng = random.Random(args.seed)
+    corpus = [scanned_page(rng, args.dpi) for _ in range(args.pages)]
+    ocr = tesseract_available()
+    if not ocr:
+        print("Tesseract not found (set TESSERACT_CMD): reporting preprocessing only\n")
+
+    print(f"{'profile':10} {'pages/s':>8} {'prep ms/page':>13} {'ocr ms/page':>12} {'recall':>7}")
+    for profile in profiles:
+        prep_seconds = ocr_seconds = 0.0
+        found = planted = 0
+        for gray, truth in corpus:
+            started = time.perf_counter()
+            image = preprocess(gray, profile)
+            prep_seconds += time.perf_counter() - started
+            if not ocr:
+                continue
+            started = time.perf_counter()
+            text = _ocr_words(image)
+            ocr_seconds += time.perf_counter() - started
+            seen = {(f["type"], "".join(f["value"].split())) for f in scan_findings(text).to_dicts()}
+            planted += len(truth)
+            found += sum((kind, "".join(value.split())) in seen for kind, value in truth)
+        pages = len(corpus)
+        rate = pages / (prep_seconds + ocr_seconds) if prep_seconds + ocr_seconds else 0.0
+        recall = f"{found / planted:7.1%}" if planted else f"{'-':>7}"
+        print(f"{profile.name:10} {rate:8.2f} {prep_seconds / pages * 1e3:13.1f} {ocr_seconds / pages * 1e3:12.1f} {recall}")
+
+
+if __name__ == "__main__":
+    main()
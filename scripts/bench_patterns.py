@@ -0,0 +1,48 @@
+"""Worst-case scan time per detector on adversarial input of growing length.
+
+    python scripts/bench_patterns.py              # src/pii_scanner detectors
+    python scripts/bench_patterns.py --backend    # backend/app/pii_scanner detectors
+
+Exits non-zero if any detector's time grows superlinearly with input length.
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", action="store_true", help="Audit the backend detector set")
+    parser.add_argument("--sizes", default="2000,16000,64000", help="Comma-separated input lengths")
+    args = parser.parse_args()
+
+    if args.backend:
+        sys.path.insert(0, os.path.join(ROOT, "backend"))
+        from app.pii_scanner.detectors.audit import measure_growth
+        from app.pii_scanner.detectors.patterns import get_detector_set
+    else:
+        sys.path.insert(0, os.path.join(ROOT, "src"))
+        from pii_scanner.detectors.audit import measure_growth
+        from pii_scanner.detectors.patterns import get_detector_set
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    detectors = get_detector_set().detectors
+    failed = False
+    print(f"{'detector':10} {'worst input':28} " + " ".join(f"{n:>10}" for n in sizes) + "  growth")
+    columns = {}
+    for small, large in zip(sizes, sizes[1:]):
+        for growth in measure_growth(detectors, sizes=(small, large)):
+            row = columns.setdefault(growth.detector, {"label": growth.label, "times": {small: growth.small_seconds}, "worst": 0.0})
+            row["times"][large] = growth.large_seconds
+            row["worst"] = max(row["worst"], growth.ratio / growth.size_ratio)
+            failed |= growth.is_superlinear()
+    for name, row in columns.items():
+        times = " ".join(f"{row['times'].get(n, 0) * 1e3:8.2f}ms" for n in sizes)
+        print(f"{name:10} {row['label']:28} {times}  x{row['worst']:.1f}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
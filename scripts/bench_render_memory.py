@@ -0,0 +1,84 @@
+"""Peak memory of rendering a scanned PDF for OCR, all pages at once vs a few at a time.
+
+    python scripts/bench_render_memory.py                    # 10, 40 and 160 pages at 300 DPI
+    python scripts/bench_render_memory.py --pages 25,100 --dpi 200
+
+Each measurement runs in a fresh process and reports how far peak RSS rose
+above the process's baseline while the pages were rendered and handed to a
+stand-in OCR step. "eager" keeps every page image, as
+pdf2image.convert_from_bytes does; "lazy" is the backend's
+render_ahead(iter_pdf_images(...)), which should stay flat as pages grow.
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def scanned_pdf(pages):
+    """An image-only PDF of ``pages`` A4 pages sharing one noisy scan image."""
+    import fitz
+    import numpy as np
+    noise = np.random.default_rng(0).integers(160, 255, (1754, 1240), dtype=np.uint8)
+    scan = fitz.Pixmap(fitz.csGRAY, 1240, 1754, noise.tobytes(), False)
+    doc = fitz.open()
+    xref = 0
+    for _ in range(pages):
+        page = doc.new_page(width=595, height=842)
+        xref = page.insert_image(page.rect, pixmap=scan) if not xref else page.insert_image(page.rect, xref=xref)
+    return doc.tobytes()
+
+
+def peak_rss_mib():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def child(mode, path, dpi, ahead):
+    sys.path.insert(0, os.path.join(ROOT, "backend"))
+    from app.pii_scanner.render import iter_pdf_images, render_ahead
+    with open(path, "rb") as f:
+        data = f.read()
+    baseline = peak_rss_mib()
+    pages = iter_pdf_images(data, dpi)
+    images = list(pages) if mode == "eager" else render_ahead(pages, ahead)
+    for image in images:
+        image.convert("L").getextrema()  # stands in for OCR
+    print(f"{peak_rss_mib() - baseline:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", default="10,40,160", help="Comma-separated page counts")
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument("--ahead", type=int, default=2, help="Pages rendered ahead of OCR (OCR_RENDER_AHEAD)")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PDF"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child[0], args.child[1], args.dpi, args.ahead)
+        return
+
+    print(f"{'pages':>6} {'eager MiB':>10} {'lazy MiB':>9}")
+    for count in (int(n) for n in args.pages.split(",")):
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+            f.write(scanned_pdf(count))
+        try:
+            row = []
+            for mode in ("eager", "lazy"):
+                out = subprocess.run(
+                    [sys.executable, __file__, "--dpi", str(args.dpi), "--ahead", str(args.ahead), "--child", mode, f.name],
+                    check=True, capture_output=True, text=True,
+                ).stdout
+                row.append(float(out.split()[-1]))
+        finally:
+            os.remove(f.name)
+        print(f"{count:6} {row[0]:10.1f} {row[1]:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
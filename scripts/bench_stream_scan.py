@@ -0,0 +1,82 @@
+"""Peak memory of scanning a large log file, read whole vs streamed from a memory map.
+
+    python scripts/bench_stream_scan.py                 # 16, 64 and 256 MiB logs
+    python scripts/bench_stream_scan.py --sizes 32,512
+
+Each measurement runs in a fresh process and reports how far peak RSS rose
+above the process's baseline while the log was scanned and its redacted copy
+written out. "whole" reads and decodes the file and scans it with scan_text,
+as the scanner does below --stream-min-bytes; "streamed" is the src scanner's
+scan_text_stream over iter_text_file, which should stay flat as files grow.
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# one PII-bearing line in every ten
+LINES = [f"2024-05-0{i % 9 + 1} 12:00:{i:02d} INFO GET /api/v1/items/{i} status=200 latency={i}ms\n" for i in range(9)]
+LINES.append("2024-05-09 12:00:09 WARN login user ABCDE1234F mail a.b@example.com aadhaar 2345 6789 0123\n")
+
+
+def write_log(path, mib):
+    block = "".join(LINES) * 1000
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(mib * 1024 * 1024 // len(block)):
+            f.write(block)
+
+
+def peak_rss_mib():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def child(mode, path):
+    sys.path.insert(0, os.path.join(ROOT, "src"))
+    from pii_scanner.extract import iter_text_file
+    from pii_scanner.scan import scan_text, scan_text_stream
+    baseline = peak_rss_mib()
+    started = time.perf_counter()
+    with open(path + ".redacted", "w", encoding="utf-8", newline="") as out:
+        if mode == "whole":
+            with open(path, "rb") as f:
+                findings, redacted = scan_text(f.read().decode(errors="ignore"))
+            out.write(redacted)
+            count = len(findings)
+        else:
+            count = sum(1 for _ in scan_text_stream(iter_text_file(path), write=out.write))
+    print(f"{peak_rss_mib() - baseline:.1f} {time.perf_counter() - started:.2f} {count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="16,64,256", help="Comma-separated log sizes in MiB")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "LOG"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(*args.child)
+        return
+
+    print(f"{'MiB':>5} {'whole MiB':>10} {'s':>6} {'streamed MiB':>13} {'s':>6}")
+    for size in (int(n) for n in args.sizes.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "app.log")
+            write_log(path, size)
+            row = []
+            for mode in ("whole", "streamed"):
+                out = subprocess.run(
+                    [sys.executable, __file__, "--child", mode, path], check=True, capture_output=True, text=True,
+                ).stdout.splitlines()[-1].split()
+                row.append((float(out[0]), float(out[1]), int(out[2])))
+        assert row[0][2] == row[1][2], "whole and streamed scans disagree"
+        print(f"{size:5} {row[0][0]:10.1f} {row[0][1]:6.2f} {row[1][0]:13.1f} {row[1][1]:6.2f}")
+
+
+if __name__ == "__main__":
+    main()
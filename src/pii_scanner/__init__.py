@@ -1,5 +1,6 @@
 __all__ = [
 	"scan",
+	"findings",
 	"extract",
 	"ocr",
 ] 
\ No newline at end of file
@@ -1,6 +1,7 @@
 import argparse
 from typing import Optional
 
+from .resolve import DEFAULT_OVERLAP_POLICY, OVERLAP_POLICIES
 from .scan import scan_path, write_report, ScanOptions
 
 
@@ -16,6 +17,35 @@ def _parse_args() -> argparse.Namespace:
 	scan.add_argument("--mask", action="store_true", help="Mask PII values in outputs")
 	scan.add_argument("--output", default="report.json", help="Path to JSON report output")
 	scan.add_argument("--redact-output-dir", default="", help="Directory to write redacted text files")
+	scan.add_argument(
+		"--overlap-policy",
+		default=DEFAULT_OVERLAP_POLICY,
+		choices=OVERLAP_POLICIES,
+		help="Which detection to keep when several overlap ('keep' reports all)",
+	)
+	scan.add_argument(
+		"--time-budget",
+		type=float,
+		default=0.0,
+		help="Seconds of matching allowed per document; remaining detectors are skipped (0 = no limit)",
+	)
+	scan.add_argument(
+		"--pdf-workers",
+		type=int,
+		default=1,
+		help="Processes used to extract large PDFs page-parallel (0 = one per CPU)",
+	)
+	scan.add_argument(
+		"--stream-min-bytes",
+		type=int,
+		default=16 * 1024 * 1024,
+		help="Scan .txt/.csv/.log/.json files at least this large in windows from a memory map (constant memory)",
+	)
+	scan.add_argument(
+		"--by-page",
+		action="store_true",
+		help="Scan each page as it is extracted; findings get a page number and page-relative spans",
+	)
 	return parser.parse_args()
 
 
@@ -28,6 +58,11 @@ def main() -> None:
 			mask=args.mask,
 			redact_output_dir=args.redact_output_dir,
 			recursive=args.recursive,
+			overlap_policy=args.overlap_policy,
+			time_budget=args.time_budget,
+			pdf_workers=args.pdf_workers,
+			by_page=args.by_page,
+			stream_min_bytes=args.stream_min_bytes,
 		)
 		report = scan_path(args.input, options)
 		write_report(report, args.output)
@@ -0,0 +1,59 @@
+import re
+from dataclasses import dataclass
+from typing import Tuple
+
+# Shortest digit run / uppercase token any detector can use; shorter ones are not indexed.
+_MIN_DIGIT_RUN = 4
+_MIN_UPPER_TOKEN = 8
+
+_DIGIT_RUN = re.compile(r"[0-9]{%d,}" % _MIN_DIGIT_RUN)
+_UPPER_TOKEN = re.compile(r"[A-Z0-9]{%d,}" % _MIN_UPPER_TOKEN)
+
+
+@dataclass(frozen=True)
+class TextIndex:
+	"""Cheap facts about a text, gathered once before any detector runs."""
+
+	has_at: bool
+	digit_runs: Tuple[Tuple[int, int], ...]  # spans of runs with >= 4 ASCII digits
+	upper_tokens: Tuple[Tuple[int, int], ...]  # spans of [A-Z0-9] runs (>= 8) with a letter
+	max_digit_run: int
+	indexed_digits: int  # total digits inside digit_runs
+	max_upper_token: int
+
+
+def build_index(text: str) -> TextIndex:
+	digit_runs = tuple(m.span() for m in _DIGIT_RUN.finditer(text))
+	upper_tokens = tuple(m.span() for m in _UPPER_TOKEN.finditer(text) if not m.group().isdigit())
+	run_lengths = [end - start for start, end in digit_runs]
+	return TextIndex(
+		has_at="@" in text,
+		digit_runs=digit_runs,
+		upper_tokens=upper_tokens,
+		max_digit_run=max(run_lengths, default=0),
+		indexed_digits=sum(run_lengths),
+		max_upper_token=max((end - start for start, end in upper_tokens), default=0),
+	)
+
+
+@dataclass(frozen=True)
+class Prefilter:
+	"""Necessary conditions for a detector's pattern to match anywhere in a text.
+
+	Every field is a lower bound the text must meet; a detector whose prefilter
+	rejects the index cannot match and is skipped.
+	"""
+
+	needs_at: bool = False
+	min_digit_run: int = 0
+	min_digits: int = 0
+	min_upper_token: int = 0
+
+	def allows(self, index: TextIndex) -> bool:
+		if self.needs_at and not index.has_at:
+			return False
+		if index.max_digit_run < self.min_digit_run:
+			return False
+		if index.indexed_digits < self.min_digits:
+			return False
+		return index.max_upper_token >= self.min_upper_token
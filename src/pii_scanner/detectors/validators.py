@@ -1,5 +1,12 @@
 import re
-from typing import Optional
+from typing import Optional, Sequence, List
+
+try:
+	import numpy as np
+except ImportError:  # pragma: no cover
+	np = None
+
+from ..normalize import DIGIT_TABLE
 
 # Verhoeff algorithm tables
 _d_table = [
@@ -35,6 +42,22 @@ def _verhoeff_checksum(number: str) -> int:
 	return _inv_table[c]
 
 
+def verhoeff_checksums(numbers: Sequence[str]) -> List[int]:
+	"""Verhoeff check values for many digit strings of the same length at once."""
+	if not numbers:
+		return []
+	if np is None:
+		return [_verhoeff_checksum(number) for number in numbers]
+	width = len(numbers[0])
+	digits = np.frombuffer("".join(numbers).encode("ascii"), dtype=np.uint8).reshape(len(numbers), width) - ord("0")
+	d_table = np.asarray(_d_table, dtype=np.uint8)
+	p_table = np.asarray(_p_table, dtype=np.uint8)
+	c = np.zeros(len(numbers), dtype=np.uint8)
+	for i in range(width):
+		c = d_table[c, p_table[(i + 1) % 8, digits[:, width - 1 - i]]]
+	return np.asarray(_inv_table, dtype=np.uint8)[c].tolist()
+
+
 def is_valid_aadhaar(aadhaar: str) -> bool:
 	"""Validate 12-digit Aadhaar using Verhoeff checksum and basic format checks."""
 	if not re.fullmatch(r"[2-9]{1}[0-9]{11}", aadhaar):
@@ -43,6 +66,13 @@ def is_valid_aadhaar(aadhaar: str) -> bool:
 
 
 
+def are_valid_aadhaar(values: Sequence[str]) -> List[bool]:
+	"""Batch form of is_valid_aadhaar: format check per value, one checksum pass for all."""
+	well_formed = [value for value in values if re.fullmatch(r"[2-9]{1}[0-9]{11}", value)]
+	checks = dict(zip(well_formed, verhoeff_checksums(well_formed)))
+	return [checks.get(value) == 0 for value in values]
+
+
 def is_valid_pan(pan: str) -> bool:
 	if not re.fullmatch(r"[A-Z]{5}[0-9]{4}[A-Z]", pan):
 		return False
@@ -57,14 +87,38 @@ def is_valid_dl(dl: str) -> bool:
 	return re.fullmatch(r"[A-Z]{2}-?[0-9]{2}-?[0-9]{11,12}", dl) is not None
 
 
+def is_valid_epic(epic: str) -> bool:
+	return re.fullmatch(r"[A-Z]{3}[0-9]{7}", epic) is not None
+
+
+def is_valid_ifsc(ifsc: str) -> bool:
+	return re.fullmatch(r"[A-Z]{4}0[A-Z0-9]{6}", ifsc) is not None
+
+
+def is_valid_gstin(gstin: str) -> bool:
+	return re.fullmatch(r"[0-9]{2}[A-Z]{5}[0-9]{4}[A-Z][A-Z0-9]Z[A-Z0-9]", gstin) is not None
+
+
+def is_valid_tan(tan: str) -> bool:
+	return re.fullmatch(r"[A-Z]{4}[0-9]{5}[A-Z]", tan) is not None
+
+
+def is_valid_email(email: str) -> bool:
+	local, sep, domain = email.partition("@")
+	return bool(local) and bool(sep) and "." in domain and not domain.startswith(".")
+
+
+def is_valid_indian_mobile(mobile: str) -> bool:
+	mobile = re.sub(r"[\s\-]", "", mobile)
+	if mobile.startswith("+91"):
+		mobile = mobile[3:]
+	return re.fullmatch(r"[6-9][0-9]{9}", mobile) is not None
+
+
+def is_valid_upi(upi: str) -> bool:
+	return re.fullmatch(r"[a-zA-Z0-9.\-_]{2,256}@[a-zA-Z]{2,64}", upi) is not None
+
+
 def normalize_digits(text: str) -> str:
-	indic_zero = ord("०")
-	ascii_zero = ord("0")
-	result_chars = []
-	for char in text:
-		code = ord(char)
-		if 0x0966 <= code <= 0x096F:
-			result_chars.append(chr(ascii_zero + (code - indic_zero)))
-		else:
-			result_chars.append(char)
-	return "".join(result_chars) 
\ No newline at end of file
+	"""Fold every Unicode decimal digit script to ASCII; lengths are unchanged."""
+	return text.translate(DIGIT_TABLE)
@@ -0,0 +1,110 @@
+"""Streaming text extraction from DOCX files, straight from the WordprocessingML parts.
+
+python-docx builds the whole document tree and only exposes body paragraphs
+and tables; this reads the zip members with an incremental parser, drops
+each element once it has been read, and yields text one block at a time.
+Blocks come from headers, the body (paragraphs, table rows, text boxes),
+footers, footnotes and endnotes, in that order.
+"""
+import re
+import zipfile
+from typing import IO, Iterator, List, Union
+from xml.etree.ElementTree import iterparse
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC = "{http://schemas.openxmlformats.org/markup-compatibility/2006}"
+
+_P, _T, _TAB, _BR, _CR, _HYPHEN = _W + "p", _W + "t", _W + "tab", _W + "br", _W + "cr", _W + "noBreakHyphen"
+_R, _TR, _TC, _TXBX = _W + "r", _W + "tr", _W + "tc", _W + "txbxContent"
+# alternative renderings of the same content (e.g. a text box as DrawingML and as VML); only the first is read
+_FALLBACK = _MC + "Fallback"
+_RUN_TEXT = {_TAB: "\t", _BR: "\n", _CR: "\n", _HYPHEN: "-"}
+
+_PART = re.compile(r"word/(header|footer|footnotes|endnotes)(\d*)\.xml")
+_PART_ORDER = {"header": 0, "document": 1, "footer": 2, "footnotes": 3, "endnotes": 4}
+
+
+def docx_parts(zf: zipfile.ZipFile) -> List[str]:
+	"""Names of the parts that hold document text, in reading order."""
+	parts = []
+	for name in zf.namelist():
+		if name == "word/document.xml":
+			parts.append((_PART_ORDER["document"], 0, name))
+			continue
+		match = _PART.fullmatch(name)
+		if match:
+			parts.append((_PART_ORDER[match.group(1)], int(match.group(2) or 0), name))
+	return [name for _, _, name in sorted(parts)]
+
+
+def iter_part_blocks(stream: IO[bytes]) -> Iterator[str]:
+	"""Yield the text of each block of one WordprocessingML part.
+
+	A block is a paragraph, a table row (cells joined by tabs, paragraphs
+	within a cell by newlines) or a paragraph of a text box, which is
+	yielded on its own before the paragraph that anchors it.
+	"""
+	paragraphs: List[List[str]] = []  # open paragraphs, innermost last
+	rows: List[List[str]] = []  # cells of open table rows
+	cells: List[List[str]] = []  # paragraphs of open table cells
+	containers: List[str] = []  # open cells and text boxes, innermost last
+	parents = []  # open elements; each is removed from its parent once read
+	skip = 0  # depth inside mc:Fallback
+	for event, elem in iterparse(stream, events=("start", "end")):
+		tag = elem.tag
+		if event == "start":
+			parents.append(elem)
+			if tag == _FALLBACK or skip:
+				skip += 1
+			elif tag == _P:
+				paragraphs.append([])
+			elif tag == _TR:
+				rows.append([])
+			elif tag == _TC:
+				cells.append([])
+				containers.append(_TC)
+			elif tag == _TXBX:
+				containers.append(_TXBX)
+			continue
+
+		parents.pop()
+		if parents:
+			parents[-1].remove(elem)
+		if skip:
+			skip -= 1
+			continue
+		if tag == _T:
+			if paragraphs and elem.text:
+				paragraphs[-1].append(elem.text)
+		elif tag in _RUN_TEXT:
+			# w:tab also defines tab stops in paragraph properties; only run content is text
+			if paragraphs and parents and parents[-1].tag == _R:
+				paragraphs[-1].append(_RUN_TEXT[tag])
+		elif tag == _P:
+			text = "".join(paragraphs.pop())
+			if containers and containers[-1] == _TC:
+				cells[-1].append(text)
+			else:
+				yield text
+		elif tag == _TC:
+			containers.pop()
+			text = "\n".join(cells.pop())
+			if rows:
+				rows[-1].append(text)
+		elif tag == _TR:
+			text = "\t".join(rows.pop())
+			# a row of a table nested in a cell is part of that cell
+			if containers and containers[-1] == _TC:
+				cells[-1].append(text)
+			else:
+				yield text
+		elif tag == _TXBX:
+			containers.pop()
+
+
+def iter_docx_blocks(source: Union[str, IO[bytes]]) -> Iterator[str]:
+	"""Yield the text blocks of a DOCX file (path or binary file object); see iter_part_blocks."""
+	with zipfile.ZipFile(source) as zf:
+		for name in docx_parts(zf):
+			with zf.open(name) as part:
+				yield from iter_part_blocks(part)
@@ -1,46 +1,139 @@
+import codecs
+import mmap
 import os
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from multiprocessing import get_context
+from typing import Iterator, List, Optional, Tuple
 
-from .ocr import image_to_text
+from .docx_xml import iter_docx_blocks
+from .ocr import image_to_text, pdf_page_to_text
+from .pages import profile_page
 
 try:
 	import fitz  # pymupdf
 except Exception:  # pragma: no cover
 	fitz = None
 
-try:
-	from docx import Document
-except Exception:  # pragma: no cover
-	Document = None
-
 
 def read_text_file(path: str) -> str:
 	with open(path, "r", encoding="utf-8", errors="ignore") as f:
 		return f.read()
 
 
-def extract_text_from_pdf(path: str, ocr: bool = False, ocr_lang: str = "eng") -> str:
+# bytes of a text file decoded per step by iter_text_file
+TEXT_WINDOW_BYTES = 1024 * 1024
+
+
+def iter_text_file(path: str, window: int = TEXT_WINDOW_BYTES) -> Iterator[str]:
+	"""Yield a UTF-8 file's text ``window`` bytes at a time, from a memory map.
+
+	A character split across windows is decoded whole with the next one, and
+	undecodable bytes are dropped as in read_text_file. Unlike read_text_file
+	line endings are not translated, so offsets into the joined chunks are
+	character offsets into the file's own text. Memory use is one window
+	whatever the file size.
+	"""
+	decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+	with open(path, "rb") as f:
+		if os.fstat(f.fileno()).st_size == 0:
+			return
+		with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+			advise = hasattr(mm, "madvise")
+			if advise:
+				mm.madvise(mmap.MADV_SEQUENTIAL)
+			released = 0
+			for start in range(0, len(mm), window):
+				text = decoder.decode(mm[start:start + window])
+				# decoded pages stay resident (and in RSS) until unmapped; drop them
+				done = min(start + window, len(mm)) // mmap.PAGESIZE * mmap.PAGESIZE
+				if advise and hasattr(mmap, "MADV_DONTNEED") and done > released:
+					mm.madvise(mmap.MADV_DONTNEED, released, done - released)
+					released = done
+				if text:
+					yield text
+	tail = decoder.decode(b"", final=True)
+	if tail:
+		yield tail
+
+
+# PDFs with fewer pages are extracted in-process even when workers > 1
+PARALLEL_MIN_PAGES = 64
+# page ranges queued per worker; more than one keeps the pool busy when page costs differ
+RANGES_PER_WORKER = 4
+
+
+def _page_text(page, ocr: bool, ocr_lang: str) -> Optional[str]:
+	"""The page's OCR text if ``ocr`` is set and profile_page says it needs it, else its text layer (None if empty)."""
+	text = page.get_text("text")
+	if ocr and profile_page(page, text).needs_ocr:
+		return pdf_page_to_text(page, ocr_lang, dpi=300)
+	return text if text.strip() else None
+
+
+def _extract_page_range(path: str, start: int, stop: int, ocr: bool, ocr_lang: str) -> List[Optional[str]]:
+	"""_page_text for pages ``start`` to ``stop - 1``; runs in a pool worker, which opens the file itself."""
+	with fitz.open(path) as doc:
+		return [_page_text(doc[number], ocr, ocr_lang) for number in range(start, stop)]
+
+
+def _page_ranges(page_count: int, workers: int) -> List[Tuple[int, int]]:
+	size = max(1, -(-page_count // (workers * RANGES_PER_WORKER)))
+	return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def iter_pdf_pages(
+	path: str,
+	ocr: bool = False,
+	ocr_lang: str = "eng",
+	workers: int = 1,
+	min_pages: int = PARALLEL_MIN_PAGES,
+) -> Iterator[Tuple[int, str]]:
+	"""Yield ``(page_no, text)`` (1-based) in page order as each page is extracted.
+
+	With ``ocr`` set, pages that profile_page classifies as scanned or
+	garbled are OCRed; otherwise pages without text are skipped. With
+	``workers`` > 1 (0 for one per CPU), documents of at least
+	``min_pages`` pages are split into page ranges extracted, and OCRed, on
+	a process pool; each worker opens the file by path, and ranges are
+	yielded as soon as they and every range before them are done.
+	"""
 	if fitz is None:
 		raise RuntimeError("pymupdf is not installed")
-	text_parts = []
+	workers = workers or os.cpu_count() or 1
 	with fitz.open(path) as doc:
-		for page in doc:
-			text = page.get_text("text")
-			if text.strip():
-				text_parts.append(text)
-			elif ocr:
-				pix = page.get_pixmap(dpi=300)
-				img_bytes = pix.tobytes("png")
-				text_parts.append(image_to_text(img_bytes, ocr_lang))
-	return "\n".join(text_parts)
+		page_count = doc.page_count
+		if workers == 1 or page_count < min_pages:
+			for number, page in enumerate(doc, 1):
+				text = _page_text(page, ocr, ocr_lang)
+				if text is not None:
+					yield number, text
+			return
+	ranges = _page_ranges(page_count, workers)
+	starts, stops = zip(*ranges)
+	# spawn, not fork: the parent may hold threads or an open document
+	with ProcessPoolExecutor(max_workers=min(workers, len(ranges)), mp_context=get_context("spawn")) as pool:
+		chunks = pool.map(_extract_page_range, repeat(path), starts, stops, repeat(ocr), repeat(ocr_lang))
+		for start, chunk in zip(starts, chunks):
+			for number, text in enumerate(chunk, start + 1):
+				if text is not None:
+					yield number, text
+
+
+def extract_text_from_pdf(
+	path: str,
+	ocr: bool = False,
+	ocr_lang: str = "eng",
+	workers: int = 1,
+	min_pages: int = PARALLEL_MIN_PAGES,
+) -> str:
+	"""Text of every page, in page order; see iter_pdf_pages."""
+	return "\n".join(text for _, text in iter_pdf_pages(path, ocr, ocr_lang, workers, min_pages))
 
 
 def extract_text_from_docx(path: str) -> str:
-	if Document is None:
-		raise RuntimeError("python-docx is not installed")
-	doc = Document(path)
-	paras = [p.text for p in doc.paragraphs]
-	return "\n".join(paras)
+	"""Text of headers, body (with tables and text boxes), footers and notes, one block per line."""
+	return "\n".join(iter_docx_blocks(path))
 
 
 def extract_text_from_image(path: str, ocr_lang: str = "eng") -> str:
@@ -49,14 +142,22 @@ def extract_text_from_image(path: str, ocr_lang: str = "eng") -> str:
 	return image_to_text(data, ocr_lang)
 
 
-def extract_text_from_file(path: str, ocr: bool = False, ocr_lang: str = "eng") -> str:
+def extract_text_from_file(path: str, ocr: bool = False, ocr_lang: str = "eng", pdf_workers: int = 1) -> str:
 	ext = os.path.splitext(path)[1].lower()
 	if ext in {".txt", ".csv", ".log", ".json"}:
 		return read_text_file(path)
 	if ext in {".pdf"}:
-		return extract_text_from_pdf(path, ocr=ocr, ocr_lang=ocr_lang)
+		return extract_text_from_pdf(path, ocr=ocr, ocr_lang=ocr_lang, workers=pdf_workers)
 	if ext in {".docx"}:
 		return extract_text_from_docx(path)
 	if ext in {".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp"}:
 		return extract_text_from_image(path, ocr_lang=ocr_lang)
-	return ""  # unsupported 
\ No newline at end of file
+	return ""  # unsupported 
+
+
+def iter_file_pages(path: str, ocr: bool = False, ocr_lang: str = "eng", pdf_workers: int = 1) -> Iterator[Tuple[int, str]]:
+	"""Yield ``(page_no, text)`` for ``path``; formats without pages are one page."""
+	if os.path.splitext(path)[1].lower() == ".pdf":
+		yield from iter_pdf_pages(path, ocr=ocr, ocr_lang=ocr_lang, workers=pdf_workers)
+		return
+	yield 1, extract_text_from_file(path, ocr=ocr, ocr_lang=ocr_lang)
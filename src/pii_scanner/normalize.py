@@ -0,0 +1,105 @@
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Optional, Tuple
+
+# Zero code point of every decimal digit block folded to ASCII: the Indic
+# scripts (Devanagari through Malayalam and Sinhala), their Brahmic relatives
+# and historic scripts, and full-width forms. Entries are checked against the
+# Unicode database when the table is built.
+_DIGIT_ZEROS = (
+	0x0966, 0x09E6, 0x0A66, 0x0AE6, 0x0B66, 0x0BE6, 0x0C66, 0x0CE6, 0x0D66, 0x0DE6,
+	0x0E50, 0x0ED0, 0x0F20, 0x1040, 0x1090, 0x17E0, 0x1810, 0x1946, 0x19D0, 0x1A80,
+	0x1A90, 0x1B50, 0x1BB0, 0x1C40, 0x1C50, 0xA8D0, 0xA900, 0xA9D0, 0xA9F0, 0xAA50,
+	0xABF0, 0xFF10, 0x11066, 0x110F0, 0x11136, 0x111D0, 0x112F0, 0x11450, 0x114D0,
+	0x11650, 0x116C0, 0x11730, 0x118E0, 0x11C50, 0x11D50, 0x11DA0,
+)
+_SPACES = (0x00A0, 0x1680, *range(0x2000, 0x200B), 0x202F, 0x205F, 0x3000)
+# soft hyphen, zero-width space/non-joiner/joiner, word joiner, BOM
+_DROPPED = "\u00ad\u200b\u200c\u200d\u2060\ufeff"
+_DROP_RUN = re.compile("[%s]+" % _DROPPED)
+
+
+def _build_digit_table() -> Dict[int, int]:
+	table: Dict[int, int] = {}
+	for zero in _DIGIT_ZEROS:
+		for digit in range(10):
+			if unicodedata.decimal(chr(zero + digit), None) == digit:
+				table[zero + digit] = ord("0") + digit
+	return table
+
+
+DIGIT_TABLE = _build_digit_table()
+
+NORMALIZE_TABLE: Dict[int, Optional[int]] = dict(DIGIT_TABLE)
+# full-width ASCII variants (letters, punctuation, @ and .) -> ASCII
+NORMALIZE_TABLE.update({code: code - 0xFEE0 for code in range(0xFF01, 0xFF5F)})
+NORMALIZE_TABLE.update({code: ord(" ") for code in _SPACES})
+NORMALIZE_TABLE.update({ord(ch): None for ch in _DROPPED})
+
+
+class OffsetMap:
+	"""Maps offsets in normalized text back to the text it came from.
+
+	Normalization only ever drops characters, so just the drop points are
+	kept: ``points[k]`` is a normalized offset where characters were removed
+	and ``shifts[k]`` the total removed up to and including that point. Text
+	without dropped characters has an empty map.
+	"""
+
+	__slots__ = ("points", "shifts", "floor")
+
+	def __init__(self) -> None:
+		self.points = array("q")
+		self.shifts = array("q")
+		self.floor = 0  # shift of points already discarded
+
+	def __bool__(self) -> bool:
+		return len(self.points) > 0 or self.floor > 0
+
+	def add(self, point: int, count: int) -> None:
+		"""Record ``count`` characters dropped at normalized offset ``point`` (non-decreasing)."""
+		total = (self.shifts[-1] if self.shifts else self.floor) + count
+		if self.points and self.points[-1] == point:
+			self.shifts[-1] = total
+		else:
+			self.points.append(point)
+			self.shifts.append(total)
+
+	def discard_before(self, pos: int) -> None:
+		"""Forget drop points below ``pos``; later lookups must stay at or above it."""
+		k = bisect_left(self.points, pos)
+		if k:
+			self.floor = self.shifts[k - 1]
+			del self.points[:k]
+			del self.shifts[:k]
+
+	def to_original(self, pos: int) -> int:
+		k = bisect_right(self.points, pos)
+		return pos + (self.shifts[k - 1] if k else self.floor)
+
+	def span_to_original(self, start: int, end: int) -> Tuple[int, int]:
+		"""Original span covering normalized ``[start, end)``, without dropped characters at either edge."""
+		if not self:
+			return start, end
+		if end <= start:
+			pos = self.to_original(start)
+			return pos, pos
+		return self.to_original(start), self.to_original(end - 1) + 1
+
+
+def normalize_text(text: str, offsets: Optional[OffsetMap] = None, base: int = 0) -> Tuple[str, OffsetMap]:
+	"""Fold digits, full-width forms and odd spaces to ASCII and drop zero-width characters.
+
+	Returns the normalized text and the map back to ``text``. To normalize a
+	stream piecewise, pass the same ``offsets`` each time with ``base`` set to
+	the normalized length produced so far.
+	"""
+	if offsets is None:
+		offsets = OffsetMap()
+	dropped = 0
+	for run in _DROP_RUN.finditer(text):
+		offsets.add(base + run.start() - dropped, len(run.group()))
+		dropped += len(run.group())
+	return text.translate(NORMALIZE_TABLE), offsets
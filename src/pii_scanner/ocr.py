@@ -1,6 +1,10 @@
+import logging
 import os
+from functools import lru_cache
 from io import BytesIO
-from typing import Optional
+from typing import Callable, Optional
+
+from .ocr_cache import OcrCache, cache_key, page_fingerprint
 
 try:
 	from PIL import Image
@@ -13,17 +17,74 @@ except Exception:  # pragma: no cover
 	pytesseract = None
 
 
+logger = logging.getLogger("pii_scanner.ocr")
+
 _tesseract_cmd = os.getenv("TESSERACT_CMD")
 if _tesseract_cmd and pytesseract is not None:
 	pytesseract.pytesseract.tesseract_cmd = _tesseract_cmd
 
+# OCR results are cached by content in OCR_CACHE_DIR, if set. Off by default: entries are
+# the plaintext OCR of scanned documents, i.e. the PII itself, kept until evicted
+OCR_CACHE_DIR = os.getenv("OCR_CACHE_DIR", "")
+OCR_CACHE_MAX_BYTES = int(os.getenv("OCR_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+
+@lru_cache(maxsize=1)
+def get_ocr_cache() -> Optional[OcrCache]:
+	return OcrCache(OCR_CACHE_DIR, OCR_CACHE_MAX_BYTES) if OCR_CACHE_DIR else None
+
+
+def _cached(key: str, compute: Callable[[], str]) -> str:
+	"""``compute()`` through the OCR cache; failures return "" and are not cached.
+
+	A cache that cannot be read or written (read-only or full disk) only
+	costs the OCR it would have saved.
+	"""
+	cache = get_ocr_cache()
+	if cache is not None:
+		try:
+			text = cache.get(key)
+		except OSError as e:
+			logger.debug("OCR cache read failed: %s", e)
+			text = None
+		if text is not None:
+			return text
+	try:
+		text = compute()
+	except Exception:
+		return ""
+	if cache is not None:
+		try:
+			cache.put(key, text)
+		except OSError as e:
+			logger.debug("OCR cache write failed: %s", e)
+	return text
+
 
 def image_to_text(image_bytes: bytes, lang: str = "eng") -> str:
 	if pytesseract is None or Image is None:
 		raise RuntimeError("OCR dependencies not installed (pytesseract/Pillow)")
 	image = Image.open(BytesIO(image_bytes))
 	image = image.convert("L")
-	try:
+	key = cache_key(image.tobytes(), "image_to_string", lang, f"{image.mode}{image.size}")
+	return _cached(key, lambda: pytesseract.image_to_string(image, lang=lang) or "")
+
+
+def pdf_page_to_text(page, lang: str = "eng", dpi: int = 300) -> str:
+	"""OCR a PyMuPDF page rendered at ``dpi``.
+
+	Pages built from embedded images are looked up in the cache by their
+	image streams (see page_fingerprint) before rendering, so a scan that
+	repeats across pages or documents is rendered and OCRed once.
+	"""
+	fingerprint = page_fingerprint(page, dpi) if get_ocr_cache() is not None else None
+	if fingerprint is None:
+		return image_to_text(page.get_pixmap(dpi=dpi).tobytes("png"), lang)
+	if pytesseract is None or Image is None:
+		raise RuntimeError("OCR dependencies not installed (pytesseract/Pillow)")
+
+	def render_and_ocr() -> str:
+		image = Image.open(BytesIO(page.get_pixmap(dpi=dpi).tobytes("png"))).convert("L")
 		return pytesseract.image_to_string(image, lang=lang) or ""
-	except Exception:
-		return "" 
\ No newline at end of file
+
+	return _cached(cache_key(fingerprint, "pdf_page", lang), render_and_ocr)
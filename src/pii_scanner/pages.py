@@ -0,0 +1,66 @@
+"""Per-page decision whether a PDF page's text layer can be used or it must be OCRed."""
+import re
+from dataclasses import dataclass
+
+# fewer text-layer characters than this counts as no text layer
+MIN_PAGE_TEXT_CHARS = 20
+# a page at least this much covered by images, with less text than
+# IMAGE_PAGE_MAX_TEXT_CHARS, is treated as a scan
+SCANNED_IMAGE_COVERAGE = 0.5
+IMAGE_PAGE_MAX_TEXT_CHARS = 200
+# below this share of valid glyphs the text layer is garbage (broken font encodings)
+MIN_GLYPH_VALIDITY = 0.8
+
+# what unmappable glyphs come out as: control codes, surrogates, private use, U+FFFD
+_INVALID_GLYPH = re.compile(r"[\x00-\x08\x0e-\x1f\x7f-\x9f\ud800-\udfff\ue000-\uf8ff\ufffd]")
+
+
+def glyph_validity(text: str) -> float:
+	"""Share of non-space characters that are not unmappable glyphs (1.0 for no text)."""
+	total = len("".join(text.split()))
+	if not total:
+		return 1.0
+	return 1.0 - len(_INVALID_GLYPH.findall(text)) / total
+
+
+def image_coverage(page) -> float:
+	"""Share of the page area covered by images, capped at 1.0 (overlapping images count twice)."""
+	area = abs(page.rect)
+	if not area:
+		return 0.0
+	covered = 0.0
+	for info in page.get_image_info():
+		bbox = page.rect & info["bbox"]
+		if not bbox.is_empty:
+			covered += abs(bbox)
+	return min(1.0, covered / area)
+
+
+@dataclass(frozen=True)
+class PageProfile:
+	chars: int
+	glyph_validity: float
+	image_coverage: float
+
+	@property
+	def needs_ocr(self) -> bool:
+		if self.chars < MIN_PAGE_TEXT_CHARS:
+			# blank pages have nothing to read
+			return self.image_coverage > 0
+		if self.glyph_validity < MIN_GLYPH_VALIDITY:
+			return True
+		return self.image_coverage >= SCANNED_IMAGE_COVERAGE and self.chars < IMAGE_PAGE_MAX_TEXT_CHARS
+
+
+def profile_page(page, text: str) -> PageProfile:
+	"""Profile a PyMuPDF page given its extracted ``text``.
+
+	Image coverage is only computed (and is 0.0 otherwise) when the text
+	layer alone does not settle it, so ordinary digital pages cost little
+	beyond get_text().
+	"""
+	chars = len(text.strip())
+	validity = glyph_validity(text)
+	if chars >= IMAGE_PAGE_MAX_TEXT_CHARS and validity >= MIN_GLYPH_VALIDITY:
+		return PageProfile(chars, validity, 0.0)
+	return PageProfile(chars, validity, image_coverage(page))
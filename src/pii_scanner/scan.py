@@ -1,13 +1,25 @@
+import contextlib
 import json
 import os
+import time
 from dataclasses import dataclass
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Optional, Iterable, Iterator, Callable, Sequence
 
-from .detectors.patterns import build_detectors
-from .detectors.validators import normalize_digits
-from .extract import extract_text_from_file
+from .detectors.patterns import Detector, get_detector_set
+from .detectors.prefilter import build_index
+from .findings import Finding, FindingSet
+from .normalize import OffsetMap, normalize_text
+from .resolve import DEFAULT_OVERLAP_POLICY, OverlapResolver, resolve_overlaps
+from .extract import extract_text_from_file, iter_file_pages, iter_text_file
 
 
+# Characters held back between chunks in scan_text_stream; must exceed the longest
+# bounded match (UPI, 321 chars) plus the context window on either side.
+STREAM_OVERLAP = 512
+
+# plain-text formats, which can be scanned as a stream without extraction
+TEXT_EXTENSIONS = {".txt", ".csv", ".log", ".json"}
+
 SUPPORTED_EXTENSIONS = {
 	".txt", ".csv", ".log", ".json", ".pdf", ".docx", ".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp"
 }
@@ -20,6 +32,12 @@ class ScanOptions:
 	mask: bool = True
 	redact_output_dir: str = ""
 	recursive: bool = True
+	overlap_policy: str = DEFAULT_OVERLAP_POLICY
+	time_budget: float = 0.0  # seconds of matching per document; 0 disables
+	pdf_workers: int = 1  # processes per PDF; 0 for one per CPU
+	by_page: bool = False  # scan pages as they are extracted; spans are page-relative
+	# text files this large are scanned from a memory map in windows (time_budget does not apply)
+	stream_min_bytes: int = 16 * 1024 * 1024
 
 
 def _apply_redactions(text: str, replacements: List[Tuple[int, int, str]]) -> str:
@@ -31,44 +49,264 @@ def _apply_redactions(text: str, replacements: List[Tuple[int, int, str]]) -> st
 	for start, end, masked in replacements:
 		result_parts.append(text[cursor:start])
 		result_parts.append(masked)
-		cursor = end
+		cursor = max(cursor, end)
 	result_parts.append(text[cursor:])
 	return "".join(result_parts)
 
 
-def scan_text(text: str, mask: bool = True) -> Tuple[List[Dict[str, Any]], str]:
-	from .detectors.patterns import CONTEXT_KEYWORDS
+def _is_valid(detector: Detector, value: str) -> bool:
+	return detector.validator(value) if detector.validator else True
+
+
+def scan_findings(
+	text: str,
+	mask: bool = True,
+	stats: Optional[Dict[str, Any]] = None,
+	policy: str = DEFAULT_OVERLAP_POLICY,
+	time_budget: Optional[float] = None,
+) -> FindingSet:
+	"""Scan ``text`` and return its findings in columnar form.
+
+	Use this instead of scan_text when only counts or spans are needed. The
+	text is normalized once up front (see normalize_text); ``findings.text`` is
+	the normalized text the stored offsets index, while spans(), replacements()
+	and the dicts report offsets into ``findings.original``. Overlapping
+	detections are resolved to one per span according to ``policy`` (see
+	OVERLAP_POLICIES). With a ``time_budget`` in seconds, detectors still
+	pending when it runs out are skipped and ``stats["budget_exceeded"]`` is set.
+	"""
+	deadline = time.monotonic() + time_budget if time_budget else None
+	detector_set = get_detector_set()
+	normalized, offsets = normalize_text(text)
+	findings = FindingSet(normalized, detector_set, mask, original=text, offsets=offsets)
+
+	active = detector_set.select(build_index(normalized))
+	if stats is not None:
+		stats["detectors_run"] = len(active)
+		stats["detectors_skipped"] = len(detector_set) - len(active)
+
+	matches = detector_set.find_matches(normalized, active, deadline=deadline)
+	if stats is not None:
+		stats["budget_exceeded"] = deadline is not None and time.monotonic() > deadline
+	candidates = (
+		(*match.span(1), detector)
+		for detector, match in matches
+		if _is_valid(detector, match.group(1))
+	)
+	for start, end, detector in resolve_overlaps(candidates, policy):
+		findings.append(detector, start, end)
+	return findings
+
+
+def _redact(findings: FindingSet) -> str:
+	return _apply_redactions(findings.original, findings.replacements()) if findings.mask else findings.original
+
+
+def scan_text(
+	text: str,
+	mask: bool = True,
+	stats: Optional[Dict[str, Any]] = None,
+	policy: str = DEFAULT_OVERLAP_POLICY,
+	time_budget: Optional[float] = None,
+) -> Tuple[List[Dict[str, Any]], str]:
+	findings = scan_findings(text, mask=mask, stats=stats, policy=policy, time_budget=time_budget)
+	return findings.to_dicts(), _redact(findings)
+
+
+def _validate_batch(detector: Detector, values: Iterable[str]) -> Dict[str, bool]:
+	unique = list(dict.fromkeys(values))
+	if detector.batch_validator is not None:
+		return dict(zip(unique, detector.batch_validator(unique)))
+	if detector.validator is None:
+		return dict.fromkeys(unique, True)
+	return {value: detector.validator(value) for value in unique}
+
+
+def scan_texts(
+	texts: Sequence[str],
+	mask: bool = True,
+	policy: str = DEFAULT_OVERLAP_POLICY,
+) -> List[Tuple[List[Dict[str, Any]], str]]:
+	"""Scan many texts at once; returns what scan_text returns for each, in order.
+
+	Candidates from every text are collected first and then validated per
+	detector in one call, so repeated values are checked once and checksum
+	validators run vectorized over the whole batch.
+	"""
+	detector_set = get_detector_set()
+	normalized_texts = [normalize_text(text) for text in texts]
+	matches_per_text = []
+	values_by_detector: Dict[str, List[str]] = {}
+	for normalized, _ in normalized_texts:
+		active = detector_set.select(build_index(normalized))
+		matches = detector_set.find_matches(normalized, active)
+		for detector, match in matches:
+			values_by_detector.setdefault(detector.name, []).append(match.group(1))
+		matches_per_text.append(matches)
+
+	verdicts = {
+		name: _validate_batch(detector_set.get(name), values)
+		for name, values in values_by_detector.items()
+	}
+
+	results: List[Tuple[List[Dict[str, Any]], str]] = []
+	for text, (normalized, offsets), matches in zip(texts, normalized_texts, matches_per_text):
+		findings = FindingSet(normalized, detector_set, mask, original=text, offsets=offsets)
+		valid = (
+			(*match.span(1), detector)
+			for detector, match in matches
+			if verdicts[detector.name][match.group(1)]
+		)
+		for start, end, detector in resolve_overlaps(valid, policy):
+			findings.append(detector, start, end)
+		results.append((findings.to_dicts(), _redact(findings)))
+	return results
+
 
-	detectors = build_detectors()
-	normalized = normalize_digits(text)
-	findings: List[Dict[str, Any]] = []
-	replacements: List[Tuple[int, int, str]] = []
+def scan_text_stream(
+	chunks: Iterable[str],
+	mask: bool = True,
+	write: Optional[Callable[[str], Any]] = None,
+	overlap: int = STREAM_OVERLAP,
+	policy: str = DEFAULT_OVERLAP_POLICY,
+	stats: Optional[Dict[str, Any]] = None,
+) -> Iterator[Dict[str, Any]]:
+	"""Scan text arriving in chunks, yielding findings as soon as they are final.
 
-	for detector in detectors:
-		for match in detector.pattern.finditer(normalized):
-			value = match.group(1)
-			is_valid = detector.validator(value) if detector.validator else True
-			if not is_valid:
+	Spans are absolute offsets into the concatenated original text and every
+	match is reported exactly once, in the same order as scan_text. Only a
+	window of roughly ``2 * overlap`` characters is buffered. If ``write`` is
+	given it receives the redacted (or, with ``mask=False``, original) text in
+	order, as soon as no later match can cover it. Overlaps are resolved as
+	in scan_findings; a finding is held back until no later match can
+	displace it. ``stats``, once the stream is exhausted, gets
+	``detectors_skipped`` (detectors the prefilter ruled out in every
+	window) and ``budget_exceeded`` (always False: there is no time budget).
+	"""
+	detector_set = get_detector_set()
+	detectors = detector_set.detectors
+	ran = set()
+	# cursors[i]: normalized offset before which detector i has nothing left to report
+	cursors = [0] * len(detectors)
+	# replacements not yet written, in original offsets
+	pending: List[Tuple[int, int, str]] = []
+	offsets = OffsetMap()
+	buffer = ""  # normalized text from ``base``
+	base = 0
+	raw = ""  # original text from ``written``, kept only for ``write``
+	written = 0
+	total = 0  # normalized characters seen so far
+	resolver = OverlapResolver(policy)
+	chunk_iter = iter(chunks)
+	final = False
+
+	while not final:
+		chunk = next(chunk_iter, None)
+		if chunk is None:
+			final = True
+		else:
+			normalized, _ = normalize_text(chunk, offsets, base=total)
+			total += len(normalized)
+			buffer += normalized
+			if write is not None:
+				raw += chunk
+			if len(buffer) - (min(cursors) - base) < 2 * overlap:
 				continue
-			start, end = match.span(1)
-			context_start = max(0, start - 48)
-			context_end = min(len(normalized), end + 48)
-			context = normalized[context_start:context_end]
-			masked_value = detector.mask(value)
-
-			finding: Dict[str, Any] = {
-				"type": detector.name,
-				"value": value if not mask else None,
-				"masked_value": masked_value,
-				"span": [start, end],
-				"context": context,
-				"risk": detector.risk,
-			}
-			findings.append(finding)
-			replacements.append((start, end, masked_value))
-
-	redacted_text = _apply_redactions(normalized, replacements) if mask else normalized
-	return findings, redacted_text
+
+		# Matches starting before ``limit`` cannot be changed by text still to come.
+		limit = len(buffer) if final else len(buffer) - overlap
+		active = {detector.name for detector in detector_set.select(build_index(buffer))}
+		ran |= active
+		batch = []
+		for index, detector in enumerate(detectors):
+			if detector.name in active:
+				for match in detector.pattern.finditer(buffer, cursors[index] - base):
+					if match.start() >= limit:
+						break
+					cursors[index] = base + match.end()
+					batch.append((match.start(1), index, detector, match))
+			cursors[index] = max(cursors[index], base + limit)
+
+		batch.sort(key=lambda item: (item[0], item[1]))
+		released = []
+		for _, _, detector, match in batch:
+			if _is_valid(detector, match.group(1)):
+				start, end = match.span(1)
+				kept = resolver.push((base + start, base + end, detector))
+				if kept is not None:
+					released.append(kept)
+		if resolver.held is not None and min(cursors) >= resolver.held[1]:
+			released.append(resolver.flush())
+		for start, end, detector in released:
+			finding = Finding(detector, start - base, end - base, buffer, mask, offsets)
+			if write is not None and mask:
+				pending.append((*finding.original_span(base), finding.masked_value))
+			yield finding.to_dict(offset=base)
+
+		# normalized offset before which nothing is left to report
+		frontier = min(cursors) if resolver.held is None else min(min(cursors), resolver.held[0])
+		if write is not None:
+			# original offset before which no later match can start
+			safe = written + len(raw) if final else offsets.to_original(frontier)
+			parts = []
+			pending.sort(key=lambda x: x[0])
+			while pending and pending[0][0] < safe:
+				start, end, masked = pending.pop(0)
+				if start > written:
+					parts.append(raw[:start - written])
+				parts.append(masked)
+				raw = raw[max(0, end - written):]
+				written = max(written, end)
+			if safe > written:
+				parts.append(raw[:safe - written])
+				raw = raw[safe - written:]
+				written = safe
+			if parts:
+				write("".join(parts))
+
+		trim = max(base, frontier - overlap)
+		buffer = buffer[trim - base:]
+		base = trim
+		offsets.discard_before(trim)
+
+	if stats is not None:
+		stats.update(detectors_skipped=len(detectors) - len(ran), budget_exceeded=False)
+
+
+def scan_pages(
+	pages: Iterable[Tuple[int, str]],
+	mask: bool = True,
+	write: Optional[Callable[[str], Any]] = None,
+	stats: Optional[Dict[str, Any]] = None,
+	policy: str = DEFAULT_OVERLAP_POLICY,
+	time_budget: Optional[float] = None,
+) -> Iterator[Dict[str, Any]]:
+	"""Scan ``(page_no, text)`` pairs as they arrive, yielding each page's findings once it is scanned.
+
+	Pairs typically come from iter_file_pages, so extraction and scanning
+	overlap and only one page is held at a time. Findings are the scan_text
+	dicts plus ``page``; spans are relative to that page's text, and a match
+	cannot cross a page boundary. If ``write`` is given it receives each
+	page's redacted (or, with ``mask=False``, original) text, pages separated
+	by a newline as in extract_text_from_pdf. ``time_budget`` applies per
+	page; ``stats`` gets ``pages``, ``budget_exceeded`` if any page ran out
+	and ``detectors_skipped`` for the page that skipped fewest.
+	"""
+	if stats is not None:
+		stats.update(pages=0, budget_exceeded=False, detectors_skipped=0)
+	for index, (page_no, text) in enumerate(pages):
+		page_stats: Dict[str, Any] = {}
+		findings = scan_findings(text, mask=mask, stats=page_stats, policy=policy, time_budget=time_budget)
+		if stats is not None:
+			skipped = page_stats["detectors_skipped"]
+			stats["detectors_skipped"] = skipped if index == 0 else min(stats["detectors_skipped"], skipped)
+			stats["budget_exceeded"] = stats["budget_exceeded"] or page_stats["budget_exceeded"]
+			stats["pages"] += 1
+		if write is not None:
+			write(("\n" if index else "") + _redact(findings))
+		for finding in findings.to_dicts():
+			finding["page"] = page_no
+			yield finding
 
 
 def _iter_files(input_path: str, recursive: bool) -> List[str]:
@@ -88,12 +326,89 @@ def _iter_files(input_path: str, recursive: bool) -> List[str]:
 	return paths
 
 
+def _redacted_path(output_dir: str, file_path: str) -> str:
+	os.makedirs(output_dir, exist_ok=True)
+	name, _ = os.path.splitext(os.path.basename(file_path))
+	return os.path.join(output_dir, f"{name}.redacted.txt")
+
+
+def _scan_file_by_page(file_path: str, options: ScanOptions) -> Dict[str, Any]:
+	pages = iter_file_pages(file_path, ocr=options.ocr, ocr_lang=options.ocr_lang, pdf_workers=options.pdf_workers)
+	stats: Dict[str, Any] = {}
+	redacted = (
+		open(_redacted_path(options.redact_output_dir, file_path), "w", encoding="utf-8", errors="ignore")
+		if options.redact_output_dir else contextlib.nullcontext()
+	)
+	with redacted as out:
+		findings = list(scan_pages(
+			pages,
+			mask=options.mask,
+			write=out.write if out is not None else None,
+			stats=stats,
+			policy=options.overlap_policy,
+			time_budget=options.time_budget,
+		))
+	return {
+		"file": file_path,
+		"num_findings": len(findings),
+		"pages": stats["pages"],
+		"detectors_skipped": stats["detectors_skipped"],
+		"budget_exceeded": stats["budget_exceeded"],
+		"findings": findings,
+	}
+
+
+def _scan_text_file_stream(file_path: str, options: ScanOptions) -> Dict[str, Any]:
+	"""Scan a text file window by window from a memory map, writing redacted text as it goes.
+
+	Memory stays constant apart from the findings themselves; spans are
+	character offsets into the file's text (see iter_text_file).
+	"""
+	stats: Dict[str, Any] = {}
+	redacted = (
+		# newline="" so the redacted file keeps the input's line endings and offsets
+		open(_redacted_path(options.redact_output_dir, file_path), "w", encoding="utf-8", newline="")
+		if options.redact_output_dir else contextlib.nullcontext()
+	)
+	with redacted as out:
+		findings = list(scan_text_stream(
+			iter_text_file(file_path),
+			mask=options.mask,
+			write=out.write if out is not None else None,
+			policy=options.overlap_policy,
+			stats=stats,
+		))
+	return {
+		"file": file_path,
+		"num_findings": len(findings),
+		"detectors_skipped": stats["detectors_skipped"],
+		"budget_exceeded": stats["budget_exceeded"],
+		"streamed": True,
+		"findings": findings,
+	}
+
+
 def scan_path(input_path: str, options: ScanOptions) -> Dict[str, Any]:
 	files = _iter_files(input_path, options.recursive)
 	results: List[Dict[str, Any]] = []
 	for file_path in files:
+		if os.path.splitext(file_path)[1].lower() in TEXT_EXTENSIONS \
+				and os.path.getsize(file_path) >= options.stream_min_bytes:
+			try:
+				results.append(_scan_text_file_stream(file_path, options))
+			except Exception as e:
+				results.append({"file": file_path, "error": str(e), "findings": []})
+			continue
+		if options.by_page:
+			try:
+				results.append(_scan_file_by_page(file_path, options))
+			except Exception as e:
+				results.append({"file": file_path, "error": str(e), "findings": []})
+			continue
 		try:
-			text = extract_text_from_file(file_path, ocr=options.ocr, ocr_lang=options.ocr_lang)
+			text = extract_text_from_file(
+				file_path, ocr=options.ocr, ocr_lang=options.ocr_lang, pdf_workers=options.pdf_workers,
+			)
 		except Exception as e:
 			results.append({
 				"file": file_path,
@@ -102,20 +417,25 @@ def scan_path(input_path: str, options: ScanOptions) -> Dict[str, Any]:
 			})
 			continue
 
-		findings, redacted_text = scan_text(text, mask=options.mask)
+		stats: Dict[str, Any] = {}
+		findings, redacted_text = scan_text(
+			text,
+			mask=options.mask,
+			stats=stats,
+			policy=options.overlap_policy,
+			time_budget=options.time_budget,
+		)
 		entry: Dict[str, Any] = {
 			"file": file_path,
 			"num_findings": len(findings),
+			"detectors_skipped": stats["detectors_skipped"],
+			"budget_exceeded": stats["budget_exceeded"],
 			"findings": findings,
 		}
 		results.append(entry)
 
 		if options.redact_output_dir:
-			os.makedirs(options.redact_output_dir, exist_ok=True)
-			base = os.path.basename(file_path)
-			name, _ = os.path.splitext(base)
-			out_path = os.path.join(options.redact_output_dir, f"{name}.redacted.txt")
-			with open(out_path, "w", encoding="utf-8", errors="ignore") as f:
+			with open(_redacted_path(options.redact_output_dir, file_path), "w", encoding="utf-8", errors="ignore") as f:
 				f.write(redacted_text)
 
 	summary: Dict[str, int] = {}
@@ -0,0 +1,162 @@
+import fitz
+
+from pii_scanner.extract import extract_text_from_pdf, iter_pdf_pages
+
+
+def _write_pdf(path, pages):
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        if i % 5 != 4:  # leave some pages without a text layer
+            page.insert_text((72, 72), f"page {i} pan ABCDE{i:04d}F")
+    doc.save(str(path))
+    doc.close()
+
+
+def test_parallel_pdf_extraction_keeps_page_order(tmp_path):
+    path = tmp_path / "statement.pdf"
+    _write_pdf(path, 23)
+    serial = extract_text_from_pdf(str(path))
+    assert serial.index("page 0 ") < serial.index("page 22 ")
+    assert extract_text_from_pdf(str(path), workers=3, min_pages=1) == serial
+    # below min_pages the pool is not used at all
+    assert extract_text_from_pdf(str(path), workers=3, min_pages=100) == serial
+
+
+def test_page_scan_reports_page_relative_spans(tmp_path):
+    from pii_scanner.scan import ScanOptions, scan_path
+
+    path = tmp_path / "statement.pdf"
+    _write_pdf(path, 7)
+    report = scan_path(str(path), ScanOptions(by_page=True, mask=False))
+    [entry] = report["results"]
+    assert entry["pages"] == 6  # page 5 has no text layer
+    pages = {}
+    for finding in entry["findings"]:
+        pages.setdefault(finding["page"], []).append(finding)
+    assert sorted(pages) == [1, 2, 3, 4, 6, 7]
+    text = dict(iter_pdf_pages(str(path)))[7]
+    [pan] = pages[7]
+    assert text[slice(*pan["span"])] == pan["value"] == "ABCDE0006F"
+    # the redacted output matches the whole-document scan
+    by_page = scan_path(str(path), ScanOptions(by_page=True, redact_output_dir=str(tmp_path / "pages")))
+    whole = scan_path(str(path), ScanOptions(redact_output_dir=str(tmp_path / "whole")))
+    redacted = (tmp_path / "pages" / "statement.redacted.txt").read_text()
+    assert redacted == (tmp_path / "whole" / "statement.redacted.txt").read_text()
+    assert "ABCDE0006F" not in redacted
+    assert by_page["summary"] == whole["summary"]
+
+
+def test_only_scanned_pages_are_ocred(tmp_path, monkeypatch):
+    from pii_scanner import extract
+    from pii_scanner.pages import PageProfile, glyph_validity
+
+    ocred = []
+    monkeypatch.setattr(extract, "pdf_page_to_text", lambda page, lang, dpi: ocred.append(lang) or "scanned PAN ABCDE1234F")
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "digital statement text " * 12)
+    scan = doc.new_page()
+    scan.insert_image(scan.rect, pixmap=fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 8, 8), 0))
+    doc.new_page()  # blank
+    path = tmp_path / "mixed.pdf"
+    doc.save(str(path))
+
+    pages = dict(extract.iter_pdf_pages(str(path), ocr=True))
+    assert sorted(pages) == [1, 2]
+    assert pages[2] == "scanned PAN ABCDE1234F" and len(ocred) == 1
+    # a garbled text layer is OCRed even though it has plenty of characters
+    assert glyph_validity("� ab") < 0.8
+    assert PageProfile(chars=300, glyph_validity=0.4, image_coverage=0.0).needs_ocr
+
+
+_W_NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+
+def _write_docx(path, parts):
+    import zipfile
+
+    with zipfile.ZipFile(path, "w") as zf:
+        for name, body in parts.items():
+            root = "w:document" if name == "word/document.xml" else "w:hdr"
+            zf.writestr(name, f'<{root} {_W_NS} xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006">{body}</{root}>')
+
+
+def test_docx_extraction_covers_tables_headers_footers_and_text_boxes(tmp_path):
+    from pii_scanner.extract import extract_text_from_docx
+
+    def p(*runs):
+        return "<w:p><w:pPr><w:tabs><w:tab w:pos=\"720\"/></w:tabs></w:pPr>" + "".join(
+            f"<w:r>{r}</w:r>" for r in runs) + "</w:p>"
+
+    text_box = p("<w:t>anchor</w:t>", (
+        "<mc:AlternateContent><mc:Choice><w:txbxContent>" + p("<w:t>box PAN ABCDE1234F</w:t>")
+        + "</w:txbxContent></mc:Choice><mc:Fallback><w:txbxContent>" + p("<w:t>box PAN ABCDE1234F</w:t>")
+        + "</w:txbxContent></mc:Fallback></mc:AlternateContent>"
+    ))
+    table = "<w:tbl><w:tr><w:tc>" + p("<w:t>Name</w:t>") + "</w:tc><w:tc>" + p("<w:t>Aadhaar</w:t>") \
+        + "</w:tc></w:tr><w:tr><w:tc>" + p("<w:t>Ravi</w:t>") + p("<w:t>Kumar</w:t>") + "</w:tc><w:tc>" \
+        + p("<w:t>2345 6789 0123</w:t>") + "</w:tc></w:tr></w:tbl>"
+    path = tmp_path / "form.docx"
+    _write_docx(path, {
+        "word/footer1.xml": p("<w:t>footer mail a@example.com</w:t>"),
+        "word/document.xml": "<w:body>" + p("<w:t>Dear</w:t>", "<w:tab/>", "<w:t xml:space=\"preserve\"> sir</w:t>")
+        + table + text_box + "</w:body>",
+        "word/header2.xml": p("<w:t>second header</w:t>"),
+        "word/header1.xml": p("<w:t>first header</w:t>"),
+    })
+    assert extract_text_from_docx(str(path)).split("\n") == [
+        "first header",
+        "second header",
+        "Dear\t sir",
+        "Name\tAadhaar",
+        "Ravi",
+        "Kumar\t2345 6789 0123",
+        "box PAN ABCDE1234F",
+        "anchor",
+        "footer mail a@example.com",
+    ]
+
+
+def test_docx_extraction_matches_python_docx_paragraphs(tmp_path):
+    import docx
+    from pii_scanner.docx_xml import iter_docx_blocks
+
+    doc = docx.Document()
+    for i in range(50):
+        doc.add_paragraph(f"customer {i} pan ABCDE{i:04d}F")
+    path = tmp_path / "big.docx"
+    doc.save(str(path))
+    assert list(iter_docx_blocks(str(path))) == [p.text for p in docx.Document(str(path)).paragraphs]
+
+
+def test_text_file_windows_split_multibyte_characters_cleanly(tmp_path):
+    from pii_scanner.extract import iter_text_file
+
+    text = "ग्राहक PAN ABCDE1234F ₹500\r\n" * 50
+    path = tmp_path / "hindi.log"
+    path.write_bytes(text.encode("utf-8"))
+    chunks = list(iter_text_file(str(path), window=7))
+    assert len(chunks) > 100
+    assert "".join(chunks) == text
+    (tmp_path / "empty.log").write_bytes(b"")
+    assert list(iter_text_file(str(tmp_path / "empty.log"))) == []
+
+
+def test_streamed_text_scan_matches_whole_file_scan(tmp_path, monkeypatch):
+    from pii_scanner import extract, scan
+    from pii_scanner.scan import ScanOptions, scan_path, scan_text
+
+    # small, odd windows so matches and characters straddle them
+    monkeypatch.setattr(scan, "iter_text_file", lambda path: extract.iter_text_file(path, window=4093))
+
+    lines = [f"ग्राहक {i} ok" if i % 7 else f"user {i} pan ABCDE{i:04d}F mail u{i}@example.com" for i in range(3000)]
+    text = "\r\n".join(lines)
+    path = tmp_path / "app.log"
+    path.write_bytes(text.encode("utf-8"))
+    report = scan_path(str(path), ScanOptions(stream_min_bytes=0, redact_output_dir=str(tmp_path / "out")))
+    [entry] = report["results"]
+    expected, redacted = scan_text(text)
+    assert entry["streamed"] and entry["findings"] == expected
+    assert (tmp_path / "out" / "app.redacted.txt").read_bytes() == redacted.encode("utf-8")
+    plain = scan_path(str(path), ScanOptions(stream_min_bytes=0, mask=False))["results"][0]
+    assert all(text[slice(*f["span"])] == f["value"] for f in plain["findings"])
@@ -0,0 +1,68 @@
+import fitz
+import pytest
+
+from pii_scanner import ocr
+from pii_scanner.ocr_cache import OcrCache, cache_key
+
+
+def test_cache_evicts_least_recently_used_entries_over_budget(tmp_path):
+    cache = OcrCache(str(tmp_path), max_bytes=250)
+    for name in "abc":
+        cache.put(cache_key(name.encode(), "cfg"), name * 100)
+    assert cache.stats()["entries"] == 2  # "a" was evicted
+    assert cache.get(cache_key(b"a", "cfg")) is None
+    assert cache.get(cache_key(b"b", "cfg")) == "b" * 100
+    cache.put(cache_key(b"d", "cfg"), "d" * 100)  # evicts "c", the least recently used
+    assert cache.get(cache_key(b"c", "cfg")) is None
+    assert cache.get(cache_key(b"b", "cfg")) == "b" * 100
+    assert cache.stats() == {"hits": 2, "misses": 2, "evictions": 2, "entries": 2, "bytes": 200}
+    # a new process sees the same entries
+    assert OcrCache(str(tmp_path), max_bytes=250).get(cache_key(b"d", "cfg")) == "d" * 100
+    assert cache_key(b"d", "cfg") != cache_key(b"d", "other cfg")
+
+
+@pytest.fixture
+def ocr_calls(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(ocr, "OCR_CACHE_DIR", str(tmp_path / "ocr"))
+    ocr.get_ocr_cache.cache_clear()
+    monkeypatch.setattr(ocr.pytesseract, "image_to_string", lambda image, lang: calls.append(lang) or "PAN ABCDE1234F")
+    yield calls
+    ocr.get_ocr_cache.cache_clear()
+
+
+def test_identical_scanned_pages_are_ocred_once(ocr_calls):
+    doc = fitz.open()
+    scan = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 8, 8), 0)
+    for _ in range(3):
+        page = doc.new_page()
+        page.insert_image(page.rect, pixmap=scan)
+    doc = fitz.open("pdf", doc.tobytes())  # reload so pages share one image stream
+    texts = [ocr.pdf_page_to_text(page, "eng", dpi=20) for page in doc]
+    assert texts == ["PAN ABCDE1234F"] * 3
+    assert len(ocr_calls) == 1
+    png = doc[0].get_pixmap(dpi=20).tobytes("png")
+    assert ocr.image_to_text(png) == ocr.image_to_text(png)
+    assert len(ocr_calls) == 2
+    assert ocr.get_ocr_cache().stats()["hits"] == 3
+
+
+def test_cache_entries_are_private_to_their_owner(tmp_path):
+    cache = OcrCache(str(tmp_path / "ocr"), max_bytes=1000)
+    key = cache_key(b"a", "cfg")
+    cache.put(key, "PAN ABCDE1234F")
+    path = tmp_path / "ocr" / key[:2] / (key + ".txt")
+    assert (tmp_path / "ocr").stat().st_mode & 0o777 == 0o700
+    assert path.parent.stat().st_mode & 0o777 == 0o700
+    assert path.stat().st_mode & 0o777 == 0o600
+
+
+def test_cache_failures_do_not_fail_ocr(ocr_calls, monkeypatch):
+    def fail(*args):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(OcrCache, "get", fail)
+    monkeypatch.setattr(OcrCache, "put", fail)
+    png = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 8, 8), 0).tobytes("png")
+    assert ocr.image_to_text(png) == "PAN ABCDE1234F"
+    assert len(ocr_calls) == 1
@@ -0,0 +1,17 @@
+from pii_scanner.detectors.audit import measure_growth
+from pii_scanner.detectors.patterns import get_detector_set
+from pii_scanner.scan import scan_text
+
+
+def test_detector_patterns_scan_adversarial_input_in_linear_time():
+    report = measure_growth(get_detector_set().detectors, sizes=(1000, 8000))
+    slow = [g for g in report if g.is_superlinear()]
+    assert not slow, slow
+
+
+def test_bounded_email_and_upi_still_match_ordinary_addresses():
+    findings, _ = scan_text("mail first.last+tag@mail.example.co.in upi some.one@okaxis", mask=False)
+    assert [(f["type"], f["value"]) for f in findings] == [
+        ("EMAIL", "first.last+tag@mail.example.co.in"),
+        ("UPI", "some.one@okaxis"),
+    ]
@@ -0,0 +1,43 @@
+import random
+import re
+
+from pii_scanner.detectors.patterns import get_detector_set
+from pii_scanner.detectors.validators import (
+    _verhoeff_checksum,
+    are_valid_aadhaar,
+    is_valid_aadhaar,
+    verhoeff_checksums,
+)
+
+
+def _random_numbers(count, width=12, seed=7):
+    rng = random.Random(seed)
+    return ["".join(rng.choice("0123456789") for _ in range(width)) for _ in range(count)]
+
+
+def test_verhoeff_checksums_match_scalar():
+    numbers = _random_numbers(2000)
+    assert verhoeff_checksums(numbers) == [_verhoeff_checksum(n) for n in numbers]
+    assert verhoeff_checksums([]) == []
+
+
+def test_are_valid_aadhaar_matches_is_valid_aadhaar():
+    values = _random_numbers(2000) + [
+        "234567890123",
+        "2345 6789 0123",  # separators are stripped by the detector, not the validator
+        "2345-6789-0123",
+        "123456789012",  # leading digit out of range
+        "23456789012",
+        "2345678901234",
+        "23456789012a",
+        "",
+    ]
+    assert are_valid_aadhaar(values) == [is_valid_aadhaar(v) for v in values]
+
+
+def test_aadhaar_batch_validator_matches_validator_on_spaced_values():
+    detector = get_detector_set().get("AADHAAR")
+    values = ["2345 6789 0123", "2345\n6789 0124", "9999 9999 9999", "2345 6789 012"]
+    expected = [detector.validator(v) for v in values]
+    assert detector.batch_validator(values) == expected
+    assert expected[0] == is_valid_aadhaar(re.sub(r"\s", "", values[0]))